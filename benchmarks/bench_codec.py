@@ -0,0 +1,48 @@
+"""Compare the binary codec against the pydantic JSON path:
+encode time, decode time and payload size. Delta messages are measured
+with a quarter of the cores changing between samples.
+
+Run from the project root with:
+    uv run python -m benchmarks.bench_codec
+"""
+import argparse
+import timeit
+
+from transport import codec
+from transport.delta import DeltaEncoder
+from benchmarks.bench_framing import make_message
+
+
+def make_delta_message(num_cores):
+    """Create a delta message with every 4th core changed."""
+    msg = make_message(num_cores)
+    encoder = DeltaEncoder(keyframe_interval=100)
+    encoder.encode(msg)
+
+    cores = msg.cpu.cores
+    cores.utilization = [(u + 1) % 100 if i % 4 == 0 else u for i, u in enumerate(cores.utilization)]
+    cores.frequency = [f + 100 if i % 4 == 0 else f for i, f in enumerate(cores.frequency)]
+    return encoder.encode(msg)
+
+def run(num_cores, number):
+    messages = {"full": make_message(num_cores), "delta": make_delta_message(num_cores)}
+    print(f"{num_cores} cores:")
+    print(f"  {'encoding':<14} {'size':>7} {'encode':>10} {'decode':>10}")
+
+    for kind, msg in messages.items():
+        for encoding in codec.ENCODINGS:
+            data = codec.encode(msg, encoding)
+            encode_time = timeit.timeit(lambda: codec.encode(msg, encoding), number=number) / number
+            decode_time = timeit.timeit(lambda: codec.decode(data, encoding), number=number) / number
+            name = f"{encoding} ({kind})"
+            print(f"  {name:<14} {len(data):>6}B {encode_time*10**6:>8.1f}us {decode_time*10**6:>8.1f}us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Message codec benchmark")
+    parser.add_argument("--number", type=int, default=10_000, help="iterations per measurement")
+    parser.add_argument("--cores", type=int, nargs="+", default=[8, 32, 128], help="core counts to simulate")
+    args = parser.parse_args()
+
+    for num_cores in args.cores:
+        run(num_cores, args.number)
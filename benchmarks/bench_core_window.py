@@ -0,0 +1,90 @@
+"""Cost of CPUCoreWindow._update_cpu_cores on many-core hosts: a QLCDNumber
+per core with cached, change-only styles, as before, against the single
+heatmap image. Runs without a display.
+
+Run from the project root with:
+    uv run python -m benchmarks.bench_core_window
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication, QGridLayout, QLCDNumber, QWidget
+
+import hwmonitorGUI
+import utils
+
+
+class LegacyCPUCoreWindow(QWidget):
+    """The QLCDNumber grid core window as implemented before the heatmap."""
+    COLUMNS_PER_ROW = 5
+
+    def __init__(self):
+        super().__init__()
+        self.layout = QGridLayout()
+        self.qlcd_widgets = []
+        self.setLayout(self.layout)
+        self.resize(600, 400)
+
+    def _update_cpu_cores(self, readings):
+        if not self.qlcd_widgets:
+            NUM_CORES = len(readings["cpu"]["cores"]["utilization"])
+            NUM_ROWS = max(1, NUM_CORES//LegacyCPUCoreWindow.COLUMNS_PER_ROW)
+            for row in range(NUM_ROWS):
+                for col in range(LegacyCPUCoreWindow.COLUMNS_PER_ROW):
+                    qlcd = QLCDNumber(self)
+                    qlcd.setDigitCount(2)
+                    qlcd.setSegmentStyle(QLCDNumber.Flat)
+                    self.layout.addWidget(qlcd, row+2, col)
+                    self.qlcd_widgets.append(qlcd)
+
+        for i, qlcd in enumerate(self.qlcd_widgets):
+            try:
+                val = readings["cpu"]["cores"]["utilization"][i]
+            except IndexError:
+                val = 0
+            qlcd.display(val)
+            utils.set_style_sheet(qlcd, utils.get_cached_cpu_utilization_style(val))
+
+def make_samples(num_cores, count):
+    """Per-core utilization drifting by a few percent between samples."""
+    utilization = [random.randint(0, 100) for _ in range(num_cores)]
+    samples = []
+    for _ in range(count):
+        utilization = [min(100, max(0, u + random.randint(-5, 5))) for u in utilization]
+        samples.append({"cpu": {"cores": {"utilization": utilization, "frequency": [], "temperature": []}}})
+    return samples
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CPU core window benchmark")
+    parser.add_argument("--cores", type=int, nargs="+", default=[128, 256])
+    parser.add_argument("--samples", type=int, default=100)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    random.seed(0)
+
+    for num_cores in args.cores:
+        samples = make_samples(num_cores, args.samples)
+        print(f"{num_cores} cores, {args.samples} updates")
+        results = {}
+        for name, window_class in [("qlcd", LegacyCPUCoreWindow), ("heatmap", hwmonitorGUI.CPUCoreWindow)]:
+            window = window_class()
+            window.show()
+            window._update_cpu_cores(samples[0])  # build the grid
+            app.processEvents()
+
+            def run():
+                for readings in samples:
+                    window._update_cpu_cores(readings)
+                    app.processEvents()
+
+            results[name] = min(timeit.repeat(run, number=1, repeat=3)) / args.samples
+            print(f"  {name:<8} {results[name]*1000:.3f}ms per update")
+            window.close()
+        print(f"  speedup {results['qlcd']/results['heatmap']:.2f}x")
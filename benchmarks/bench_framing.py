@@ -0,0 +1,73 @@
+"""Throughput benchmark for the length-prefixed socket framing.
+
+Streams framed messages over a local socket pair and drains them on the
+receiving end the same way LocalNetworkWorker does.
+
+Run from the project root with:
+    uv run python -m benchmarks.bench_framing
+"""
+import argparse
+import socket
+import threading
+import time
+
+from transport import framing
+from message_models import CPUCoreInfo, CPUInfo, MessageModel
+
+
+def make_message(num_cores):
+    """Create a representative message for a host with num_cores cores."""
+    return MessageModel(
+        cpu=CPUInfo(
+            utilization=37,
+            frequency=3400,
+            temperature=54,
+            load_average_1min=2.34,
+            cores=CPUCoreInfo(
+                utilization=[i % 100 for i in range(num_cores)],
+                frequency=[3400 + i for i in range(num_cores)],
+                temperature=[50 + i % 20 for i in range(num_cores//2)]
+            )
+        )
+    )
+
+def run(num_frames, num_cores):
+    payload = make_message(num_cores).model_dump_json().encode()
+    frame = framing.encode_frame(payload)
+
+    sender, receiver = socket.socketpair()
+
+    def send():
+        with sender:
+            for _ in range(num_frames):
+                sender.sendall(frame)
+
+    received = 0
+    wakeups = 0
+    decoder = framing.FrameDecoder()
+    thread = threading.Thread(target=send)
+
+    start = time.perf_counter()
+    thread.start()
+    with receiver:
+        while decoder.recv_from(receiver):
+            wakeups += 1
+            for f in decoder.frames():
+                received += 1
+    elapsed = time.perf_counter() - start
+    thread.join()
+
+    assert received == num_frames, f"expected {num_frames} frames, got {received}"
+    print(f"{num_cores} cores, {len(payload)}B payload:")
+    print(f"  {received} frames in {elapsed:.3f}s ({received/elapsed:,.0f} frames/s, {wakeups} reads)")
+    print(f"  {received*len(frame)/elapsed/10**6:.1f} MB/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Socket framing throughput benchmark")
+    parser.add_argument("--frames", type=int, default=100_000, help="number of frames to send")
+    parser.add_argument("--cores", type=int, nargs="+", default=[8, 32, 128], help="core counts to simulate")
+    args = parser.parse_args()
+
+    for num_cores in args.cores:
+        run(args.frames, num_cores)
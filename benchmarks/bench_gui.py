@@ -0,0 +1,162 @@
+"""Headless benchmark of the monitor windows: replays a synthetic message stream
+to MainWindow, with the CPUCoreWindow shown, at a set message rate and core count.
+Reports per scenario:
+ * update_readings latency, p50 and p99
+ * time to update the widgets of a frame (render_frame) and to paint them, p50 and p99
+ * growth of the resident memory over the run
+
+Messages are fed as fast as possible, but with timestamps and frames spaced as
+if arriving at the set rate with the display drawing at max_fps.
+
+Results can be saved as a JSON baseline and later runs compared against it,
+exiting with a non-zero status on a regression, eg. in CI. Generate the baseline
+with the locked dependencies on the Python version of CI:
+    uv run --frozen --python 3.10 python -m benchmarks.bench_gui --output benchmarks/baseline_gui.json
+    uv run python -m benchmarks.bench_gui --baseline benchmarks/baseline_gui.json --tolerance 3
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from unittest.mock import Mock
+
+import numpy as np
+import psutil
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pyqtgraph as pg
+from PyQt5.QtCore import PYQT_VERSION_STR, QT_VERSION_STR
+from PyQt5.QtWidgets import QApplication
+
+import hwmonitorGUI
+from benchmarks.bench_framing import make_message
+
+
+# Absolute slack of each metric kind when comparing against a baseline,
+# so that small values don't fail on noise
+SLACK = {"ms": 0.5, "mb": 5.0}
+
+
+def run_scenario(app, num_cores, rate, num_messages, max_fps, warmup):
+    """Replay num_messages messages of num_cores cores at rate messages per second.
+    Return:
+        a dict of metric: value pairs
+    """
+    window = hwmonitorGUI.MainWindow(transport_worker_class=Mock)
+    window.show()
+    window.core_window.show()
+    process = psutil.Process()
+
+    readings = make_message(num_cores).model_dump()
+    rng = np.random.default_rng(0)
+    messages_per_frame = max(1, round(rate / max_fps))
+    start = time.time()
+    timings = {"update": [], "render": [], "paint": []}
+
+    for i in range(warmup + num_messages):
+        if i == warmup:
+            rss_start = process.memory_info().rss
+            for values in timings.values():
+                values.clear()
+
+        readings["timestamp"] = start + i / rate
+        readings["cpu"]["utilization"] = int(rng.integers(0, 101))
+        readings["cpu"]["cores"]["utilization"] = rng.integers(0, 101, num_cores).tolist()
+
+        t = time.perf_counter()
+        window.update_readings(readings)
+        timings["update"].append(time.perf_counter() - t)
+
+        if (i + 1) % messages_per_frame == 0:
+            t = time.perf_counter()
+            window.render_frame()
+            timings["render"].append(time.perf_counter() - t)
+
+            # Graphics views paint on the next event loop iteration
+            t = time.perf_counter()
+            app.processEvents()
+            timings["paint"].append(time.perf_counter() - t)
+
+    results = {}
+    for name, values in timings.items():
+        ms = np.array(values) * 1000
+        results[f"{name}_p50_ms"] = round(float(np.percentile(ms, 50)), 3)
+        results[f"{name}_p99_ms"] = round(float(np.percentile(ms, 99)), 3)
+    results["memory_growth_mb"] = round((process.memory_info().rss - rss_start) / 2**20, 2)
+
+    window.core_window.close()
+    window.close()
+    return results
+
+def compare(results, baseline, tolerance):
+    """Compare results against a baseline.
+    Return:
+        a list of regression descriptions, empty if none
+    """
+    regressions = []
+    for scenario, metrics in baseline["scenarios"].items():
+        if scenario not in results["scenarios"]:
+            continue
+        for metric, expected in metrics.items():
+            value = results["scenarios"][scenario][metric]
+            limit = expected * tolerance + SLACK[metric.rsplit("_", 1)[1]]
+            if value > limit:
+                regressions.append(f"{scenario} {metric}: {value} > {limit:.3f} (baseline {expected})")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless GUI benchmark")
+    parser.add_argument("--cores", type=int, nargs="+", default=[16, 128])
+    parser.add_argument("--rates", type=float, nargs="+", default=[1, 100], help="messages per second")
+    parser.add_argument("--messages", type=int, default=500, help="messages per scenario")
+    parser.add_argument("--warmup", type=int, default=50, help="messages before measuring")
+    parser.add_argument("--max-fps", type=int, default=10)
+    parser.add_argument("--output", help="save the results as JSON")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=2.0, help="allowed slowdown factor against the baseline")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    results = {
+        "environment": {
+            "python": platform.python_version(),
+            "qt": QT_VERSION_STR,
+            "pyqt": PYQT_VERSION_STR,
+            "pyqtgraph": pg.__version__,
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+        },
+        "settings": {"messages": args.messages, "warmup": args.warmup, "max_fps": args.max_fps},
+        "scenarios": {},
+    }
+    for num_cores in args.cores:
+        for rate in args.rates:
+            scenario = f"{num_cores}cores_{rate:g}hz"
+            metrics = run_scenario(app, num_cores, rate, args.messages, args.max_fps, args.warmup)
+            results["scenarios"][scenario] = metrics
+            print(f"{scenario}:")
+            for name in ("update", "render", "paint"):
+                print(f"  {name:<14} p50={metrics[f'{name}_p50_ms']:.3f}ms p99={metrics[f'{name}_p99_ms']:.3f}ms")
+            print(f"  memory growth  {metrics['memory_growth_mb']:.2f}MB")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        # Timings are only comparable on the same runtime and libraries
+        for key, value in results["environment"].items():
+            if key != "machine" and baseline["environment"].get(key) != value:
+                print(f"WARNING baseline {key} {baseline['environment'].get(key)} differs from {value}")
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        print(f"{len(regressions)} regressions against {args.baseline} at {args.tolerance:g}x tolerance")
+        sys.exit(1 if regressions else 0)
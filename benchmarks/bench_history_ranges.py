@@ -0,0 +1,86 @@
+"""Time to redraw the utilization graph at each time range, with 7 days of
+history at 1 sample per second. Shown for comparison is the time to draw the
+full resolution history of the longest range without rollups.
+
+The budget defaults to a quarter of a frame at 10 fps, leaving headroom for a
+Raspberry Pi class CPU being several times slower than a desktop core.
+Runs without a display.
+
+Run from the project root with:
+    uv run python -m benchmarks.bench_history_ranges
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from unittest.mock import Mock
+
+import numpy as np
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+
+import hwmonitorGUI
+from history_store import RECORD
+
+
+def make_records(seconds, interval):
+    rng = np.random.default_rng(0)
+    timestamps = time.time() - np.arange(seconds / interval)[::-1] * interval
+    records = np.zeros(len(timestamps), dtype=RECORD)
+    records["timestamp"] = timestamps
+    records["host"] = 0
+    for key in ("cpu", "gpu"):
+        values = rng.uniform(0, 60, len(records))
+        records[f"{key}_utilization"] = values
+        records[f"{key}_utilization_min"] = values - 5
+        records[f"{key}_utilization_max"] = values + rng.exponential(5, len(records))
+    return records
+
+def time_redraw(app, redraw, repeat):
+    timings = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        redraw()
+        app.processEvents()
+        timings.append(time.perf_counter() - t)
+    return statistics.median(timings)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Utilization graph time range benchmark")
+    parser.add_argument("--days", type=float, default=7)
+    parser.add_argument("--interval", type=float, default=1, help="seconds between samples")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--budget", type=float, default=25, help="redraw budget in ms")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    window = hwmonitorGUI.MainWindow(transport_worker_class=Mock)
+    window.show()
+
+    records = make_records(args.days * 24 * 3600, args.interval)
+    t = time.perf_counter()
+    window.host_store.restore(records, ["host-00"])
+    print(f"Restored {len(records)} samples in {(time.perf_counter() - t)*1000:.0f}ms")
+    state = window.host_store["host-00"]
+
+    for name in window.history_ranges:
+        window.set_history_range(name)
+        points = len(state.series("cpu", window.history_span)[0])
+        ms = time_redraw(app, lambda: window._update_utilization_graphs(state), args.repeat) * 1000
+        status = "ok" if ms <= args.budget else "OVER BUDGET"
+        print(f"  {name:<6} {points:>7} points  {ms:6.2f}ms per redraw  [{status}]")
+
+    # Baseline: every sample of the longest range, drawn as is
+    plot = window.utilization_plots["cpu"]
+    plot.setDownsampling(auto=False)
+    for curve in window.utilization_bands["cpu"]:
+        curve.setVisible(False)
+    x, y = records["timestamp"], records["cpu_utilization"].astype(float)
+    ms = time_redraw(app, lambda: plot.setData(x, y), 3) * 1000
+    print(f"  full resolution {name}: {len(x)} points  {ms:.2f}ms per redraw")
+    print(f"Budget: {args.budget:g}ms")
+    window.close()
@@ -0,0 +1,90 @@
+"""Ingest rate of the on-disk history store, and the time to load the recent
+history of a store with several days of data, as on startup of the monitor.
+Restoring the history from the window and the stored rollup buckets is compared with
+restoring it from the records of the longest time range, and loading the window
+from a JSON lines file of the messages is shown for comparison.
+
+Run from the project root with:
+    uv run python -m benchmarks.bench_history_store
+"""
+import argparse
+import json
+import tempfile
+import time
+from unittest.mock import patch
+
+from benchmarks.bench_framing import make_message
+import rollup
+from history_store import HistoryStore
+from host_store import HostStore
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="History store benchmark")
+    parser.add_argument("--days", type=float, default=7, help="days of stored history")
+    parser.add_argument("--hosts", type=int, default=2)
+    parser.add_argument("--interval", type=float, default=1, help="seconds between messages of a host")
+    parser.add_argument("--window", type=float, default=5, help="minutes of history to load")
+    parser.add_argument("--cores", type=int, default=16)
+    args = parser.parse_args()
+
+    messages = []
+    for i in range(args.hosts):
+        msg = make_message(args.cores)
+        msg.host = f"host-{i:02d}"
+        messages.append(msg.model_dump())
+
+    num_samples = int(args.days * 24 * 3600 / args.interval)
+    start = time.time() - num_samples * args.interval
+
+    with tempfile.TemporaryDirectory() as path:
+        store = HistoryStore(path)
+        t = time.perf_counter()
+        # Segments are started by the time of writing: write as if receiving the messages live
+        with patch("history_store.time.time", lambda: messages[0]["timestamp"]):
+            for i in range(num_samples):
+                for readings in messages:
+                    readings["timestamp"] = start + i * args.interval
+                    store.append(readings)
+        store.close()
+        elapsed = time.perf_counter() - t
+        records = num_samples * args.hosts
+        print(f"Ingest: {records} records in {elapsed:.1f}s, {records/elapsed:,.0f} records/s, {store.syncs} syncs")
+
+        since = time.time() - args.window * 60
+        t = time.perf_counter()
+        loaded = HistoryStore(path).load(since)
+        elapsed = time.perf_counter() - t
+        print(f"Load {args.window:g} minutes: {len(loaded)} records in {elapsed*1000:.2f}ms")
+
+        # Startup: the window and the rollup buckets, restored to the host states
+        num_datapoints = int(args.window * 60 / args.interval)
+        t = time.perf_counter()
+        history = HistoryStore(path)
+        loaded, rollups = history.load_history(args.window * 60)
+        HostStore(num_datapoints, args.interval).restore(loaded, history.hosts, rollups)
+        elapsed = time.perf_counter() - t
+        buckets = sum(len(level) for level in rollups.values())
+        print(f"Startup restore: {len(loaded)} records and {buckets} rollup buckets in {elapsed*1000:.2f}ms")
+
+        # Baseline: rollups built from the records of the longest time range
+        t = time.perf_counter()
+        history = HistoryStore(path)
+        loaded = history.load(time.time() - rollup.LEVELS[-1][1])
+        HostStore(num_datapoints, args.interval).restore(loaded, history.hosts)
+        elapsed = time.perf_counter() - t
+        print(f"Startup restore from records only: {len(loaded)} records in {elapsed*1000:.2f}ms")
+
+        # Baseline: the same window from JSON lines, one per message
+        json_path = f"{path}/history.jsonl"
+        with open(json_path, "w") as f:
+            window_start = max(0, num_samples - int(args.window * 60 / args.interval) - 1)
+            for i in range(window_start, num_samples):
+                for readings in messages:
+                    readings["timestamp"] = start + i * args.interval
+                    f.write(json.dumps(readings) + "\n")
+        t = time.perf_counter()
+        with open(json_path) as f:
+            loaded = [readings for readings in map(json.loads, f) if readings["timestamp"] >= since]
+        elapsed = time.perf_counter() - t
+        print(f"Load {args.window:g} minutes from JSON lines (window only): {len(loaded)} records in {elapsed*1000:.2f}ms")
@@ -0,0 +1,52 @@
+"""Per-sample cost of collecting CPU and RAM readings: the previous
+implementation, which queried psutil separately for each derived field,
+against the current single snapshot per sample.
+
+GPU collection is excluded as it depends on the installed device libraries.
+
+Run from the project root with:
+    uv run python -m benchmarks.bench_hw_stats
+"""
+import argparse
+import timeit
+
+import psutil
+
+from transport import hw_stats
+import message_models
+
+
+def legacy_sample():
+    """The CPU and RAM collection as implemented before single-pass snapshots."""
+    cpu = message_models.CPUInfo(
+        cores=message_models.CPUCoreInfo(
+            utilization=list(map(int, psutil.cpu_percent(percpu=True))),
+            frequency=[int(item.current) for item in psutil.cpu_freq(percpu=True)],
+            temperature=[int(t.value) for t in hw_stats._get_cpu_temps() if "Core" in t.label]
+        ),
+        utilization=int(psutil.cpu_percent()),
+        frequency=int(psutil.cpu_freq().current),
+        temperature=int(hw_stats._get_cpu_temps()[-1].value),
+        load_average_1min=psutil.getloadavg()[0],
+        num_high_load_cores=len([c for c in psutil.cpu_percent(percpu=True) if c > 50])
+    )
+    ram = hw_stats._get_ram_info()
+    return cpu, ram
+
+def snapshot_sample():
+    snapshot = hw_stats._take_snapshot()
+    return hw_stats._get_cpu_info(snapshot), hw_stats._get_ram_info(snapshot)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hardware stats collection benchmark")
+    parser.add_argument("--number", type=int, default=500, help="samples per measurement")
+    args = parser.parse_args()
+
+    print(f"{psutil.cpu_count()} logical CPUs, {args.number} samples")
+    results = {}
+    for name, func in [("legacy", legacy_sample), ("snapshot", snapshot_sample)]:
+        func()  # warm up psutil's internal state
+        results[name] = min(timeit.repeat(func, number=args.number, repeat=3)) / args.number
+        print(f"  {name:<9} {results[name]*1000:.3f}ms per sample")
+    print(f"  speedup   {results['legacy']/results['snapshot']:.2f}x")
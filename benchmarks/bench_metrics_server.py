@@ -0,0 +1,93 @@
+"""Load test of the poller's OpenMetrics endpoint: scrapers in separate processes
+request the metrics as fast as they can over keep-alive connections, while the
+poller keeps sampling and encoding messages on its schedule.
+
+Reports the scrape rate and latency, and the sampling cost and jitter with and
+without the scrape load. Exits with a non-zero status if the scrape rate is below --min-rate.
+
+Run from the project root with:
+    uv run python -m benchmarks.bench_metrics_server
+"""
+import argparse
+import http.client
+import multiprocessing
+import statistics
+import sys
+import time
+
+from transport import codec
+from transport.base_publisher import BasePublisher
+from transport.metrics_server import MetricsServer
+from transport.scheduler import Scheduler
+
+
+def scrape(port, seconds, results):
+    """Scrape the server back to back for a number of seconds."""
+    client = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    while (start := time.perf_counter()) < deadline:
+        client.request("GET", "/metrics")
+        client.getresponse().read()
+        latencies.append(time.perf_counter() - start)
+    results.put(latencies)
+
+
+def publish(publisher, interval, seconds):
+    """Sample and encode messages on schedule, like a publisher without a network.
+    Return:
+        the scheduler and the collect and encode times in seconds
+    """
+    scheduler = Scheduler(interval)
+    durations = []
+    deadline = time.monotonic() + seconds
+    while scheduler.wait() < deadline:
+        start = time.perf_counter()
+        codec.encode(publisher.collect(), "binary")
+        durations.append(time.perf_counter() - start)
+    return scheduler, durations
+
+
+def report(label, scheduler, durations):
+    ms = sorted(d * 1000 for d in durations)
+    print(f"  {label:<12} {len(ms)} samples  collect+encode p50={statistics.median(ms):.2f}ms "
+          f"max={ms[-1]:.2f}ms  {scheduler}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Metrics endpoint load test")
+    parser.add_argument("--scrapers", type=int, default=4, help="number of scraper processes")
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--interval", type=float, default=0.5, help="seconds between samples")
+    parser.add_argument("--min-rate", type=float, default=1000, help="required scrapes per second")
+    args = parser.parse_args()
+
+    server = MetricsServer("127.0.0.1", 0)
+    server.start()
+    publisher = BasePublisher()
+    publisher.metrics_server = server
+    publisher.collect()  # initialize the collectors
+
+    print(f"Sampling every {args.interval}s for {args.seconds}s:")
+    report("idle", *publish(publisher, args.interval, args.seconds))
+
+    results = multiprocessing.Queue()
+    scrapers = [
+        multiprocessing.Process(target=scrape, args=(server.port, args.seconds, results))
+        for _ in range(args.scrapers)
+    ]
+    for process in scrapers:
+        process.start()
+    report(f"{args.scrapers} scrapers", *publish(publisher, args.interval, args.seconds))
+
+    latencies = sorted(l * 1000 for _ in scrapers for l in results.get())
+    for process in scrapers:
+        process.join()
+    server.stop()
+
+    rate = len(latencies) / args.seconds
+    p99 = latencies[int(len(latencies) * 0.99)]
+    print(f"Scrapes: {len(latencies)} ({rate:.0f}/s) of {len(server.response)}B, "
+          f"latency p50={statistics.median(latencies):.3f}ms p99={p99:.3f}ms")
+    print(f"Snapshots rendered: {server.updates}")
+    sys.exit(0 if rate >= args.min_rate else 1)
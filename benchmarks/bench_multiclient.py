@@ -0,0 +1,86 @@
+"""Load test for the LAN receive server: many simultaneous fake pollers
+each sending framed messages, measuring per-message receive latency
+(time from send to the decoded readings reaching the callback).
+
+Run from the project root with:
+    uv run python -m benchmarks.bench_multiclient
+"""
+import argparse
+import socket
+import statistics
+import threading
+import time
+
+from transport import codec, framing
+from transport.delta import DeltaEncoder
+from transport.socket_server import FrameServer
+from benchmarks.bench_framing import make_message
+
+
+def poller(port, num_messages, interval, num_cores, encoding, start_barrier, offset):
+    msg = make_message(num_cores)
+    encoder = DeltaEncoder(keyframe_interval=15)
+    with socket.create_connection(("127.0.0.1", port)) as s:
+        start_barrier.wait()
+        # Spread pollers evenly over the interval
+        time.sleep(interval * offset)
+        for _ in range(num_messages):
+            msg.timestamp = time.time()
+            s.sendall(framing.encode_frame(codec.encode(encoder.encode(msg), encoding)))
+            time.sleep(interval)
+
+def run(args):
+    latencies = []
+    lock = threading.Lock()
+
+    def on_message(readings):
+        latency = time.time() - readings["timestamp"]
+        with lock:
+            latencies.append(latency)
+
+    server = FrameServer("127.0.0.1", 0, on_message, encoding=args.encoding, idle_timeout=10)
+    server_thread = threading.Thread(target=server.run, daemon=True)
+    server_thread.start()
+    server.ready.wait()
+
+    barrier = threading.Barrier(args.clients)
+    threads = [
+        threading.Thread(
+            target=poller,
+            args=(server.port, args.messages, args.interval, args.cores, args.encoding, barrier, i/args.clients)
+        )
+        for i in range(args.clients)
+    ]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    expected = args.clients * args.messages
+    deadline = time.monotonic() + 10
+    while len(latencies) < expected and time.monotonic() < deadline:
+        time.sleep(0.01)
+    elapsed = time.perf_counter() - start
+
+    server.stop()
+    server_thread.join()
+
+    latencies.sort()
+    ms = [x * 1000 for x in latencies]
+    print(f"{args.clients} pollers x {args.messages} messages, {args.cores} cores, {args.encoding}:")
+    print(f"  received {len(latencies)}/{expected} in {elapsed:.2f}s ({len(latencies)/elapsed:,.0f} msg/s)")
+    print(f"  latency p50={statistics.median(ms):.2f}ms "
+          f"p99={ms[int(len(ms)*0.99)-1]:.2f}ms max={ms[-1]:.2f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multi-client receive server load test")
+    parser.add_argument("--clients", type=int, default=100, help="number of simultaneous pollers")
+    parser.add_argument("--messages", type=int, default=50, help="messages sent per poller")
+    parser.add_argument("--interval", type=float, default=0.1, help="seconds between messages per poller")
+    parser.add_argument("--cores", type=int, default=32, help="cores per simulated host")
+    parser.add_argument("--encoding", choices=codec.ENCODINGS, default="binary")
+    args = parser.parse_args()
+
+    run(args)
@@ -0,0 +1,71 @@
+"""Measure MainWindow.update_readings cost with many hosts reporting
+to the same monitor, and the cost of drawing the frame following them.
+Runs without a display.
+
+Run from the project root with:
+    uv run python -m benchmarks.bench_multihost
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from unittest.mock import Mock
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+
+import hwmonitorGUI
+from benchmarks.bench_framing import make_message
+
+
+def run(num_hosts, seconds, num_cores):
+    app = QApplication.instance() or QApplication(sys.argv)
+    window = hwmonitorGUI.MainWindow(transport_worker_class=Mock)
+    window.show()
+
+    messages = []
+    for i in range(num_hosts):
+        msg = make_message(num_cores)
+        msg.host = f"host-{i:02d}"
+        messages.append(msg.model_dump())
+
+    # Simulate each host publishing once per second
+    timings = {"active": [], "background": [], "frame": []}
+    start = time.time()
+    for second in range(seconds):
+        for readings in messages:
+            readings["timestamp"] = start + second
+            readings["cpu"]["utilization"] = (second * 7) % 100
+
+            t = time.perf_counter()
+            window.update_readings(readings)
+            app.processEvents()
+            kind = "active" if readings["host"] == window.active_host else "background"
+            timings[kind].append(time.perf_counter() - t)
+
+        t = time.perf_counter()
+        window.render_frame()
+        app.processEvents()
+        timings["frame"].append(time.perf_counter() - t)
+
+    total = sum(sum(values) for values in timings.values())
+    print(f"{num_hosts} hosts, {seconds} simulated seconds, {num_cores} cores:")
+    for kind, values in timings.items():
+        ms = sorted(v * 1000 for v in values)
+        print(f"  {kind:<10} p50={statistics.median(ms):.3f}ms max={ms[-1]:.3f}ms")
+    print(f"  GUI thread busy {total/seconds*100:.1f}% of each second")
+    cache = window.render_cache
+    print(f"  widget updates: {cache.applied} applied, {cache.skipped} skipped as unchanged")
+    window.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multi-host display benchmark")
+    parser.add_argument("--hosts", type=int, default=25)
+    parser.add_argument("--seconds", type=int, default=30)
+    parser.add_argument("--cores", type=int, default=16)
+    args = parser.parse_args()
+
+    run(args.hosts, args.seconds, args.cores)
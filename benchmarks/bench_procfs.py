@@ -0,0 +1,35 @@
+"""Per-sample cost of the psutil backend against the direct /proc and /sys
+reader (backend="procfs") for the CPU and RAM readings. Linux only.
+
+Run from the project root with:
+    uv run python -m benchmarks.bench_procfs
+"""
+import argparse
+import timeit
+
+import psutil
+
+from transport import hw_stats
+from transport.procfs import ProcfsReader
+
+
+def sample():
+    snapshot = hw_stats._take_snapshot()
+    return hw_stats._get_cpu_info(snapshot), hw_stats._get_ram_info(snapshot)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hardware stats backend benchmark")
+    parser.add_argument("--number", type=int, default=500, help="samples per measurement")
+    args = parser.parse_args()
+
+    print(f"{psutil.cpu_count()} logical CPUs, {args.number} samples")
+    hw_stats.PROCFS_READER_LOADED = True
+    results = {}
+    for name, reader in [("psutil", None), ("procfs", ProcfsReader())]:
+        hw_stats.procfs_reader = reader
+        hw_stats.cpu_usage = None
+        sample()  # warm up
+        results[name] = min(timeit.repeat(sample, number=args.number, repeat=3)) / args.number
+        print(f"  {name:<7} {results[name]*1000:.3f}ms per sample")
+    print(f"  speedup {results['psutil']/results['procfs']:.2f}x")
@@ -0,0 +1,77 @@
+"""CPU usage of the monitor under a synthetic message rate, eg. a reconnect
+flush or a Pub/Sub backlog, drawing every message against frame-rate-limited
+drawing. Runs the Qt event loop without a display.
+
+Run from the project root with:
+    uv run python -m benchmarks.bench_render_rate
+"""
+import argparse
+import os
+import sys
+import time
+from unittest.mock import Mock
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QApplication
+
+import hwmonitorGUI
+from benchmarks.bench_framing import make_message
+
+
+def run(rate, seconds, num_cores, max_fps):
+    """Feed rate messages per second to a MainWindow for the given time.
+    Args:
+        max_fps (int): frame rate limit, 0 to draw every message as it arrives
+    Return:
+        a tuple of CPU usage as a fraction of a core and the number of frames drawn
+    """
+    app = QApplication.instance() or QApplication(sys.argv)
+    window = hwmonitorGUI.MainWindow(transport_worker_class=Mock)
+    window.show()
+    if max_fps:
+        render_timer = QTimer()
+        render_timer.timeout.connect(window.render_frame)
+        render_timer.start(int(1000 / max_fps))
+
+    readings = make_message(num_cores).model_dump()
+    start = time.time()
+    count = 0
+
+    def send():
+        nonlocal count
+        count += 1
+        readings["timestamp"] = start + count / rate
+        readings["cpu"]["utilization"] = count % 100
+        window.update_readings(readings)
+        if not max_fps:
+            window.render_frame()
+
+    feed_timer = QTimer()
+    feed_timer.timeout.connect(send)
+    feed_timer.start(int(1000 / rate))
+    QTimer.singleShot(int(seconds * 1000), app.quit)
+
+    cpu_start = time.process_time()
+    wall_start = time.monotonic()
+    app.exec_()
+    cpu_usage = (time.process_time() - cpu_start) / (time.monotonic() - wall_start)
+
+    feed_timer.stop()
+    window.close()
+    return cpu_usage, window.frames_rendered, window.messages_received
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Message rate display benchmark")
+    parser.add_argument("--rate", type=int, default=100, help="messages per second")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--cores", type=int, default=16)
+    parser.add_argument("--max-fps", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{args.rate} msg/s for {args.seconds:.0f}s, {args.cores} cores:")
+    for label, max_fps in [("every message", 0), (f"max {args.max_fps} fps", args.max_fps)]:
+        cpu_usage, frames, messages = run(args.rate, args.seconds, args.cores, max_fps)
+        print(f"  {label:<14} CPU {cpu_usage*100:5.1f}%  {frames} frames for {messages} messages")
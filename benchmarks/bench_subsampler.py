@@ -0,0 +1,47 @@
+"""CPU overhead of sub-interval sampling with the cheap collectors of this machine,
+checked against a budget given as a percentage of a single core.
+Exits with a non-zero status if any sample rate exceeds the budget.
+
+GPU collectors are included only if a GPU handle can be initialized.
+
+Run from the project root with:
+    uv run python -m benchmarks.bench_subsampler
+"""
+import argparse
+import sys
+import time
+
+from transport import hw_stats
+from transport.subsampler import SubSampler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sub-interval sampling overhead benchmark")
+    parser.add_argument("--rates", type=float, nargs="+", default=[10, 20, 50], help="sample rates in Hz")
+    parser.add_argument("--seconds", type=float, default=5, help="measurement time per rate")
+    parser.add_argument("--budget", type=float, default=2.0, help="allowed overhead in percent of a core")
+    args = parser.parse_args()
+
+    hw_stats._get_gpus_info()  # initialize the GPU handles, if any
+    collectors = hw_stats._get_subsample_collectors()
+    print(f"Collectors: {', '.join(collectors)}")
+
+    over_budget = False
+    for rate in args.rates:
+        sampler = SubSampler(rate, collectors)
+        sampler.start()
+        time.sleep(args.seconds)
+        sampler.stop()
+
+        aggregates = sampler.collect()
+        samples = round(sampler.wall_time * rate)
+        overhead = sampler.overhead * 100
+        per_sample = sampler.cpu_time / samples * 10**6 if samples else 0
+        status = "ok" if overhead <= args.budget else "OVER BUDGET"
+        over_budget |= overhead > args.budget
+        print(f"  {rate:>5.0f}Hz  {overhead:.2f}% of a core  {per_sample:.0f}µs per sample  [{status}]")
+        for name, aggregate in aggregates.items():
+            print(f"         {name:<16} min={aggregate.min:.1f} max={aggregate.max:.1f} mean={aggregate.mean:.1f}")
+
+    print(f"Budget: {args.budget:.1f}% of a core")
+    sys.exit(1 if over_budget else 0)
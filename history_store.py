@@ -0,0 +1,527 @@
+import glob
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+
+import numpy as np
+
+import rollup
+
+
+logger = logging.getLogger()
+
+# Fixed size record of the scalar readings of a message. Per-core readings are not stored.
+# Hosts are stored as an index to the host table of the store.
+RECORD = np.dtype([
+    ("timestamp", "<f8"),
+    ("host", "<u2"),
+    ("cpu_utilization", "<f4"),
+    ("cpu_utilization_min", "<f4"),
+    ("cpu_utilization_max", "<f4"),
+    ("cpu_frequency", "<f4"),
+    ("cpu_temperature", "<f4"),
+    ("load_average_1min", "<f4"),
+    ("gpu_utilization", "<f4"),
+    ("gpu_utilization_min", "<f4"),
+    ("gpu_utilization_max", "<f4"),
+    ("gpu_temperature", "<f4"),
+    ("gpu_mem_used", "<f4"),
+    ("gpu_mem_total", "<f4"),
+    ("ram_used", "<f4"),
+    ("ram_total", "<f4"),
+])
+
+# A bucket of the min/max/mean utilization rollup of a host at a single rollup level.
+# count is the number of samples in the bucket, for merging a bucket stored in parts.
+ROLLUP_RECORD = np.dtype([
+    ("timestamp", "<f8"),  # start of the bucket
+    ("host", "<u2"),
+    ("count", "<u4"),
+    ("cpu_mean", "<f4"),
+    ("cpu_min", "<f4"),
+    ("cpu_max", "<f4"),
+    ("gpu_mean", "<f4"),
+    ("gpu_min", "<f4"),
+    ("gpu_max", "<f4"),
+])
+
+# Segment file header: magic, format version, record size and the time the segment was started,
+# padded to HEADER_SIZE bytes
+HEADER = struct.Struct("<4sHHd")
+HEADER_SIZE = 64
+MAGIC = b"HWMH"
+VERSION = 2
+SUFFIX = ".hist"
+# Host names by index, as a JSON string per line
+HOSTS_FILE = "hosts.jsonl"
+# Marker file of a store closed cleanly, with every rollup bucket stored
+CLOSED_FILE = "closed"
+# Positions of the CPU and GPU utilization in a RECORD tuple, followed by their min and max
+_UTILIZATION_FIELDS = (RECORD.names.index("cpu_utilization"), RECORD.names.index("gpu_utilization"))
+
+
+def to_record(readings, host):
+    """Convert a readings dict to a RECORD tuple.
+    Args:
+        readings (dict): readings as received from the poller
+        host (int): index of the reporting host in the host table
+    Return:
+        a tuple of the RECORD fields
+    """
+    cpu, gpu, ram = readings["cpu"], readings["gpu"], readings["ram"]
+    # Publishers without sub-sampling don't send aggregates
+    cpu_stats = cpu.get("utilization_stats") or {}
+    gpu_stats = gpu.get("utilization_stats") or {}
+    return (
+        readings["timestamp"],
+        host,
+        cpu["utilization"],
+        cpu_stats.get("min", cpu["utilization"]),
+        cpu_stats.get("max", cpu["utilization"]),
+        cpu["frequency"],
+        cpu["temperature"],
+        cpu["load_average_1min"],
+        gpu["utilization"],
+        gpu_stats.get("min", gpu["utilization"]),
+        gpu_stats.get("max", gpu["utilization"]),
+        gpu["temperature"],
+        gpu["mem_used"],
+        gpu["mem_total"],
+        ram["used"],
+        ram["total"],
+    )
+
+
+def to_rollup_records(records, resolution):
+    """Aggregate records into rollup buckets of every host.
+    Args:
+        records (np.ndarray): RECORD records
+        resolution (int): bucket size in seconds
+    Return:
+        a ROLLUP_RECORD array in bucket order
+    """
+    records = records[np.lexsort((records["timestamp"], records["host"]))]
+    buckets = records["timestamp"] // resolution
+    changes = (np.diff(buckets) != 0) | (np.diff(records["host"]) != 0)
+    starts = np.concatenate([[0], np.flatnonzero(changes) + 1]).astype(int)
+
+    rollups = np.empty(len(starts), dtype=ROLLUP_RECORD)
+    rollups["timestamp"] = buckets[starts] * resolution
+    rollups["host"] = records["host"][starts]
+    rollups["count"] = np.diff(np.append(starts, len(records)))
+    for key in ("cpu", "gpu"):
+        rollups[f"{key}_mean"] = np.add.reduceat(records[f"{key}_utilization"], starts, dtype=float) / rollups["count"]
+        rollups[f"{key}_min"] = np.minimum.reduceat(records[f"{key}_utilization_min"], starts)
+        rollups[f"{key}_max"] = np.maximum.reduceat(records[f"{key}_utilization_max"], starts)
+    return rollups[np.argsort(rollups["timestamp"], kind="stable")]
+
+
+class Segment:
+    """A single memory-mapped segment file of fixed-size records of a numpy dtype.
+
+    The file is preallocated to its full capacity when created, and truncated to
+    the records written when closed. Unused records have a zero timestamp, which
+    also marks the end of a segment left open by a crash.
+    """
+
+    def __init__(self, path, start, capacity, dtype=RECORD):
+        """Create a new segment file.
+        Args:
+            path (str): path of the segment file
+            start (float): UNIX time the segment is started at
+            capacity (int): maximum number of records
+            dtype (np.dtype): record type, with a timestamp field
+        """
+        self.path = path
+        self.start = start
+        self.capacity = capacity
+        self.count = 0
+        self.itemsize = dtype.itemsize
+
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, dtype.itemsize, start))
+            f.truncate(HEADER_SIZE + capacity * dtype.itemsize)
+
+        self._file = open(path, "r+b")
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+        self.records = np.frombuffer(self._mmap, dtype=dtype, count=capacity, offset=HEADER_SIZE)
+
+    @property
+    def full(self):
+        return self.count == self.capacity
+
+    def append(self, record):
+        self.records[self.count] = record
+        self.count += 1
+
+    def flush(self):
+        """Write the modified pages to disk."""
+        self._mmap.flush()
+
+    def close(self):
+        """Flush and unmap the segment, truncating the file to the records written."""
+        self.flush()
+        del self.records  # release the buffer before closing the mmap
+        self._mmap.close()
+        self._file.truncate(HEADER_SIZE + self.count * self.itemsize)
+        self._file.close()
+
+
+def read_segment(path, dtype=RECORD):
+    """Map the records of a segment file, skipping unused preallocated records.
+    Args:
+        path (str): path of the segment file
+        dtype (np.dtype): record type of the segment
+    Return:
+        a read-only record array backed by the file, empty if the file is not a valid segment
+    """
+    with open(path, "rb") as f:
+        header = f.read(HEADER.size)
+    if len(header) < HEADER.size:
+        return np.empty(0, dtype=dtype)
+    magic, version, record_size, _ = HEADER.unpack(header)
+    if magic != MAGIC or version != VERSION or record_size != dtype.itemsize:
+        logger.warning("Skipping history segment %s of an unknown format", path)
+        return np.empty(0, dtype=dtype)
+
+    count = (os.path.getsize(path) - HEADER_SIZE) // dtype.itemsize
+    if count <= 0:
+        return np.empty(0, dtype=dtype)
+    records = np.memmap(path, dtype=dtype, mode="r", offset=HEADER_SIZE, shape=(count,))
+    return records[:np.count_nonzero(records["timestamp"])]
+
+
+class SegmentLog:
+    """Time ordered records of a single type in a directory of segment files.
+    A new segment is started every segment_seconds or when a segment is full,
+    and segments past the retention period are deleted.
+    """
+
+    def __init__(self, path, dtype, segment_seconds, segment_records, retention_seconds):
+        """
+        Args:
+            path (str): directory of the segment files
+            dtype (np.dtype): record type, with a timestamp field
+            segment_seconds (float): time span of a segment
+            segment_records (int): maximum number of records in a segment
+            retention_seconds (float): age after which segments are deleted
+        """
+        self.path = path
+        self.dtype = dtype
+        self.segment_seconds = segment_seconds
+        self.segment_records = segment_records
+        self.retention_seconds = retention_seconds
+        self.segment = None
+        os.makedirs(path, exist_ok=True)
+
+    def append(self, record, now):
+        """Append a record, starting a new segment if needed.
+        Args:
+            record (tuple): the record fields
+            now (float): UNIX time of writing. Segments are started and expired by the time
+                of writing, not by the timestamps of the records.
+        Return:
+            True if a new segment was started
+        """
+        rotate = self.segment is None or self.segment.full or now >= self.segment.start + self.segment_seconds
+        if rotate:
+            self._rotate(now)
+        self.segment.append(record)
+        return rotate
+
+    def flush(self):
+        if self.segment is not None:
+            self.segment.flush()
+
+    def load(self, since):
+        """Read the records after a point in time.
+        Args:
+            since (float): UNIX timestamp of the oldest record to return
+        Return:
+            a record array in timestamp order
+        """
+        paths = self._segment_paths()
+        # Segments have the time they were started in their name. Skip segments followed
+        # by one started before the requested time: their records were written before it.
+        # Records from a poller with a clock ahead of the monitor's can be skipped at the
+        # start of the window.
+        starts = [self._segment_start(path) for path in paths]
+        chunks = []
+        for i, path in enumerate(paths):
+            if i + 1 < len(paths) and starts[i+1] <= since:
+                continue
+            records = read_segment(path, self.dtype)
+            chunks.append(records[records["timestamp"] >= since])
+
+        if not chunks:
+            return np.empty(0, dtype=self.dtype)
+        records = np.concatenate(chunks)
+        return records[np.argsort(records["timestamp"], kind="stable")]
+
+    def close(self):
+        if self.segment is not None:
+            self.segment.close()
+            self.segment = None
+
+    def _rotate(self, now):
+        """Close the current segment and start a new one at now,
+        deleting segments past the retention period.
+        """
+        if self.segment is not None:
+            self.segment.close()
+
+        # Segments filled within the same millisecond get consecutive names
+        start = int(now * 1000)
+        while os.path.exists(path := os.path.join(self.path, f"{start:013d}{SUFFIX}")):
+            start += 1
+        self.segment = Segment(path, start / 1000, self.segment_records, self.dtype)
+
+        # A segment is expired once the following one starts past the retention period
+        paths = self._segment_paths()
+        cutoff = now - self.retention_seconds
+        for path, next_path in zip(paths, paths[1:]):
+            if self._segment_start(next_path) >= cutoff:
+                break
+            logger.info("Deleting expired history segment %s", path)
+            os.remove(path)
+
+    def _segment_paths(self):
+        return sorted(glob.glob(os.path.join(self.path, f"*{SUFFIX}")))
+
+    @staticmethod
+    def _segment_start(path):
+        return int(os.path.basename(path)[:-len(SUFFIX)]) / 1000
+
+
+class _Bucket:
+    """Running min/max/mean utilization of a host over a rollup bucket being filled."""
+    __slots__ = ("start", "count", "totals", "mins", "maxs")
+
+    def __init__(self, start):
+        self.start = start
+        self.count = 0
+        self.totals = [0.0, 0.0]
+        self.mins = [float("inf"), float("inf")]
+        self.maxs = [float("-inf"), float("-inf")]
+
+    def add(self, values, mins, maxs):
+        self.count += 1
+        for i in range(2):
+            self.totals[i] += values[i]
+            self.mins[i] = min(self.mins[i], mins[i])
+            self.maxs[i] = max(self.maxs[i], maxs[i])
+
+    def record(self, host):
+        return (
+            self.start, host, self.count,
+            self.totals[0] / self.count, self.mins[0], self.maxs[0],
+            self.totals[1] / self.count, self.mins[1], self.maxs[1],
+        )
+
+
+class HistoryStore:
+    """Append-only on-disk store of received readings, for reloading the history
+    after a restart.
+
+    Records are written to memory-mapped segment files, starting a new segment
+    every segment_minutes or when a segment is full. Writes reach the page cache
+    only; they are flushed to disk at most every sync_interval seconds, to limit
+    writes to SD cards. Readings received after the last flush can be lost on a
+    power cut, but not on a crash of the monitor.
+
+    The utilization rollups of each rollup.LEVELS level are stored as well, in a
+    subdirectory of their own kept for the time span of the level, so the longer
+    time ranges can be restored without reading days of records. A completed bucket
+    is written when the next one starts, and the buckets being filled on close.
+    A bucket can thus be stored in parts, eg. before and after a restart.
+    """
+
+    def __init__(self, path, segment_minutes=60, segment_records=65536, sync_interval=30, retention_days=7):
+        """
+        Args:
+            path (str): directory of the segment files
+            segment_minutes (float): time span of a segment
+            segment_records (int): maximum number of records in a segment
+            sync_interval (float): minimum seconds between flushes to disk
+            retention_days (float): age after which segments are deleted
+        """
+        self.path = path
+        self.sync_interval = sync_interval
+        self.log = SegmentLog(path, RECORD, segment_minutes * 60, segment_records, retention_days * 24 * 3600)
+        # Rollup levels by bucket size, each split into 4 segments over its time span
+        self.rollup_logs = {
+            resolution: SegmentLog(
+                os.path.join(path, "rollups", str(resolution)), ROLLUP_RECORD, span / 4, 4096, span
+            )
+            for resolution, span in rollup.LEVELS
+        }
+        self._buckets = {}  # (host index, resolution): _Bucket being filled
+        self.last_sync = time.monotonic()
+        self.records_written = 0
+        self.syncs = 0
+        self.hosts = self._load_hosts()  # host names by index
+        self._host_index = {host: i for i, host in enumerate(self.hosts)}
+
+        marker = os.path.join(path, CLOSED_FILE)
+        self.closed_cleanly = os.path.exists(marker)
+        if self.closed_cleanly:
+            os.remove(marker)
+
+    @classmethod
+    def from_config(cls, config):
+        """Create a store from the [display.history] config section."""
+        return cls(
+            config.get("path", "history"),
+            segment_minutes=config.get("segment_minutes", 60),
+            sync_interval=config.get("sync_interval", 30),
+            retention_days=config.get("retention_days", 7)
+        )
+
+    def append(self, readings):
+        """Store the readings of a message.
+        Args:
+            readings (dict): readings as received from the poller
+        """
+        # The timestamp is only stored: a poller's clock can be off from the monitor's
+        now = time.time()
+        host = self._get_host_index(readings.get("host", ""))
+        record = to_record(readings, host)
+        if self.log.append(record, now):
+            # Closing the previous segment flushed it
+            self.last_sync = time.monotonic()
+        self._add_to_rollups(host, record, now)
+
+        self.records_written += 1
+        if time.monotonic() - self.last_sync >= self.sync_interval:
+            self.sync()
+
+    def sync(self):
+        """Flush the records written since the previous sync to disk."""
+        if self.log.segment is not None:
+            self.log.flush()
+            for log in self.rollup_logs.values():
+                log.flush()
+            self.syncs += 1
+        self.last_sync = time.monotonic()
+
+    def load(self, since):
+        """Read the records of every host received after a point in time.
+        Args:
+            since (float): UNIX timestamp of the oldest record to return
+        Return:
+            a RECORD array in timestamp order. Host names are in self.hosts.
+        """
+        return self.log.load(since)
+
+    def load_rollups(self, now=None):
+        """Read the stored rollup buckets of every host over the time span of each level.
+        Args:
+            now (float): UNIX timestamp the time spans end at, defaults to now
+        Return:
+            dict of bucket size: ROLLUP_RECORD array in timestamp order. A bucket stored in
+            parts has a record for each part.
+        """
+        if now is None:
+            now = time.time()
+        return {
+            resolution: self.rollup_logs[resolution].load(now - span)
+            for resolution, span in rollup.LEVELS
+        }
+
+    def load_history(self, seconds, now=None):
+        """Read the records of the last seconds and the rollup buckets of every level,
+        for restoring the history after a restart. Call before appending.
+
+        If the store was not closed cleanly, eg. the monitor was killed, the buckets
+        being filled were lost. These are rebuilt from the records following the last
+        stored bucket of each host, and stored.
+        Args:
+            seconds (float): time span of the records to return
+            now (float): UNIX timestamp the time spans end at, defaults to now
+        Return:
+            a (records, rollups) tuple of the RECORD array of the last seconds and the
+            load_rollups() dict, both in timestamp order
+        """
+        if now is None:
+            now = time.time()
+        rollups = self.load_rollups(now)
+        if self.closed_cleanly:
+            return self.load(now - seconds), rollups
+
+        # Start of the missing buckets of each host, at each level
+        ends = {}
+        for resolution, span in rollup.LEVELS:
+            buckets = rollups[resolution]
+            ends[resolution] = {
+                host: buckets["timestamp"][buckets["host"] == host].max() + resolution
+                for host in np.unique(buckets["host"]).tolist()
+            }
+        since = min([now - seconds] + [end for host_ends in ends.values() for end in host_ends.values()])
+        if not all(ends.values()):
+            # No buckets stored at a level, eg. before the rollups were stored
+            since = min(since, now - rollup.LEVELS[-1][1])
+        records = self.load(since)
+
+        for resolution, host_ends in ends.items():
+            # Hosts without stored buckets are rebuilt from all the records read
+            starts = np.full(len(self.hosts), since)
+            for host, end in host_ends.items():
+                starts[host] = end
+            missing = records[records["timestamp"] >= starts[records["host"]]]
+            if not len(missing):
+                continue
+            buckets = to_rollup_records(missing, resolution)
+            logger.info("Rebuilt %d history buckets of %ds", len(buckets), resolution)
+            for bucket in buckets:
+                self.rollup_logs[resolution].append(bucket, time.time())
+            merged = np.concatenate([rollups[resolution], buckets])
+            rollups[resolution] = merged[np.argsort(merged["timestamp"], kind="stable")]
+
+        return records[records["timestamp"] >= now - seconds], rollups
+
+    def close(self):
+        # Store the buckets being filled: the rest of a bucket is stored separately after a restart
+        for (host, resolution), bucket in self._buckets.items():
+            self.rollup_logs[resolution].append(bucket.record(host), time.time())
+        self._buckets.clear()
+
+        self.log.close()
+        for log in self.rollup_logs.values():
+            log.close()
+        open(os.path.join(self.path, CLOSED_FILE), "w").close()
+        logger.info("History: %d records written, %d syncs", self.records_written, self.syncs)
+
+    def _add_to_rollups(self, host, record, now):
+        """Add a record to the bucket being filled at each rollup level, storing completed buckets."""
+        timestamp = record[0]
+        values = [record[i] for i in _UTILIZATION_FIELDS]
+        mins = [record[i + 1] for i in _UTILIZATION_FIELDS]
+        maxs = [record[i + 2] for i in _UTILIZATION_FIELDS]
+        for resolution, log in self.rollup_logs.items():
+            start = timestamp // resolution * resolution
+            bucket = self._buckets.get((host, resolution))
+            if bucket is None or bucket.start != start:
+                if bucket is not None:
+                    log.append(bucket.record(host), now)
+                bucket = self._buckets[(host, resolution)] = _Bucket(start)
+            bucket.add(values, mins, maxs)
+
+    def _get_host_index(self, host):
+        """Return the index of a host in the host table, adding new hosts to the table file."""
+        index = self._host_index.get(host)
+        if index is None:
+            index = self._host_index[host] = len(self.hosts)
+            self.hosts.append(host)
+            with open(os.path.join(self.path, HOSTS_FILE), "a") as f:
+                f.write(json.dumps(host) + "\n")
+        return index
+
+    def _load_hosts(self):
+        try:
+            with open(os.path.join(self.path, HOSTS_FILE)) as f:
+                return [json.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
@@ -0,0 +1,210 @@
+import logging
+import time
+
+import numpy as np
+
+import rollup
+from ring_buffer import RingBuffer
+
+
+logger = logging.getLogger()
+
+
+class HostState:
+    """Latest readings and utilization history of a single reporting host.
+    History is kept in fixed capacity ring buffers of num_datapoints values,
+    and as min/max/mean rollups at each of the rollup.LEVELS for longer time ranges.
+    """
+
+    def __init__(self, host, num_datapoints, refresh_interval):
+        self.host = host
+        self.readings = None
+        self.last_seen = None
+        self.last = None  # timestamp of the newest stored data point, None while the history is a placeholder
+        self.num_datapoints = num_datapoints
+        self.refresh_interval = refresh_interval
+        self._init_history(int(time.time()))
+
+    def _init_history(self, end):
+        """Initialize history with zeros for the time window preceding end."""
+        num_datapoints = self.num_datapoints
+        self.timestamps = RingBuffer(num_datapoints, end - self.refresh_interval*np.arange(num_datapoints, 0, -1))
+        self.utilization = {
+            "cpu": RingBuffer(num_datapoints),
+            "gpu": RingBuffer(num_datapoints)
+        }
+        # Sub-interval utilization extremes, for drawing a min/max band around the mean
+        self.utilization_min = {key: RingBuffer(num_datapoints) for key in self.utilization}
+        self.utilization_max = {key: RingBuffer(num_datapoints) for key in self.utilization}
+        self.rollups = {
+            key: [rollup.Rollup(resolution, span, end) for resolution, span in rollup.LEVELS]
+            for key in self.utilization
+        }
+
+    @property
+    def span(self):
+        """Time span of the full resolution history in seconds."""
+        return self.num_datapoints * self.refresh_interval
+
+    def series(self, key, span):
+        """Get the utilization history covering a time range, at the coarsest
+        resolution that covers it: the full resolution history, or a rollup level.
+        Args:
+            key (str): "cpu" or "gpu"
+            span (float): time range in seconds
+        Return:
+            a (timestamps, mean, min, max) tuple of array views, valid until the next ingest
+        """
+        if span <= self.span:
+            return (
+                self.timestamps.view(),
+                self.utilization[key].view(),
+                self.utilization_min[key].view(),
+                self.utilization_max[key].view()
+            )
+        levels = self.rollups[key]
+        level = next((level for level in levels if level.span >= span), levels[-1])
+        return level.timestamps.view(), level.mean.view(), level.min.view(), level.max.view()
+
+    def ingest(self, readings):
+        """Store new readings and append them to the history.
+        Return:
+            False if the readings were discarded as out-of-order, True otherwise
+        """
+        # Ignore this reading if older than the latest data point.
+        timestamp = readings["timestamp"]
+        if self.last is not None and timestamp <= self.last:
+            logger.warning("Discarding out-of-order item from %s. Age: %ds", self.host, time.time() - timestamp)
+            return False
+        if self.last is None:
+            # Replace the placeholder history, which ends at the time the host was first seen.
+            # The first readings can be older, eg. samples replayed by a poller after a restart.
+            self._init_history(timestamp)
+
+        self.last = timestamp
+        self.readings = readings
+        self.last_seen = time.time()
+        self.timestamps.append(readings["timestamp"])
+        for key in self.utilization:
+            value = readings[key]["utilization"]
+            # Publishers without sub-sampling don't send aggregates
+            stats = readings[key].get("utilization_stats") or {}
+            self.utilization[key].append(value)
+            self.utilization_min[key].append(stats.get("min", value))
+            self.utilization_max[key].append(stats.get("max", value))
+            for level in self.rollups[key]:
+                level.add(readings["timestamp"], value, stats.get("min", value), stats.get("max", value))
+        return True
+
+    def restore(self, records, rollups=None):
+        """Add stored history to the history, eg. after a restart.
+        Records older than the latest stored data point are skipped.
+        Args:
+            records (np.ndarray): history_store.RECORD records of this host in timestamp order
+            rollups (dict): bucket size: history_store.ROLLUP_RECORD buckets of this host in
+                timestamp order, for the rollup levels. Without them, the rollups are built
+                from the records. Ignored once the host has a history.
+        """
+        if self.last is not None:
+            records = records[records["timestamp"] > self.last]
+            rollups = None
+        buckets = [bucket for bucket in (rollups or {}).values() if len(bucket)]
+        if not len(records) and not buckets:
+            return
+
+        timestamps = [records["timestamp"][[0, -1]]] if len(records) else []
+        timestamps += [bucket["timestamp"][[0, -1]] for bucket in buckets]
+        if self.last is None:
+            # Replace the placeholder history
+            self._init_history(min(ts[0] for ts in timestamps))
+        self.last = max(ts[-1] for ts in timestamps)
+        self.timestamps.extend(records["timestamp"])
+        for key in self.utilization:
+            self.utilization[key].extend(records[f"{key}_utilization"])
+            self.utilization_min[key].extend(records[f"{key}_utilization_min"])
+            self.utilization_max[key].extend(records[f"{key}_utilization_max"])
+            for level in self.rollups[key]:
+                if rollups is None:
+                    level.extend(
+                        records["timestamp"],
+                        records[f"{key}_utilization"],
+                        records[f"{key}_utilization_min"],
+                        records[f"{key}_utilization_max"]
+                    )
+                else:
+                    bucket = rollups[level.resolution]
+                    level.extend(
+                        bucket["timestamp"],
+                        bucket[f"{key}_mean"],
+                        bucket[f"{key}_min"],
+                        bucket[f"{key}_max"],
+                        counts=bucket["count"]
+                    )
+
+
+class HostStore:
+    """Per-host state for every host that has reported to the monitor,
+    in order of first appearance.
+    """
+
+    def __init__(self, num_datapoints, refresh_interval):
+        self.num_datapoints = num_datapoints
+        self.refresh_interval = refresh_interval
+        self.hosts = {}
+
+    def __len__(self):
+        return len(self.hosts)
+
+    def __contains__(self, host):
+        return host in self.hosts
+
+    def __getitem__(self, host):
+        return self.hosts[host]
+
+    def ingest(self, readings):
+        """Route readings to the state of their reporting host,
+        creating the state on first message from a host.
+        Return:
+            a (HostState, bool) tuple of the host state and whether the readings were stored
+        """
+        state = self._get_state(readings.get("host", ""))
+        return state, state.ingest(readings)
+
+    def restore(self, records, hosts, rollups=None):
+        """Fill the history of every host in stored records, in order of appearance.
+        Args:
+            records (np.ndarray): history_store.RECORD records in timestamp order
+            hosts (list): host names by the host index of the records
+            rollups (dict): bucket size: history_store.ROLLUP_RECORD buckets in timestamp order,
+                as returned by HistoryStore.load_history(). Without them, the rollups are built
+                from the records.
+        """
+        indices = records["host"].tolist()
+        if rollups is not None:
+            for buckets in rollups.values():
+                indices += buckets["host"].tolist()
+        for index in dict.fromkeys(indices):
+            host_rollups = None
+            if rollups is not None:
+                host_rollups = {
+                    resolution: buckets[buckets["host"] == index] for resolution, buckets in rollups.items()
+                }
+            self._get_state(hosts[index]).restore(records[records["host"] == index], host_rollups)
+
+    def next_host(self, host):
+        """Return the host following host in order of appearance, wrapping around.
+        Hosts with only restored history are skipped until they report.
+        """
+        hosts = [name for name, state in self.hosts.items() if state.readings is not None or name == host]
+        if not hosts:
+            return None
+        if host not in hosts:
+            return hosts[0]
+        return hosts[(hosts.index(host) + 1) % len(hosts)]
+
+    def _get_state(self, host):
+        """Return the state of a host, creating it on first message from the host."""
+        if host not in self.hosts:
+            logger.info("New host: %s", host or "<unknown>")
+            self.hosts[host] = HostState(host, self.num_datapoints, self.refresh_interval)
+        return self.hosts[host]
@@ -1,11 +1,13 @@
 import logging
+import math
 import time
 
-import numpy as np
-from PyQt5.QtGui import QFont, QIcon, QPixmap
+from PyQt5.QtGui import QColor, QFont, QIcon, QPixmap
 from PyQt5.QtCore import (
     Qt,
+    QEvent,
     QObject,
+    QRectF,
     QThread,
     QTimer,
     pyqtSlot,
@@ -16,6 +18,7 @@ from PyQt5.QtWidgets import (
     QWidget,
     QLabel,
     QPushButton,
+    QComboBox,
     QLCDNumber,
     QDesktopWidget,
     QGridLayout,
@@ -23,9 +26,14 @@ from PyQt5.QtWidgets import (
     QHBoxLayout,
     QSizePolicy,
 )
+import numpy as np
 import pyqtgraph as pg
 
 from transport import CONFIG
+from host_store import HostStore
+from render_cache import RenderCache
+import latency
+import rollup
 import utils
 
 
@@ -35,11 +43,34 @@ logger = logging.getLogger()
 class MainWindow(QMainWindow):
     """Main GUI window."""
 
-    def __init__(self, transport_worker_class):
+    def __init__(self, transport_worker_class, history=None):
+        """
+        Args:
+            transport_worker_class: class of the worker receiving readings
+            history (HistoryStore): optional on-disk store of received readings.
+                Its recent history is shown on startup.
+        """
         super().__init__()
         self.message_worker_thread = QThread()
         self.transport_worker_class = transport_worker_class
         self.core_window = CPUCoreWindow()
+        self.hosts_window = HostsWindow()
+        self.hosts_window.host_selected.connect(self.show_host)
+        self.active_host = None
+
+        # Readings are ingested as they arrive, but drawn at most once per frame.
+        # Pending changes since the last frame:
+        self.dirty_hosts = {}  # hosts with new readings for the hosts window, in order of arrival
+        self.render_pending = False  # the active host has new readings
+        self.graph_pending = False  # the active host has new history points
+        self.frames_rendered = 0
+        self.messages_received = 0
+        # Widgets are only touched when their displayed value changes
+        self.render_cache = RenderCache()
+        self.history = history
+        # Latency of each stage from sampling to painting
+        self.latency = latency.LatencyStats()
+        self.paint_pending = None  # latency stamps of the readings drawn on the next paint
         self.init_ui()
 
     def init_ui(self):
@@ -123,36 +154,95 @@ class MainWindow(QMainWindow):
         layout.addWidget(icon)
         layout.setContentsMargins(35, 0, 30, 0)
 
-        cpu_stats_grid.addWidget(core_utilization_button, 1, 3)
+        # Stack the Cores and Hosts buttons in the same cell
+        view_buttons = QVBoxLayout()
+        cpu_stats_grid.addLayout(view_buttons, 1, 3)
+        view_buttons.addWidget(core_utilization_button)
         core_utilization_button.setSizePolicy(
             QSizePolicy.Preferred,
             QSizePolicy.Preferred
         )
         core_utilization_button.clicked.connect(self.core_window.show)
 
+        hosts_button = QPushButton()
+        layout = QHBoxLayout(hosts_button)
+
+        label = QLabel("Hosts", objectName="control_button")
+        layout.addWidget(label)
+        icon = QLabel()
+        icon.setPixmap(QIcon("resources/iconfinder_gnome-system-monitor_23964.png").pixmap(16, 16))
+        layout.addWidget(icon)
+        layout.setContentsMargins(35, 0, 30, 0)
+
+        view_buttons.addWidget(hosts_button)
+        hosts_button.setSizePolicy(
+            QSizePolicy.Preferred,
+            QSizePolicy.Preferred
+        )
+        hosts_button.clicked.connect(self.hosts_window.show)
+
 
         ### CPU & GPU utilization time series grid
+        # Length of the utilization history shown
+        HISTORY_MINUTES = CONFIG.get("display", {}).get("history_minutes", 5)
+
         date_axis = pg.graphicsItems.DateAxisItem.DateAxisItem(orientation="bottom")
-        date_axis.setTickSpacing(major=60, minor=0)
+        # A tick every minute on the default 5 minute history, about 5 ticks on longer ones
+        date_axis.setTickSpacing(major=60 * max(1, HISTORY_MINUTES // 5), minor=0)
+        self.date_axis = date_axis
+        self.history_tick_spacing = 60 * max(1, HISTORY_MINUTES // 5)
         percent_axis = PercentAxisItem(orientation="left")
 
         utilization_graph = pg.PlotWidget(axisItems = {"bottom": date_axis, "left": percent_axis})
         utilization_graph.setTitle("<h2>CPU/GPU</h2>")
+        self.utilization_graph = utilization_graph
         utilization_graph.addLegend() # Needs to be called before any plotting
 
-        # Initialize graphs with zeros for previous 5 minutes
+        # Initialize graphs with zeros for the history window
         REFRESH_INTERVAL = CONFIG["transport"]["refresh_interval"]
-        NUM_DATAPOINTS = 60//REFRESH_INTERVAL * 5
+        NUM_DATAPOINTS = int(60 * HISTORY_MINUTES // REFRESH_INTERVAL)
         x = [int(time.time()) - REFRESH_INTERVAL*i for i in range(NUM_DATAPOINTS,0,-1)]
         y = [0] * NUM_DATAPOINTS
 
+        # Readings and history of every reporting host. Only the active host is drawn.
+        self.host_store = HostStore(NUM_DATAPOINTS, REFRESH_INTERVAL)
+        if self.history is not None:
+            # The longer time ranges are restored from the stored rollup buckets
+            records, rollups = self.history.load_history(60 * HISTORY_MINUTES)
+            self.host_store.restore(records, self.history.hosts, rollups)
+            logger.info("Restored %d history records of %d hosts", len(records), len(self.host_store))
+
         cpu_plot = utilization_graph.plot(x, y, pen="#1227F1", name="CPU")
         gpu_plot = utilization_graph.plot(x, y, pen="#660000", name="GPU")
         self.utilization_plots = {"cpu": cpu_plot, "gpu": gpu_plot}
+        for plot in self.utilization_plots.values():
+            # Draw at most a min and max point per pixel
+            plot.setDownsampling(auto=True, method="peak")
+            plot.setClipToView(True)
+
+        # Shaded band between the sub-interval min and max utilization
+        self.utilization_bands = {}
+        for key, color in (("cpu", (18, 39, 241, 60)), ("gpu", (102, 0, 0, 60))):
+            min_curve = pg.PlotCurveItem(x, y, pen=None)
+            max_curve = pg.PlotCurveItem(x, y, pen=None)
+            utilization_graph.addItem(pg.FillBetweenItem(min_curve, max_curve, brush=color))
+            self.utilization_bands[key] = (min_curve, max_curve)
 
         # Fix y-axis range
         view_box = utilization_graph.getViewBox()
         view_box.setRange(yRange=(0,100))
+
+        # Time range selector: the full resolution history, and the longer rollup levels
+        self.history_span = NUM_DATAPOINTS * REFRESH_INTERVAL
+        self.history_ranges = {f"{HISTORY_MINUTES} min": self.history_span}
+        for _, span in rollup.LEVELS:
+            if span > self.history_span:
+                hours = span // 3600
+                self.history_ranges[f"{hours} h" if hours <= 24 else f"{hours // 24} d"] = span
+        range_selector = QComboBox()
+        range_selector.addItems(self.history_ranges)
+        range_selector.currentTextChanged.connect(self.set_history_range)
+        timeline_grid.addWidget(range_selector, alignment=Qt.AlignRight)
         timeline_grid.addWidget(utilization_graph)
 
         utilization_graph.setMouseEnabled(x=False, y=False)
@@ -182,7 +272,9 @@ class MainWindow(QMainWindow):
         x = list(x_labeled.keys())
 
         self.system_mem_bg_used = pg.BarGraphItem(x=[x[0]], height=[0], width=0.6, brush="#0E1F06")
+        # A single item holds the bars of every GPU, split within the GPU slot
         self.gpu_mem_bg_used = pg.BarGraphItem(x=[x[1]], height=[0], width=0.6, brush="#660000")
+        self.gpu_slot = x[1]
         ram_plot.addItem(self.system_mem_bg_used)
         ram_plot.addItem(self.gpu_mem_bg_used)
 
@@ -241,6 +333,8 @@ class MainWindow(QMainWindow):
         """Wrapper for starting all worker threads."""
         self.setup_msg_pull()
         self.setup_clock_timer()
+        self.setup_host_cycle_timer()
+        self.setup_render_timer()
 
     def setup_msg_pull(self):
         """Start a worker thread to listen for incoming hardware readings.
@@ -265,27 +359,153 @@ class MainWindow(QMainWindow):
         """
         def tick():
             s = time.strftime("%H:%M")
-            self.clock_lcd.display(s)
+            self.render_cache.update("clock", s, self.clock_lcd.display)
 
         tick()
         _timer = QTimer(self)
         _timer.timeout.connect(tick)
         _timer.start(1000)
 
+    def setup_host_cycle_timer(self):
+        """Setup a timer for cycling the main view through all reporting hosts,
+        if enabled in config.
+        """
+        cycle_interval = CONFIG.get("display", {}).get("cycle_interval", 0)
+        if not cycle_interval:
+            return
+
+        def cycle():
+            if len(self.host_store) > 1:
+                self.show_host(self.host_store.next_host(self.active_host))
+
+        self._cycle_timer = QTimer(self)
+        self._cycle_timer.timeout.connect(cycle)
+        self._cycle_timer.start(int(cycle_interval * 1000))
+
+    def setup_render_timer(self):
+        """Setup a timer drawing pending readings at most max_fps times per second."""
+        max_fps = CONFIG.get("display", {}).get("max_fps", 10)
+        self._render_timer = QTimer(self)
+        self._render_timer.timeout.connect(self.render_frame)
+        self._render_timer.start(int(1000 / max_fps))
+
+    @pyqtSlot(str)
+    def show_host(self, host):
+        """Switch the main view to another reporting host.
+        Hosts with only restored history are not shown until they report.
+        """
+        if host not in self.host_store or self.host_store[host].readings is None:
+            return
+
+        self.active_host = host
+        self.utilization_graph.setTitle(f"<h2>CPU/GPU - {host}</h2>")
+        self._render(self.host_store[host], update_graph=True)
+        self.render_pending = self.graph_pending = False
+
+    @pyqtSlot(str)
+    def set_history_range(self, name):
+        """Switch the utilization graph to another time range."""
+        self.history_span = self.history_ranges[name]
+        if self.history_span == self.host_store.num_datapoints * self.host_store.refresh_interval:
+            self.date_axis.setTickSpacing(major=self.history_tick_spacing, minor=0)
+        else:
+            self.date_axis.setTickSpacing()  # automatic
+        if self.active_host is not None:
+            self._update_utilization_graphs(self.host_store[self.active_host])
+
     @pyqtSlot()
     def stop_thread_and_exit(self):
         """Stop any running worker threads and exit the application."""
+        # The socket worker blocks its thread in a server loop; stop it first.
+        if hasattr(self, "worker") and hasattr(self.worker, "stop"):
+            self.worker.stop()
         self.message_worker_thread.exit()
+        if self.history is not None:
+            self.history.close()
+        logger.info("Latency:\n%s", self.latency)
+        logger.info(
+            "Widget updates: %d applied, %d skipped as unchanged",
+            self.render_cache.applied, self.render_cache.skipped
+        )
         self.core_window.close()
+        self.hosts_window.close()
         self.close()
 
     @pyqtSlot(dict)
     def update_readings(self, readings):
-        """Slot for message worker: receive latest hardware readings
-        and update the GUI.
+        """Slot for message worker: receive latest hardware readings.
+
+        Readings from every host are stored, but only the active host is drawn.
+        Every reading is added to the history right away, while drawing is left
+        to the next frame, so a burst of messages results in a single repaint.
+        """
+        self.messages_received += 1
+        if readings.get("timings"):
+            self.latency.add(readings["timings"], latency.RECEIVE_STAGES)
+        state, stored = self.host_store.ingest(readings)
+        self.dirty_hosts[state.host] = None
+        if stored and self.history is not None:
+            self.history.append(readings)
+
+        if self.active_host is None:
+            self.show_host(state.host)
+        elif state.host == self.active_host:
+            self.render_pending = True
+            self.graph_pending |= stored
+
+    @pyqtSlot()
+    def render_frame(self):
+        """Draw the readings received since the previous frame, if any."""
+        for host in self.dirty_hosts:
+            self.hosts_window.update_host(self.host_store[host])
+        self.dirty_hosts.clear()
+
+        if self.render_pending:
+            state = self.host_store[self.active_host]
+            self._render(state, update_graph=self.graph_pending)
+            self.paint_pending = state.readings.get("timings")
+            self.render_pending = self.graph_pending = False
+            self.frames_rendered += 1
+
+    def event(self, event):
+        """Record the paint time of the readings drawn by the last frame.
+        Widgets of the window are painted when the window handles an UpdateRequest.
         """
+        result = super().event(event)
+        if event.type() == QEvent.UpdateRequest and self.paint_pending is not None:
+            self.paint_pending["painted"] = time.time()
+            self.latency.add(self.paint_pending, latency.PAINT_STAGES)
+            self.paint_pending = None
+        return result
+
+    def show_latency_overlay(self):
+        """Show the latency of each stage on top of the window, updated every second."""
+        overlay = QLabel("Waiting for data...", self.centralWidget(), objectName="latency_overlay")
+        overlay.move(10, 60)
+
+        def update():
+            overlay.setText(str(self.latency) or "Waiting for data...")
+            overlay.adjustSize()
+            overlay.raise_()
+
+        update()
+        overlay.show()
+        self._latency_timer = QTimer(self)
+        self._latency_timer.timeout.connect(update)
+        self._latency_timer.start(1000)
+
+    def export_latency(self, path, interval=60):
+        """Periodically append the latency statistics to a JSON lines file."""
+        self._export_timer = QTimer(self)
+        self._export_timer.timeout.connect(lambda: self.latency.export(path))
+        self._export_timer.start(int(interval * 1000))
+
+    def _render(self, state, update_graph):
+        """Draw the latest readings of a host."""
+        readings = state.readings
         self._update_cpu_stat_cards(readings)
-        self._update_utilization_graphs(readings)
+        if update_graph:
+            self._update_utilization_graphs(state)
         self._update_ram(readings)
         self._update_temperature(readings)
         self.core_window._update_cpu_cores(readings)
@@ -294,71 +514,109 @@ class MainWindow(QMainWindow):
         """Update CPU statistics labels."""
         label = self.cpu_stats_labels["%"]
         val = readings["cpu"]["utilization"]
-        label.setText(f"{val}%")
+        self.render_cache.update("cpu %", f"{val}%", label.setText)
 
         # Adjust background color accordingly
-        style_sheet = utils.get_cpu_utilization_background_style(val)
-        label.setStyleSheet(style_sheet)
+        self.render_cache.update("cpu % style", utils.get_cached_cpu_utilization_style(val), label.setStyleSheet)
 
 
         label = self.cpu_stats_labels["1 min"]
         val = readings["cpu"]["load_average_1min"]
-        label.setText("{:.1f}<span style='font-size:20px'>(1 min)</span>".format(val))
+        self.render_cache.update(
+            "cpu 1 min", "{:.1f}<span style='font-size:20px'>(1 min)</span>".format(val), label.setText
+        )
 
         label = self.cpu_stats_labels["#"]
         val = readings["cpu"]["num_high_load_cores"]
-        label.setText(f"#{val}")
+        self.render_cache.update("cpu #", f"#{val}", label.setText)
 
-    def _update_utilization_graphs(self, readings):
-        """Update utilization time series graph.
-        
-        Remove oldest item and add new reading as latest.
-        Updated both CPU and GPU graphs.
+    def _update_utilization_graphs(self, state):
+        """Update utilization time series graph from a host's history
+        over the selected time range. Updates both CPU and GPU graphs
+        and their min/max bands.
         """
-        for key in self.utilization_plots:
-            # Update old x and y values keeping only the latest n values
-            old_data = self.utilization_plots[key].getData()
-
-            # Ignore this reading if older than the latest data point in graph.
-            if readings["timestamp"] <= old_data[0][-1]:
-                logger.warning("Discarding out-of-order item. Age: %ds", time.time() - readings["timestamp"])
-                return
-            
-            x = np.append(old_data[0][1:], readings["timestamp"])
-            y = np.append(old_data[1][1:], readings[key]["utilization"])
-
-            self.utilization_plots[key].setData(x, y)
+        for key, plot in self.utilization_plots.items():
+            # pyqtgraph keeps the arrays: pass copies, as the history views
+            # are overwritten by readings ingested before the next frame
+            timestamps, mean, min_values, max_values = (
+                values.copy() for values in state.series(key, self.history_span)
+            )
+            plot.setData(timestamps, mean)
+            min_curve, max_curve = self.utilization_bands[key]
+            min_curve.setData(timestamps, min_values)
+            max_curve.setData(timestamps, max_values)
 
     def _update_ram(self, readings):
         """Update RAM usage bars plot and labels.
-        Update both system RAM and GPU memory usage.
+        Update both system RAM and GPU memory usage. Each GPU gets a bar of its own,
+        while the labels show the total over all GPUs.
         """
+        cache = self.render_cache
         system_used = int(readings["ram"]["used"] / readings["ram"]["total"] * 100)
-        self.system_mem_bg_used.setOpts(height=[system_used])
-        self.system_mem_bar_label.setText("{}%".format(system_used))
-        self.system_mem_label.setText("{:.1f}GB".format(readings["ram"]["used"]/1000))
-
-        gpu_mem_used = int(readings["gpu"]["mem_used"] / readings["gpu"]["mem_total"] * 100)
-        self.gpu_mem_bg_used.setOpts(height=[gpu_mem_used])
-        self.gpu_mem_bar_label.setText("{}%".format(gpu_mem_used))
-        self.gpu_mem_label.setText("{:.1f}GB".format(readings["gpu"]["mem_used"]/1000))
+        cache.update("ram bar", system_used, lambda height: self.system_mem_bg_used.setOpts(height=[height]))
+        cache.update("ram %", "{}%".format(system_used), self.system_mem_bar_label.setText)
+        cache.update("ram GB", "{:.1f}GB".format(readings["ram"]["used"]/1000), self.system_mem_label.setText)
+
+        gpus = utils.get_gpus(readings)
+        heights = [int(gpu["mem_used"] / gpu["mem_total"] * 100) for gpu in gpus]
+        def set_gpu_bars(heights):
+            width = 0.6 / len(heights)
+            self.gpu_mem_bg_used.setOpts(
+                x=[self.gpu_slot - 0.3 + width*(i+0.5) for i in range(len(heights))],
+                height=heights,
+                width=width
+            )
+        cache.update("gpu bars", heights, set_gpu_bars)
+
+        mem_used = sum(gpu["mem_used"] for gpu in gpus)
+        gpu_mem_used = int(mem_used / sum(gpu["mem_total"] for gpu in gpus) * 100)
+        cache.update("gpu %", "{}%".format(gpu_mem_used), self.gpu_mem_bar_label.setText)
+        cache.update("gpu GB", "{:.1f}GB".format(mem_used/1000), self.gpu_mem_label.setText)
 
     def _update_temperature(self, readings):
-        """Update temperature QLabels."""
+        """Update temperature QLabels. With multiple GPUs, the GPU label lists
+        the utilization and temperature of each device.
+        """
         cpu_temperature = f"{readings['cpu']['temperature']}°C"
-        gpu_temperature = f"{readings['gpu']['temperature']}°C"
-        self.gpu_temperature.setText(gpu_temperature)
-        self.cpu_temperature.setText(cpu_temperature)
+        gpus = utils.get_gpus(readings)
+        if len(gpus) > 1:
+            gpu_temperature = "<br>".join(
+                f"<span style='font-size:16px'>GPU{i} {gpu['utilization']}%</span> {gpu['temperature']}°C"
+                for i, gpu in enumerate(gpus)
+            )
+        else:
+            gpu_temperature = f"{readings['gpu']['temperature']}°C"
+        self.render_cache.update("gpu temperature", gpu_temperature, self.gpu_temperature.setText)
+        self.render_cache.update("cpu temperature", cpu_temperature, self.cpu_temperature.setText)
 
 
 class CPUCoreWindow(QWidget):
-    """Window for cpu core utilizations."""
+    """Window for per-core utilization, frequency and temperature,
+    drawn as a single heatmap image with a cell per core.
+    """
     COLUMNS_PER_ROW = 5
+    # Unit and color scale range of each view, None to scale to the highest value seen
+    VIEWS = {
+        "utilization": ("%", (0, 100)),
+        "frequency": ("MHz", None),
+        "temperature": ("°C", (20, 100)),
+    }
 
     def __init__(self):
         super().__init__()
         self.layout = QGridLayout()
-        self.qlcd_widgets = []
+        self.num_cores = 0
+        self.rows = 0
+        self.columns = CPUCoreWindow.COLUMNS_PER_ROW
+        self.view = "utilization"
+        self.readings = None
+        self.max_value = 0  # for views without a fixed range
+        self.render_cache = RenderCache()
+        self.luts = {
+            "utilization": utils.get_cpu_utilization_lut(),
+            "frequency": pg.colormap.get("viridis").getLookupTable(nPts=256, alpha=False),
+            "temperature": pg.colormap.get("inferno").getLookupTable(nPts=256, alpha=False),
+        }
 
         # Button for closing the window, top right.
         close_button = QPushButton("Close ")
@@ -370,42 +628,170 @@ class CPUCoreWindow(QWidget):
             QSizePolicy.Preferred
         )
 
+        # Reading to show, top left
+        view_selector = QComboBox()
+        view_selector.addItems(CPUCoreWindow.VIEWS)
+        view_selector.currentTextChanged.connect(self.set_view)
+        self.layout.addWidget(view_selector, 0, 0)
+
         self.empty_label = QLabel("Waiting for data...", self)
         self.layout.addWidget(self.empty_label, 1, CPUCoreWindow.COLUMNS_PER_ROW-1)
 
         self.layout.addWidget(close_button, 0, CPUCoreWindow.COLUMNS_PER_ROW-1)
+
+        # Core 0 on the top left, continuing row by row
+        graph = pg.GraphicsLayoutWidget()
+        self.view_box = graph.addViewBox(lockAspect=True, invertY=True, enableMouse=False)
+        self.image = pg.ImageItem()
+        self.view_box.addItem(self.image)
+        self.labels = None
+        if CONFIG.get("display", {}).get("core_labels", True):
+            self.labels = CoreLabelsItem()
+            self.view_box.addItem(self.labels)
+        self.layout.addWidget(graph, 2, 0, 1, CPUCoreWindow.COLUMNS_PER_ROW)
+
         self.setLayout(self.layout)
         self.resize(600, 400)
-        self.setWindowTitle("CPU core utilization")
+        self.setWindowTitle("CPU cores")
+
+    @pyqtSlot(str)
+    def set_view(self, view):
+        """Switch the heatmap to another per-core reading."""
+        self.view = view
+        self.max_value = 0
+        if self.readings is not None:
+            self._update_cpu_cores(self.readings)
 
     def _update_cpu_cores(self, readings):
-        """Update Core utilization values. The number of cores is not known
-        until the first response is received from the poller.
-        Create a QLCD widget for each core if not already created
-        and update the values.
+        """Update the core heatmap. The number of cores is not known
+        until the first response is received from the poller, so the grid
+        is sized on the first call, and again if the number of cores changes.
         """
         # Remove the dummy label
         self.empty_label.setParent(None)
-        if not self.qlcd_widgets:
-            NUM_CORES = len(readings["cpu"]["cores"]["utilization"])
-            # add at least 1 row if NUM_CORES < COLUMNS_PER_ROW
-            NUM_ROWS = max(1, NUM_CORES//CPUCoreWindow.COLUMNS_PER_ROW)
-            for row in range(NUM_ROWS):
-                for col in range(CPUCoreWindow.COLUMNS_PER_ROW):
-                    qlcd = QLCDNumber(self)
-                    qlcd.setDigitCount(2)
-                    qlcd.setSegmentStyle(QLCDNumber.Flat)
-                    self.layout.addWidget(qlcd, row+2, col)
-                    self.qlcd_widgets.append(qlcd)
-        else:
-            for i, qlcd in enumerate(self.qlcd_widgets):
-                try:
-                    val = readings["cpu"]["cores"]["utilization"][i]
-                except IndexError:
-                    val = 0
-                qlcd.display(val)
-                style_sheet = utils.get_cpu_utilization_background_style(val)
-                qlcd.setStyleSheet(style_sheet) 
+        self.readings = readings
+
+        cores = readings["cpu"]["cores"]
+        NUM_CORES = len(cores["utilization"])
+        if NUM_CORES != self.num_cores:
+            self._build_grid(NUM_CORES)
+
+        # Padding cells after the last core, and missing readings, are left empty
+        values = np.asarray(cores[self.view][:NUM_CORES], dtype=float)
+        grid = np.full(self.rows * self.columns, np.nan)
+        grid[:len(values)] = values
+
+        unit, levels = CPUCoreWindow.VIEWS[self.view]
+        if levels is None:
+            if len(values):
+                self.max_value = max(self.max_value, values.max())
+            levels = (0, max(self.max_value, 1))
+        self.image.setImage(
+            grid.reshape(self.rows, self.columns).T,
+            lut=self.luts[self.view],
+            levels=levels,
+            autoLevels=False
+        )
+
+        if self.labels is not None:
+            texts = [f"{int(value)}" for value in values]
+            self.render_cache.update("labels", texts, lambda texts: self.labels.set_texts(texts, self.columns))
+
+    def _build_grid(self, num_cores):
+        """Size the heatmap for a number of cores: at least COLUMNS_PER_ROW columns,
+        growing to a square grid on hosts with many cores.
+        """
+        self.num_cores = num_cores
+        self.columns = max(CPUCoreWindow.COLUMNS_PER_ROW, math.ceil(math.sqrt(num_cores)))
+        self.rows = max(1, math.ceil(num_cores / self.columns))
+        self.view_box.setRange(xRange=(0, self.columns), yRange=(0, self.rows), padding=0)
+        self.render_cache.clear()
+
+class CoreLabelsItem(pg.GraphicsObject):
+    """Value labels of the core heatmap cells, painted in a single pass
+    instead of a TextItem per core.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.texts = []
+        self.columns = 1
+        self.font = QFont()
+        self.font.setPixelSize(10)
+        self.setZValue(1)  # above the heatmap
+
+    def set_texts(self, texts, columns):
+        """Set the labels of the cells, row by row on a grid of columns cells wide."""
+        self.prepareGeometryChange()
+        self.texts = texts
+        self.columns = columns
+        self.update()
+
+    def boundingRect(self):
+        rows = math.ceil(len(self.texts) / self.columns)
+        return QRectF(0, 0, self.columns, rows)
+
+    def paint(self, painter, *args):
+        # Draw in device coordinates, so the text size doesn't follow the cell size
+        transform = painter.transform()
+        painter.resetTransform()
+        painter.setFont(self.font)
+        painter.setPen(QColor("white"))
+        for i, text in enumerate(self.texts):
+            row, col = divmod(i, self.columns)
+            painter.drawText(transform.mapRect(QRectF(col, row, 1, 1)), Qt.AlignCenter, text)
+
+
+class HostsWindow(QWidget):
+    """Window with a tile for each reporting host. Clicking a tile
+    switches the main window to that host.
+    """
+    COLUMNS_PER_ROW = 4
+    host_selected = pyqtSignal(str)
+
+    def __init__(self):
+        super().__init__()
+        self.layout = QGridLayout()
+        self.tiles = {}
+
+        close_button = QPushButton("Close ")
+        close_button.setIcon(QIcon("resources/iconfinder_Close_1891023.png"))
+        close_button.setLayoutDirection(Qt.RightToLeft)
+        close_button.clicked.connect(self.close)
+        self.layout.addWidget(close_button, 0, HostsWindow.COLUMNS_PER_ROW-1)
+
+        self.setLayout(self.layout)
+        self.resize(600, 400)
+        self.setWindowTitle("Hosts")
+
+    def update_host(self, state):
+        """Update the tile of a host. A tile is created only
+        the first time a host is seen.
+        """
+        tile = self.tiles.get(state.host)
+        if tile is None:
+            tile = QPushButton(self, objectName="host_tile")
+            tile.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+            tile.clicked.connect(lambda _, host=state.host: self._select(host))
+
+            row, col = divmod(len(self.tiles), HostsWindow.COLUMNS_PER_ROW)
+            self.layout.addWidget(tile, row+1, col)
+            self.tiles[state.host] = tile
+
+        readings = state.readings
+        if readings is None:
+            return
+        tile.setText(
+            f"{state.host}\n"
+            f"CPU {readings['cpu']['utilization']}%  GPU {readings['gpu']['utilization']}%\n"
+            f"{readings['cpu']['temperature']}°C"
+        )
+        utils.set_style_sheet(tile, utils.get_cached_cpu_utilization_style(readings["cpu"]["utilization"]))
+
+    def _select(self, host):
+        self.host_selected.emit(host)
+        self.close()
+
 
 class PercentAxisItem(pg.AxisItem):
     """Custom pyqtgraph AxisItem class with customized tick strings."""
@@ -0,0 +1,88 @@
+import json
+import time
+
+import numpy as np
+
+from ring_buffer import RingBuffer
+
+
+# Latency stages as (name, start stamp, end stamp) of the timings of a message.
+# Network latency between hosts includes the clock offset of the poller and the monitor.
+STAGES = (
+    ("collect", "collect_start", "collect_end"),  # hardware collectors
+    ("send", "collect_end", "sent"),  # queueing in the poller, eg. during a reconnect
+    ("network", "sent", "received"),
+    ("decode", "received", "decoded"),
+    ("display", "decoded", "painted"),  # waiting for the next frame, drawing and painting
+    ("total", "collect_start", "painted"),
+)
+# Stages complete on receiving a message, and on painting it
+RECEIVE_STAGES = ("collect", "send", "network", "decode")
+PAINT_STAGES = ("display", "total")
+
+# Histogram bin edges in milliseconds, logarithmic from 10µs to 100s
+BIN_EDGES = np.logspace(-2, 5, 29)
+
+
+class LatencyStats:
+    """Rolling latency statistics of each stage of the path of a message,
+    from sampling on the poller to painting on the monitor.
+    Keeps the latest window latencies of each stage.
+    """
+
+    def __init__(self, window=1000):
+        self.latencies = {name: RingBuffer(window, np.nan) for name, _, _ in STAGES}
+        self._stamps = {name: (start, end) for name, start, end in STAGES}
+
+    def add(self, timings, stages):
+        """Add the latencies of a message. Stages with a missing stamp are skipped,
+        eg. for pollers not sending latency stamps.
+        Args:
+            timings (dict): latency stamps of a message as UNIX timestamps
+            stages (tuple): names of the stages to add
+        """
+        for name in stages:
+            start, end = self._stamps[name]
+            if timings.get(start) and timings.get(end):
+                self.latencies[name].append((timings[end] - timings[start]) * 1000)
+
+    def summary(self):
+        """Return a dict of stage name: dict of count, p50, p99 and max latencies
+        in milliseconds, for stages with at least one latency.
+        """
+        summary = {}
+        for name, latencies in self.latencies.items():
+            values = latencies.view()
+            values = values[~np.isnan(values)]
+            if not len(values):
+                continue
+            p50, p99 = np.percentile(values, [50, 99])
+            summary[name] = {
+                "count": len(values),
+                "p50": round(float(p50), 3),
+                "p99": round(float(p99), 3),
+                "max": round(float(values.max()), 3),
+            }
+        return summary
+
+    def histogram(self, name):
+        """Return the counts of a stage's latencies in each of the BIN_EDGES bins."""
+        values = self.latencies[name].view()
+        return np.histogram(values[~np.isnan(values)], bins=BIN_EDGES)[0]
+
+    def export(self, path):
+        """Append the summary and histograms as a JSON line to a file,
+        for tracking latencies over time.
+        """
+        summary = self.summary()
+        for name, stats in summary.items():
+            stats["histogram"] = self.histogram(name).tolist()
+        line = {"timestamp": time.time(), "bin_edges_ms": BIN_EDGES.round(4).tolist(), "stages": summary}
+        with open(path, "a") as f:
+            f.write(json.dumps(line) + "\n")
+
+    def __str__(self):
+        return "\n".join(
+            f"{name:<8} p50 {stats['p50']:8.1f}ms  p99 {stats['p99']:8.1f}ms"
+            for name, stats in self.summary().items()
+        )
@@ -8,6 +8,8 @@ from PyQt5.QtWidgets import QApplication
 import hwmonitorGUI
 import message_workers
 import transport
+from history_store import HistoryStore
+from transport import codec
 
 
 logging.basicConfig(
@@ -20,13 +22,19 @@ logging.basicConfig(
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Hardware monitor")
     parser.add_argument("--fullscreen", action="store_true", help="fullscreen mode")
-    parser.add_argument("--debug", action="store_true", help="debug mode")
+    parser.add_argument("--debug", action="store_true", help="debug mode, showing message latencies on screen")
+    parser.add_argument("--latency-export", type=str, help="file to append per-stage message latencies to every minute, as JSON lines")
     parser.add_argument(
         "--transport",
-        choices=["LAN", "Pub/Sub"],
+        choices=["LAN", "UDP", "Pub/Sub"],
         default="LAN",
         help="transport layer to use for passing hardware readings between client and server. Defaults to LAN",
     )
+    parser.add_argument(
+        "--encoding",
+        choices=codec.ENCODINGS,
+        help="wire format of incoming hardware readings; JSON is always accepted. Overrides the encoding set in config.toml",
+    )
     parser.add_argument("--host", type=str, help="Socket host and port number for LAN transport in host:port format.")
     args = parser.parse_args()
 
@@ -40,8 +48,12 @@ if __name__ == "__main__":
             "port": int(port)
         }
 
+    if args.encoding:
+        transport.CONFIG["transport"]["encoding"] = args.encoding
+
     TRANSPORT_WORKER_MAP = {
-        "LAN": message_workers.LocalNetworkWorker
+        "LAN": message_workers.LocalNetworkWorker,
+        "UDP": message_workers.UDPWorker
     }
 
     # Only try to import the pubsub module if requested
@@ -55,7 +67,12 @@ if __name__ == "__main__":
 
     transport_class = TRANSPORT_WORKER_MAP[args.transport]
     logging.info("Using %s message transport layer", args.transport)
-    window = hwmonitorGUI.MainWindow(transport_class)
+    history = None
+    history_config = transport.CONFIG.get("display", {}).get("history", {})
+    if history_config.get("enabled", False):
+        history = HistoryStore.from_config(history_config)
+
+    window = hwmonitorGUI.MainWindow(transport_class, history=history)
     window.start_worker_threads()
 
     with open("style.qss") as f:
@@ -63,6 +80,10 @@ if __name__ == "__main__":
 
     if args.debug:
         logging.getLogger().setLevel("DEBUG")
+        window.show_latency_overlay()
+
+    if args.latency_export:
+        window.export_latency(args.latency_export)
 
     if args.fullscreen:
         window.showFullScreen()
@@ -1,7 +1,8 @@
+import socket
 import time
 
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional, Tuple
 
 
 # CPU Core utilization
@@ -10,6 +11,18 @@ class CPUCoreInfo(BaseModel):
     frequency: List[int] = Field(default_factory=list)
     temperature: List[int] = Field(default_factory=list)
 
+# Changed per-core values since the previous message as (core index, value) pairs
+class CPUCoreDelta(BaseModel):
+    utilization: List[Tuple[int, int]] = Field(default_factory=list)
+    frequency: List[Tuple[int, int]] = Field(default_factory=list)
+    temperature: List[Tuple[int, int]] = Field(default_factory=list)
+
+# Min, max and mean of a reading sampled over the publish interval
+class Aggregate(BaseModel):
+    min: float = 0.0
+    max: float = 0.0
+    mean: float = 0.0
+
 # CPU utilization
 class CPUInfo(BaseModel):
     utilization: int = 0  # system-wide percentage of total CPU time.
@@ -17,6 +30,8 @@ class CPUInfo(BaseModel):
     temperature: int = 0
     load_average_1min: float = 0.0  # 1 minute load average
     num_high_load_cores: int = 0  # number of cores with utilization above p%
+    utilization_stats: Aggregate = Aggregate()
+    temperature_stats: Aggregate = Aggregate()
     cores: CPUCoreInfo = CPUCoreInfo()
 
 # GPU utilization
@@ -25,6 +40,8 @@ class GPUInfo(BaseModel):
     mem_total: int = 1 # non-zero default value to avoid division by zero
     utilization: int = 0 
     temperature: int = 0
+    utilization_stats: Aggregate = Aggregate()
+    temperature_stats: Aggregate = Aggregate()
 
 # System RAM usage in MB
 class RAMInfo(BaseModel):
@@ -32,9 +49,22 @@ class RAMInfo(BaseModel):
     used: int = 0
     available: int = 0
 
+# Latency stamps along the path of a message as UNIX timestamps in seconds, 0 if not set.
+# The poller sets the collection and send times; the monitor adds the receive, decode and
+# paint times to the readings dict.
+class Timings(BaseModel):
+    collect_start: float = 0.0
+    collect_end: float = 0.0
+    sent: float = 0.0
+
 # Final, public, message model
 class MessageModel(BaseModel):
+    host: str = Field(default_factory=socket.gethostname)  # reporting host
     cpu: CPUInfo = CPUInfo()
-    gpu: GPUInfo = GPUInfo()
+    gpu: GPUInfo = GPUInfo()  # the primary device, same as gpus[0]
+    gpus: List[GPUInfo] = Field(default_factory=list)  # every GPU device
     ram: RAMInfo = RAMInfo()
     timestamp: float = Field(default_factory=time.time)  # current UNIX timestamp in seconds
+    sequence: int = 0  # message counter, used for delta encoding
+    cores_delta: Optional[CPUCoreDelta] = None  # set on delta messages in place of cpu.cores
+    timings: Timings = Field(default_factory=Timings)
@@ -1,7 +1,7 @@
 import logging
-import json
-import socket
+import threading
 import time
+from collections import defaultdict
 
 from PyQt5.QtCore import (
     QObject,
@@ -9,6 +9,11 @@ from PyQt5.QtCore import (
 )
 
 import transport
+from transport import codec
+from transport.delta import DeltaDecoder
+from transport.exceptions import DecodeError
+from transport.socket_server import FrameServer
+from transport.udp_server import DatagramServer
 
 
 logger = logging.getLogger()
@@ -26,16 +31,44 @@ class PubSubWorker(QObject):
 
         super().__init__()
         self.subscriber = Subscriber()
+        self.encoding = transport.CONFIG["transport"].get("encoding", "json")
+        # Messages from all pollers arrive on the same subscription:
+        # track delta state separately for each host.
+        self.delta_decoders = defaultdict(DeltaDecoder)
+        # Callbacks run concurrently in the subscriber's thread pool
+        self.decode_lock = threading.Lock()
 
     def process_response(self, message):
         """Callback for streaming pull: decode the raw pubsub message
         and emit hardware readings back to the main thread.
+        Samples of a batch message are emitted in timestamp order.
+        The poller's own timestamp is kept, so that latency stages can be measured;
+        Pub/Sub's publish time is added to the latency stamps.
         """
-        readings = json.loads(message.data.decode("utf-8"))
-
-        # Replace message timestamp with Pub/Subs own message timestamp
-        readings["timestamp"] = message.publish_time.timestamp()
-        self.update.emit(readings)
+        received = time.time()
+        try:
+            # Batches carry their number of samples as an attribute
+            if message.attributes.get("samples"):
+                payloads = codec.decode_batch(message.data)
+            else:
+                payloads = [message.data]
+
+            # Delta decode in publishing order
+            samples = []
+            for payload in payloads:
+                readings = codec.decode(payload, self.encoding)
+                with self.decode_lock:
+                    samples.append(self.delta_decoders[readings.get("host")].decode(readings))
+        except DecodeError as e:
+            logger.error("Discarding message: %s", e)
+            message.ack()
+            return
+
+        published = message.publish_time.timestamp()
+        for readings in sorted(samples, key=lambda readings: readings["timestamp"]):
+            codec.stamp_received(readings, received)
+            readings["timings"]["published"] = published
+            self.update.emit(readings)
         message.ack()
 
     def run(self):
@@ -44,36 +77,51 @@ class PubSubWorker(QObject):
 
 
 class LocalNetworkWorker(QObject):
-    """Worker class for socket based message thread."""
+    """Worker class for socket based message thread.
+    Runs an asyncio server in the worker thread, accepting any number of pollers.
+    """
+    update = pyqtSignal(dict)
+
+    def __init__(self):
+        super().__init__()
+        self.encoding = transport.CONFIG["transport"].get("encoding", "json")
+        self.server = None
+
+    def run(self):
+        socket_config = transport.CONFIG["transport"]["socket"]
+        self.server = FrameServer(
+            socket_config["host"],
+            socket_config["port"],
+            on_message=self.update.emit,
+            encoding=self.encoding,
+            idle_timeout=socket_config.get("idle_timeout", 30)
+        )
+        self.server.run()
+
+    def stop(self):
+        if self.server:
+            self.server.stop()
+
+
+class UDPWorker(QObject):
+    """Worker class for datagram based message thread."""
     update = pyqtSignal(dict)
 
     def __init__(self):
         super().__init__()
+        self.encoding = transport.CONFIG["transport"].get("encoding", "json")
+        self.server = None
 
     def run(self):
-        HOST = transport.CONFIG["transport"]["socket"]["host"]
-        PORT = transport.CONFIG["transport"]["socket"]["port"]
-
-        # Bind a socket and continously listen for incoming data
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            s.bind((HOST, PORT))
-            s.listen(0)
-
-            logger.info("Listening for connections on %s:%s", HOST, PORT)
-            while True:
-                conn, addr = s.accept()
-                with conn:
-                    logger.info("Connected by %s", addr)
-                    while True:
-                        # Read 1024 bytes;
-                        # we're assuming a single message fits into this buffer.
-                        data = conn.recv(1024)
-
-                        # If no data, the client has closed the connection.
-                        # Drop back to listening for new connections.
-                        if not data:
-                            logger.info("Client disconnected")
-                            break
-
-                        readings = json.loads(data.decode("utf-8"))
-                        self.update.emit(readings)
+        socket_config = transport.CONFIG["transport"]["socket"]
+        self.server = DatagramServer(
+            socket_config["host"],
+            socket_config["port"],
+            on_message=self.update.emit,
+            encoding=self.encoding
+        )
+        self.server.run()
+
+    def stop(self):
+        if self.server:
+            self.server.stop()
@@ -3,6 +3,9 @@ import logging
 
 import transport
 import transport.local_network_publisher
+import transport.udp_publisher
+from transport import codec
+from transport.metrics_server import MetricsServer
 
 
 logging.basicConfig(
@@ -16,12 +19,23 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Hardware poller")
     parser.add_argument(
         "--transport",
-        choices=["LAN", "Pub/Sub"],
+        choices=["LAN", "UDP", "Pub/Sub"],
         default="LAN",
         help="transport layer to use for publishing hardware readings.",
     )
+    parser.add_argument(
+        "--encoding",
+        choices=codec.ENCODINGS,
+        help="wire format for hardware readings. Overrides the encoding set in config.toml",
+    )
     parser.add_argument("--host", type=str, help="Socket host and port number for LAN transport in host:port format.")
     parser.add_argument("--print-metrics", help="Print hardware metrics to console", action="store_true")
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        help="Serve the latest readings as OpenMetrics text on this local HTTP port. "
+             "Overrides the [transport.metrics] settings in config.toml",
+    )
     args = parser.parse_args()
 
     if args.print_metrics:
@@ -29,7 +43,8 @@ if __name__ == "__main__":
 
         stats = transport.hw_stats.get_stats()
         print(stats.model_dump_json(indent=4))
-        print(f"Size: {len(stats.model_dump_json().encode())}B")
+        for encoding in codec.ENCODINGS:
+            print(f"Size ({encoding}): {len(codec.encode(stats, encoding))}B")
         exit(0)
 
     # Override host config if provided
@@ -40,8 +55,12 @@ if __name__ == "__main__":
             "port": int(port)
         }
 
+    if args.encoding:
+        transport.CONFIG["transport"]["encoding"] = args.encoding
+
     TRANSPORT_PUBLISHER_MAP = {
-        "LAN": transport.local_network_publisher.LocalNetworkPublisher
+        "LAN": transport.local_network_publisher.LocalNetworkPublisher,
+        "UDP": transport.udp_publisher.UDPPublisher
     }
 
     # Only try to import the pubsub module if requested
@@ -56,5 +75,12 @@ if __name__ == "__main__":
     publisher = TRANSPORT_PUBLISHER_MAP[args.transport]()
     logging.info("Using %s message transport layer", args.transport)
 
+    metrics_config = transport.CONFIG["transport"].get("metrics", {})
+    if args.metrics_port is not None:
+        metrics_config = {**metrics_config, "enabled": True, "port": args.metrics_port}
+    if metrics_config.get("enabled"):
+        publisher.metrics_server = MetricsServer.from_config(metrics_config)
+        publisher.metrics_server.start()
+
 
     publisher.publish()
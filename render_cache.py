@@ -0,0 +1,34 @@
+class RenderCache:
+    """Last rendered value of each widget property, for skipping widget updates
+    that would not change what is displayed.
+
+    Values are compared after formatting, eg. the label text or the bar heights,
+    so readings that only differ below the display precision are not redrawn.
+    """
+
+    def __init__(self):
+        self._rendered = {}
+        self.applied = 0  # widget updates made
+        self.skipped = 0  # widget updates skipped as unchanged
+
+    def update(self, key, value, apply):
+        """Apply a value to a widget if it differs from the last value applied under key.
+        Args:
+            key (hashable): name of the widget property, eg. "cpu %"
+            value: formatted value to display, comparable with ==
+            apply (callable): function updating the widget with value
+        Return:
+            True if the widget was updated
+        """
+        if key in self._rendered and self._rendered[key] == value:
+            self.skipped += 1
+            return False
+
+        apply(value)
+        self._rendered[key] = value
+        self.applied += 1
+        return True
+
+    def clear(self):
+        """Forget the rendered values, forcing the next update of every widget."""
+        self._rendered.clear()
@@ -0,0 +1,60 @@
+import numpy as np
+
+
+class RingBuffer:
+    """Fixed capacity time series buffer with O(1) appends and a contiguous,
+    copy-free view of the contents from oldest to newest.
+
+    Every value is written twice, capacity elements apart, to a backing array of
+    twice the capacity. The latest capacity values are then always available
+    as a single slice, without rearranging the buffer.
+    """
+
+    def __init__(self, capacity, fill=0.0):
+        """
+        Args:
+            capacity (int): number of values to keep
+            fill (float or array-like): initial contents, either a single value
+                or capacity values from oldest to newest
+        """
+        self.capacity = capacity
+        self._data = np.empty(2 * capacity, dtype=float)
+        self._data[:capacity] = fill
+        self._data[capacity:] = fill
+        self._start = 0  # index of the oldest value, also the next write position
+
+    def __len__(self):
+        return self.capacity
+
+    def append(self, value):
+        """Replace the oldest value with a new one."""
+        self._data[self._start] = value
+        self._data[self._start + self.capacity] = value
+        self._start = (self._start + 1) % self.capacity
+
+    def extend(self, values):
+        """Append several values at once, oldest first."""
+        values = np.asarray(values, dtype=float)[-self.capacity:]
+        n = len(values)
+        if not n:
+            return
+        # Rotate so that the oldest value is at the start of both halves, then overwrite
+        # the oldest n values
+        contents = np.concatenate([self.view()[n:], values])
+        self._data[:self.capacity] = contents
+        self._data[self.capacity:] = contents
+        self._start = 0
+
+    @property
+    def last(self):
+        """The newest value."""
+        return self._data[self._start + self.capacity - 1]
+
+    def view(self):
+        """Return a read-only view of the contents from oldest to newest.
+        The view is only valid until the next append: copy it before handing it
+        to code that keeps it, eg. pyqtgraph's setData.
+        """
+        view = self._data[self._start:self._start + self.capacity]
+        view.flags.writeable = False
+        return view
@@ -0,0 +1,115 @@
+import time
+
+import numpy as np
+
+from ring_buffer import RingBuffer
+
+
+# Bucket size and time span in seconds of each rollup level, finest first
+LEVELS = (
+    (10, 3600),  # 1 h
+    (120, 24 * 3600),  # 24 h
+    (900, 7 * 24 * 3600),  # 7 d
+)
+
+
+class Rollup:
+    """Min, max and mean of a time series over fixed-size time buckets,
+    for a single resolution level.
+
+    Completed buckets are kept in ring buffers covering span seconds, the bucket
+    being filled is kept as running values. Min and max are taken from the
+    min and max of each sample, so peaks within a sample interval are preserved.
+    """
+
+    def __init__(self, resolution, span, end=None):
+        """
+        Args:
+            resolution (int): bucket size in seconds
+            span (int): time span of the history in seconds
+            end (float): UNIX timestamp to end the initial zero history at, defaults to now
+        """
+        self.resolution = resolution
+        self.span = span
+        capacity = span // resolution
+
+        # Initialize history with zeros for the preceding time window
+        if end is None:
+            end = time.time()
+        end = end // resolution * resolution
+        self.timestamps = RingBuffer(capacity, end - resolution*np.arange(capacity, 0, -1))
+        self.mean = RingBuffer(capacity)
+        self.min = RingBuffer(capacity)
+        self.max = RingBuffer(capacity)
+
+        self._bucket = None
+        self._reset_bucket()
+
+    def add(self, timestamp, value, min_value, max_value):
+        """Add a sample. Samples must be added in timestamp order."""
+        bucket = timestamp // self.resolution
+        if bucket != self._bucket:
+            self._complete_bucket()
+            self._bucket = bucket
+
+        self._min = min(self._min, min_value)
+        self._max = max(self._max, max_value)
+        self._total += value
+        self._count += 1
+
+    def extend(self, timestamps, values, min_values, max_values, counts=None):
+        """Add samples in timestamp order at once, eg. when restoring history.
+        Args:
+            timestamps, values, min_values, max_values (np.ndarray): sample arrays of equal length
+            counts (np.ndarray): number of samples each value is the mean of, for adding
+                stored buckets. Defaults to single samples.
+        """
+        if not len(timestamps):
+            return
+
+        # Group samples by bucket, merging the first group with the bucket being filled
+        buckets = np.asarray(timestamps) // self.resolution
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(buckets)) + 1])
+        values = np.asarray(values, dtype=float)
+        if counts is None:
+            counts = np.diff(np.append(starts, len(buckets)))
+        else:
+            counts = np.asarray(counts, dtype=float)
+            values = values * counts
+            counts = np.add.reduceat(counts, starts)
+        totals = np.add.reduceat(values, starts)
+        mins = np.minimum.reduceat(np.asarray(min_values, dtype=float), starts)
+        maxs = np.maximum.reduceat(np.asarray(max_values, dtype=float), starts)
+
+        if buckets[0] == self._bucket:
+            totals[0] += self._total
+            counts[0] += self._count
+            mins[0] = min(mins[0], self._min)
+            maxs[0] = max(maxs[0], self._max)
+        else:
+            self._complete_bucket()
+
+        # Every group but the last is complete
+        self.timestamps.extend(buckets[starts[:-1]] * self.resolution)
+        self.mean.extend(totals[:-1] / counts[:-1])
+        self.min.extend(mins[:-1])
+        self.max.extend(maxs[:-1])
+
+        self._bucket = buckets[-1]
+        self._total, self._count = totals[-1], counts[-1]
+        self._min, self._max = mins[-1], maxs[-1]
+
+    def _complete_bucket(self):
+        """Move the bucket being filled to the history."""
+        if self._count:
+            self.timestamps.append(self._bucket * self.resolution)
+            self.mean.append(self._total / self._count)
+            self.min.append(self._min)
+            self.max.append(self._max)
+        self._reset_bucket()
+
+    def _reset_bucket(self):
+        self._min = float("inf")
+        self._max = float("-inf")
+        self._total = 0.0
+        self._count = 0
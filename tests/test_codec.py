@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from transport import codec
+from transport.exceptions import DecodeError
+from message_models import Aggregate, GPUInfo, MessageModel, Timings
+
+
+
+@pytest.fixture
+def mock_msg(mock_msg_data):
+    msg = MessageModel(**mock_msg_data)
+    msg.cpu.cores.frequency = [3400, 3600, 2200, 800]
+    msg.cpu.cores.temperature = [45, 47]
+    return msg
+
+
+@pytest.mark.parametrize("encoding", codec.ENCODINGS)
+def test_round_trip(mock_msg, encoding):
+    """Decoding an encoded message should give the original readings."""
+    data = codec.encode(mock_msg, encoding)
+    assert codec.decode(data, encoding) == mock_msg.model_dump()
+
+def test_aggregates_round_trip(mock_msg):
+    """Sub-interval aggregates should survive binary encoding to half precision."""
+    msg = mock_msg.model_copy(deep=True)
+    msg.cpu.utilization_stats = Aggregate(min=2.5, max=97, mean=41.25)
+    msg.gpu.temperature_stats = Aggregate(min=60, max=71.5, mean=65.123)
+
+    readings = codec.decode(codec.encode(msg, "binary"), "binary")
+    assert readings["cpu"]["utilization_stats"] == {"min": 2.5, "max": 97, "mean": 41.25}
+    assert readings["gpu"]["temperature_stats"]["mean"] == pytest.approx(65.123, abs=0.05)
+
+@pytest.mark.parametrize("encoding", codec.ENCODINGS)
+def test_latency_stamps(mock_msg, encoding):
+    """Poller side latency stamps should be sent, and receive side stamps added on decode."""
+    msg = mock_msg.model_copy(deep=True)
+    msg.timings = Timings(collect_start=1000.25, collect_end=1000.5, sent=1001.125)
+
+    readings = codec.stamp_received(codec.decode(codec.encode(msg, encoding), encoding), received=1001.5)
+    timings = readings["timings"]
+    assert (timings["collect_start"], timings["collect_end"], timings["sent"]) == (1000.25, 1000.5, 1001.125)
+    assert timings["received"] == 1001.5
+    assert timings["decoded"] >= timings["received"]
+
+def test_multi_gpu_round_trip(mock_msg):
+    msg = mock_msg.model_copy(deep=True)
+    msg.gpus = [GPUInfo(mem_used=1000, utilization=5), GPUInfo(mem_total=24000, temperature=81)]
+
+    readings = codec.decode(codec.encode(msg, "binary"), "binary")
+    assert readings == msg.model_dump()
+
+def test_binary_is_versioned(mock_msg):
+    """Binary messages should start with the schema version."""
+    data = codec.encode(mock_msg, "binary")
+    assert data[0] == codec.BINARY_VERSION
+    assert len(data) < len(codec.encode(mock_msg, "json"))
+
+def test_json_fallback(mock_msg):
+    """JSON messages should be accepted when binary encoding is expected."""
+    data = mock_msg.model_dump_json().encode()
+    assert codec.decode(memoryview(data), "binary") == json.loads(data)
+
+def test_binary_rejected_in_json_mode(mock_msg):
+    """Binary messages should not be accepted unless enabled."""
+    data = codec.encode(mock_msg, "binary")
+    with pytest.raises(DecodeError):
+        codec.decode(data, "json")
+
+def test_unsupported_binary_version(mock_msg):
+    data = bytearray(codec.encode(mock_msg, "binary"))
+    data[0] = codec.BINARY_VERSION + 1
+    with pytest.raises(DecodeError):
+        codec.decode(data, "binary")
+
+def test_truncated_binary_message(mock_msg):
+    data = codec.encode(mock_msg, "binary")
+    with pytest.raises(DecodeError):
+        codec.decode(data[:-1], "binary")
+
+@pytest.mark.parametrize("encoding", codec.ENCODINGS)
+def test_batch_round_trip(mock_msg, encoding):
+    """Messages packed into a batch should decode to the original readings in order."""
+    msgs = [mock_msg.model_copy(update={"timestamp": t}) for t in (1000, 1002, 1001)]
+    payloads = codec.decode_batch(codec.encode_batch([codec.encode(msg, encoding) for msg in msgs]))
+    assert [codec.decode(payload, encoding) for payload in payloads] == [msg.model_dump() for msg in msgs]
+
+def test_truncated_batch(mock_msg):
+    data = codec.encode_batch([codec.encode(mock_msg, "binary")] * 2)
+    for end in (len(data) - 1, len(data) // 2 + 2):
+        with pytest.raises(DecodeError):
+            codec.decode_batch(data[:end])
@@ -0,0 +1,101 @@
+from transport import codec
+from transport.delta import DeltaDecoder, DeltaEncoder
+from message_models import CPUCoreInfo, CPUInfo, MessageModel
+
+
+
+def make_msg(utilization, frequency=None):
+    return MessageModel(cpu=CPUInfo(cores=CPUCoreInfo(
+        utilization=utilization,
+        frequency=frequency or [3000] * len(utilization),
+        temperature=[40]
+    )))
+
+
+def test_keyframe_interval():
+    """Full per-core lists should be sent every keyframe_interval messages,
+    deltas of changed values in between.
+    """
+    encoder = DeltaEncoder(keyframe_interval=3)
+    msgs = [encoder.encode(make_msg([i, 0, 0])) for i in range(7)]
+
+    assert [m.cores_delta is None for m in msgs] == [True, False, False, True, False, False, True]
+    assert [m.sequence for m in msgs] == list(range(7))
+
+    delta = msgs[1].cores_delta
+    assert delta.utilization == [(0, 1)]
+    assert delta.frequency == []
+    assert msgs[1].cpu.cores.utilization == []
+
+def test_core_count_change_sends_keyframe():
+    encoder = DeltaEncoder(keyframe_interval=10)
+    encoder.encode(make_msg([1, 2]))
+    assert encoder.encode(make_msg([1, 2, 3])).cores_delta is None
+
+def test_source_message_not_modified():
+    """Encoding should not modify the original message."""
+    encoder = DeltaEncoder(keyframe_interval=10)
+    encoder.encode(make_msg([1, 2]))
+    msg = make_msg([5, 2])
+    encoder.encode(msg)
+    assert msg.cpu.cores.utilization == [5, 2]
+    assert msg.cores_delta is None
+
+def test_decoder_rebuilds_cores():
+    """Decoded messages should match the original full messages over both encodings."""
+    for encoding in codec.ENCODINGS:
+        encoder = DeltaEncoder(keyframe_interval=4)
+        decoder = DeltaDecoder()
+        for i in range(10):
+            msg = make_msg([i, i % 3, 7], frequency=[3000 + i, 3000, 2000])
+            data = codec.encode(encoder.encode(msg), encoding)
+            readings = decoder.decode(codec.decode(data, encoding))
+
+            assert readings["cpu"]["cores"] == msg.cpu.cores.model_dump()
+            assert "cores_delta" not in readings
+
+def test_decoder_resyncs_on_keyframe():
+    """After a lost message deltas should be ignored until the next keyframe."""
+    encoder = DeltaEncoder(keyframe_interval=4)
+    decoder = DeltaDecoder()
+    msgs = [encoder.encode(make_msg([i, 0])) for i in range(6)]
+
+    decoder.decode(msgs[0].model_dump())
+    decoder.decode(msgs[1].model_dump())
+    # msgs[2] lost: keep showing the last known values
+    readings = decoder.decode(msgs[3].model_dump())
+    assert not decoder.synced
+    assert readings["cpu"]["cores"]["utilization"] == [1, 0]
+
+    readings = decoder.decode(msgs[4].model_dump())
+    assert decoder.synced
+    assert readings["cpu"]["cores"]["utilization"] == [4, 0]
+
+    readings = decoder.decode(msgs[5].model_dump())
+    assert readings["cpu"]["cores"]["utilization"] == [5, 0]
+
+def test_decoder_joining_mid_stream():
+    """A decoder without a keyframe should pass deltas through with empty core lists."""
+    encoder = DeltaEncoder(keyframe_interval=4)
+    encoder.encode(make_msg([1, 0]))
+
+    readings = DeltaDecoder().decode(encoder.encode(make_msg([2, 0])).model_dump())
+    assert readings["cpu"]["cores"]["utilization"] == []
+
+def test_json_delta_smaller_than_keyframe():
+    """JSON deltas should leave out the per-core lists and unchanged fields."""
+    encoder = DeltaEncoder(keyframe_interval=4)
+    keyframe = codec.encode(encoder.encode(make_msg([1, 2, 3, 4])))
+    delta = codec.encode(encoder.encode(make_msg([1, 5, 3, 4])))
+    assert len(delta) < len(keyframe)
+
+    readings = codec.decode(delta)
+    assert "cores" not in readings["cpu"]
+    assert readings["cores_delta"] == {"utilization": [[1, 5]]}
+
+def test_json_delta_joining_mid_stream():
+    encoder = DeltaEncoder(keyframe_interval=4)
+    encoder.encode(make_msg([1, 0]))
+
+    readings = DeltaDecoder().decode(codec.decode(codec.encode(encoder.encode(make_msg([2, 0])))))
+    assert readings["cpu"]["cores"]["utilization"] == []
@@ -0,0 +1,76 @@
+import socket
+
+import pytest
+
+from transport import framing
+from transport.exceptions import FramingError
+
+
+
+def test_frames_split_across_reads():
+    """A frame split over several reads should be decoded once complete."""
+    data = framing.encode_frame(b'{"cpu": {}}')
+    decoder = framing.FrameDecoder()
+
+    decoder.feed(data[:2])
+    assert list(decoder.frames()) == []
+
+    decoder.feed(data[2:7])
+    assert list(decoder.frames()) == []
+
+    decoder.feed(data[7:])
+    assert [bytes(f) for f in decoder.frames()] == [b'{"cpu": {}}']
+    assert decoder.pending == 0
+
+def test_coalesced_frames_drained_in_one_pass():
+    """Multiple frames received in a single read should all be drained."""
+    payloads = [b"a", b"", b"bc" * 100, b"d"]
+    decoder = framing.FrameDecoder()
+    decoder.feed(b"".join(framing.encode_frame(p) for p in payloads))
+
+    assert [bytes(f) for f in decoder.frames()] == payloads
+
+def test_buffer_grows_for_large_frames():
+    """Frames larger than the initial buffer should be received in full."""
+    payload = bytes(range(256)) * 64  # 16kB
+    decoder = framing.FrameDecoder(buffer_size=1024)
+    decoder.feed(framing.encode_frame(payload) + framing.encode_frame(b"x"))
+
+    assert [bytes(f) for f in decoder.frames()] == [payload, b"x"]
+
+def test_buffer_is_reused():
+    """Steady state decoding should not reallocate the receive buffer."""
+    decoder = framing.FrameDecoder(buffer_size=64)
+    buffer = decoder._buffer
+    frame = framing.encode_frame(b"0123456789")
+
+    # Feed frames in uneven chunks to force wraparounds
+    stream = frame * 50
+    for i in range(0, len(stream), 9):
+        decoder.feed(stream[i:i+9])
+        for f in decoder.frames():
+            assert bytes(f) == b"0123456789"
+
+    assert decoder._buffer is buffer
+
+def test_recv_from_socket():
+    """recv_from should read directly into the decoder buffer."""
+    a, b = socket.socketpair()
+    with a, b:
+        a.sendall(framing.encode_frame(b"first") + framing.encode_frame(b"second"))
+        a.close()
+
+        decoder = framing.FrameDecoder()
+        frames = []
+        while decoder.recv_from(b):
+            frames.extend(bytes(f) for f in decoder.frames())
+
+    assert frames == [b"first", b"second"]
+
+def test_oversized_frame_header():
+    """A garbage length header should raise a FramingError."""
+    decoder = framing.FrameDecoder()
+    decoder.feed(b'{"cpu": {}}')
+
+    with pytest.raises(FramingError):
+        list(decoder.frames())
@@ -0,0 +1,231 @@
+import copy
+import datetime
+import os
+import time
+
+import numpy as np
+import pytest
+from freezegun import freeze_time
+
+import rollup
+from history_store import HistoryStore, read_segment
+from host_store import HostStore
+
+
+@pytest.fixture
+def make_readings(mock_msg_data):
+    def make(timestamp, host="host-a", utilization=10):
+        readings = copy.deepcopy(mock_msg_data)
+        readings["timestamp"] = timestamp
+        readings["host"] = host
+        readings["cpu"]["utilization"] = utilization
+        return readings
+    return make
+
+
+def append_at(store, readings):
+    """Append readings with the time of writing at their timestamp."""
+    with freeze_time(datetime.datetime.fromtimestamp(readings["timestamp"], datetime.timezone.utc)):
+        store.append(readings)
+
+
+def test_round_trip(tmp_path, make_readings):
+    store = HistoryStore(str(tmp_path))
+    for i in range(10):
+        store.append(make_readings(1000 + i, utilization=i))
+    store.close()
+
+    records = HistoryStore(str(tmp_path)).load(since=1005)
+    assert records["timestamp"].tolist() == [1005, 1006, 1007, 1008, 1009]
+    assert records["cpu_utilization"].tolist() == [5, 6, 7, 8, 9]
+    assert records["host"][0] == 0
+    assert records["gpu_temperature"][0] == 70
+    # Messages without sub-sampling aggregates use the plain value
+    assert records["cpu_utilization_min"].tolist() == records["cpu_utilization"].tolist()
+
+def test_segment_rotation(tmp_path, make_readings):
+    """Segments should rotate on time and when full, and be truncated when closed."""
+    store = HistoryStore(str(tmp_path), segment_minutes=1)
+    for i in range(0, 180, 20):
+        append_at(store, make_readings(1000 + i))
+    store.close()
+
+    paths = store.log._segment_paths()
+    assert [len(read_segment(path)) for path in paths] == [3, 3, 3]
+    assert os.path.getsize(paths[0]) < 1000
+    assert len(store.load(since=0)) == 9
+
+    # Only segments overlapping the requested window are read
+    assert store.load(since=1125)["timestamp"].tolist() == [1140, 1160]
+
+    # Filled within the same millisecond
+    store = HistoryStore(str(tmp_path / "full"), segment_records=4)
+    with freeze_time(datetime.datetime.fromtimestamp(1000, datetime.timezone.utc)):
+        for i in range(10):
+            store.append(make_readings(1000 + i))
+    store.close()
+    assert [len(read_segment(path)) for path in store.log._segment_paths()] == [4, 4, 2]
+
+def test_unclosed_segment(tmp_path, make_readings):
+    """Records of a segment left open by a crash should be readable up to the last record written."""
+    store = HistoryStore(str(tmp_path), segment_records=100)
+    for i in range(3):
+        store.append(make_readings(1000 + i))
+    store.sync()
+
+    records = HistoryStore(str(tmp_path)).load(since=0)
+    assert records["timestamp"].tolist() == [1000, 1001, 1002]
+    store.close()
+
+def test_batched_sync(tmp_path, make_readings):
+    store = HistoryStore(str(tmp_path), sync_interval=3600)
+    for i in range(100):
+        store.append(make_readings(1000 + i))
+    assert store.syncs == 0
+
+    store.sync_interval = 0
+    store.append(make_readings(1100))
+    assert store.syncs == 1
+    store.close()
+
+def test_retention(tmp_path, make_readings):
+    store = HistoryStore(str(tmp_path), segment_minutes=60, retention_days=1)
+    day = 24 * 3600
+    for timestamp in [0, 3600, day, day + 3600, 2 * day + 3600]:
+        append_at(store, make_readings(1000 + timestamp))
+    store.close()
+
+    starts = [store.log._segment_start(path) - 1000 for path in store.log._segment_paths()]
+    assert starts == [day, day + 3600, 2 * day + 3600]
+
+def test_skewed_timestamps(tmp_path, make_readings):
+    """Segments should be started and expired by the time of writing, whatever the clocks of the pollers."""
+    now = time.time()
+    year = 365 * 24 * 3600
+    store = HistoryStore(str(tmp_path), segment_minutes=1, retention_days=1)
+    for timestamp, host in [(now, "host-a"), (now + year, "host-ahead"), (now - year, "host-behind"), (now + 1, "host-a")]:
+        store.append(make_readings(timestamp, host=host))
+    store.close()
+
+    paths = store.log._segment_paths()
+    assert len(paths) == 1
+    assert store.log._segment_start(paths[0]) == pytest.approx(now, abs=60)
+    assert store.load(since=0)["timestamp"].tolist() == [now - year, now, now + 1, now + year]
+
+def test_restore_host_store(tmp_path, make_readings):
+    """Stored history should fill the history of every host."""
+    store = HistoryStore(str(tmp_path))
+    for i in range(6):
+        store.append(make_readings(1000 + i, host=f"host-{'ab'[i % 2]}", utilization=i))
+    store.close()
+
+    host_store = HostStore(num_datapoints=5, refresh_interval=1)
+    host_store.restore(store.load(since=0), store.hosts)
+    assert list(host_store.hosts) == ["host-a", "host-b"]
+    state = host_store["host-b"]
+    assert state.timestamps.view()[-3:].tolist() == [1001, 1003, 1005]
+    assert state.utilization["cpu"].view()[-3:].tolist() == [1, 3, 5]
+    assert state.readings is None
+
+def test_long_host_names(tmp_path, make_readings):
+    """Host names should be stored in full, whatever their length."""
+    host = "build-worker-17.eu-west-1.example.internal"
+    store = HistoryStore(str(tmp_path))
+    store.append(make_readings(1000, host="host-a"))
+    store.append(make_readings(1001, host=host))
+    store.close()
+
+    store = HistoryStore(str(tmp_path))
+    assert store.hosts == ["host-a", host]
+    host_store = HostStore(num_datapoints=5, refresh_interval=1)
+    host_store.restore(store.load(since=0), store.hosts)
+    assert list(host_store.hosts) == ["host-a", host]
+
+    # Known hosts keep their index
+    store.append(make_readings(1002, host=host))
+    store.close()
+    assert store.load(since=0)["host"].tolist() == [0, 1, 1]
+
+def test_restored_hosts_not_cycled(tmp_path, make_readings):
+    """Hosts with only restored history should be skipped until they report."""
+    store = HistoryStore(str(tmp_path))
+    for i, host in enumerate(["host-a", "host-b", "host-c"]):
+        store.append(make_readings(1000 + i, host=host))
+    store.close()
+
+    host_store = HostStore(num_datapoints=5, refresh_interval=1)
+    host_store.restore(store.load(since=0), store.hosts)
+    host_store.ingest(make_readings(1010, host="host-b"))
+    host_store.ingest(make_readings(1010, host="host-c"))
+    assert host_store.next_host("host-b") == "host-c"
+    assert host_store.next_host("host-c") == "host-b"
+    assert host_store.next_host(None) == "host-b"
+
+
+def assert_same_rollups(state, expected, start):
+    """Compare the rollup buckets of two host states from start, past their placeholder history."""
+    for key in ("cpu", "gpu"):
+        for level, expected_level in zip(state.rollups[key], expected.rollups[key]):
+            count = np.count_nonzero(expected_level.timestamps.view() >= start // level.resolution * level.resolution)
+            for name in ("timestamps", "mean", "min", "max"):
+                assert np.allclose(getattr(level, name).view()[-count:], getattr(expected_level, name).view()[-count:])
+
+def test_stored_rollups(tmp_path, make_readings):
+    """The rollups should be restored from the stored buckets and the records of the history window only,
+    including a bucket stored in parts over a restart.
+    """
+    now = 100_000
+    timestamps = np.arange(now - 3000, now, 7)
+    store = HistoryStore(str(tmp_path))
+    for i, timestamp in enumerate(timestamps):
+        if i == 201:
+            store.close()
+            store = HistoryStore(str(tmp_path))
+        store.append(make_readings(float(timestamp), utilization=i % 100))
+    store.close()
+
+    expected = HostStore(num_datapoints=30, refresh_interval=7)
+    expected.restore(store.load(since=0), store.hosts)
+
+    store = HistoryStore(str(tmp_path))
+    records, rollups = store.load_history(300, now=now)
+    assert records["timestamp"][0] >= now - 300
+    assert [len(rollups[resolution]) for resolution, _ in rollup.LEVELS] == [301, 27, 6]
+
+    host_store = HostStore(num_datapoints=30, refresh_interval=7)
+    host_store.restore(records, store.hosts, rollups)
+    state = host_store["host-a"]
+    assert state.last == timestamps[-1]
+    assert state.timestamps.view().tolist() == expected["host-a"].timestamps.view().tolist()
+    assert_same_rollups(state, expected["host-a"], timestamps[0])
+
+    # The running buckets continue after the restore
+    state.ingest(make_readings(float(now + 1000), utilization=50))
+    expected["host-a"].ingest(make_readings(float(now + 1000), utilization=50))
+    assert_same_rollups(state, expected["host-a"], timestamps[0])
+
+def test_rebuild_rollups(tmp_path, make_readings):
+    """Buckets lost with a store that was not closed should be rebuilt from the records, and stored."""
+    now = 100_000
+    store = HistoryStore(str(tmp_path))
+    for i, timestamp in enumerate(range(now - 2000, now, 5)):
+        store.append(make_readings(float(timestamp), host=f"host-{'ab'[i % 2]}", utilization=i % 100))
+    store.sync()
+
+    expected = HostStore(num_datapoints=30, refresh_interval=5)
+    expected.restore(store.load(since=0), store.hosts)
+
+    restarted = HistoryStore(str(tmp_path))
+    assert not restarted.closed_cleanly
+    records, rollups = restarted.load_history(60, now=now)
+    host_store = HostStore(num_datapoints=30, refresh_interval=5)
+    host_store.restore(records, restarted.hosts, rollups)
+    for host in ("host-a", "host-b"):
+        assert_same_rollups(host_store[host], expected[host], now - 2000)
+    restarted.close()
+    store._buckets.clear()  # lost with the killed monitor
+    store.close()
+
+    restarted = HistoryStore(str(tmp_path))
+    assert restarted.closed_cleanly
+    assert [len(buckets) for buckets in restarted.load_rollups(now).values()] == [400, 36, 8]
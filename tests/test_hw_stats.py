@@ -1,5 +1,9 @@
 from unittest.mock import patch, MagicMock
 import importlib
+from collections import namedtuple
+import sys
+import threading
+import time
 import pytest
 
 from transport import hw_stats
@@ -8,6 +12,15 @@ import message_models
 
 
 
+@pytest.fixture
+def collectors(monkeypatch):
+    """A fresh collector registry with the default collectors and no thread pool."""
+    fresh = {name: hw_stats.Collector(name, c.func, c.timeout) for name, c in hw_stats.COLLECTORS.items()}
+    monkeypatch.setattr("transport.hw_stats.COLLECTORS", fresh)
+    monkeypatch.setattr("transport.hw_stats.collector_pool", None)
+    monkeypatch.setitem(hw_stats.transport.CONFIG["transport"], "collectors", {})
+    return fresh
+
 @pytest.fixture
 def gpuinfo_mock(monkeypatch):
     mock = MagicMock()
@@ -33,17 +46,17 @@ def test_get_ram_info(mock_virtual_memory):
     assert result.available == 3500
 
 @patch("transport.hw_stats.try_get_gpu_handle")
-def test_graphics_handle_not_available(mock_get_gpu_handle, gpuinfo_mock):
+def test_graphics_handle_not_available(mock_get_gpu_handle, monkeypatch):
     """If a gprahics library cannot be initialized,
-    _get_gpu_info should return an empty GPUInfo model.
+    _get_gpus_info should return no devices.
     """
+    monkeypatch.setattr("transport.hw_stats.GPU_DEVICE_HANDLE_LOADED", False)
     mock_get_gpu_handle.return_value = None
-    result = hw_stats._get_gpu_info()
-    gpuinfo_mock.assert_called_once_with()
-    assert result == gpuinfo_mock.return_value
+    result = hw_stats._get_gpus_info()
+    assert result == []
 
 def test_gpu_handle_not_loaded_twice(monkeypatch):
-    """_get_gpu_info should only attempt to load the GPU handle
+    """_get_gpus_info should only attempt to load the GPU handles
     on first call.
     """
     monkeypatch.setattr("transport.hw_stats.GPU_DEVICE_HANDLE_LOADED", False)
@@ -51,25 +64,66 @@ def test_gpu_handle_not_loaded_twice(monkeypatch):
     with patch("transport.hw_stats.try_get_gpu_handle") as mock_get_gpu_handle:
         # First call: should attempt to load handle
         mock_get_gpu_handle.return_value = None
-        hw_stats._get_gpu_info()
+        hw_stats._get_gpus_info()
         mock_get_gpu_handle.assert_called_once()
 
         mock_get_gpu_handle.reset_mock()
 
         # Second call: should NOT attempt to load handle again
-        hw_stats._get_gpu_info()
+        hw_stats._get_gpus_info()
         mock_get_gpu_handle.assert_not_called()
 
 @patch("transport.hw_stats._get_nvidia_gpu_info")
 def test_nvml_available(mock_get_nvidia_gpu_info, monkeypatch):
-    """If pynvml is available, _get_nvidia_gpu_info should be used for GPU stats."""
-    mock_device_handle = MagicMock()
+    """If pynvml is available, _get_nvidia_gpu_info should be used for the stats of every GPU."""
+    handles = [MagicMock(), MagicMock()]
 
     monkeypatch.setattr("transport.hw_stats.GPU_DEVICE_HANDLE_LOADED", True)
-    monkeypatch.setattr("transport.hw_stats.handle_config", ("NVIDIA", mock_device_handle))
-    hw_stats._get_gpu_info()
+    monkeypatch.setattr("transport.hw_stats.handle_config", ("NVIDIA", handles))
+    result = hw_stats._get_gpus_info()
+
+    assert [c.args for c in mock_get_nvidia_gpu_info.call_args_list] == [(handles[0],), (handles[1],)]
+    assert len(result) == 2
 
-    mock_get_nvidia_gpu_info.assert_called_once_with(mock_device_handle)
+@patch("transport.hw_stats.amdsmi", create=True)
+def test_radeon_multi_gpu(mock_amdsmi, monkeypatch):
+    """Every AMD device should be queried in a single pass."""
+    handles = ["gpu0", "gpu1", "gpu2"]
+    mock_amdsmi.amdsmi_get_gpu_metrics_info.side_effect = lambda h: {
+        "average_gfx_activity": 10 * (handles.index(h)+1), "temperature_vrgfx": 50
+    }
+    mock_amdsmi.amdsmi_get_gpu_vram_usage.return_value = {"vram_used": 1000, "vram_total": 8000}
+
+    monkeypatch.setattr("transport.hw_stats.GPU_DEVICE_HANDLE_LOADED", True)
+    monkeypatch.setattr("transport.hw_stats.handle_config", ("AMD", handles))
+    result = hw_stats._get_gpus_info()
+
+    assert [gpu.utilization for gpu in result] == [10, 20, 30]
+    assert mock_amdsmi.amdsmi_get_gpu_metrics_info.call_count == 3
+
+@patch("transport.hw_stats.pynvml")
+def test_try_get_nvidia_handles(mock_pynvml, monkeypatch):
+    """A handle should be returned for every NVIDIA device."""
+    monkeypatch.setattr("transport.hw_stats.amdsmi", MagicMock(), raising=False)
+    hw_stats.amdsmi.amdsmi_init.side_effect = DummyAmdSmiException
+    hw_stats.amdsmi.AmdSmiException = DummyAmdSmiException
+    mock_pynvml.nvmlDeviceGetCount.return_value = 2
+    mock_pynvml.nvmlDeviceGetHandleByIndex.side_effect = lambda i: f"handle{i}"
+
+    with patch("atexit.register"):
+        assert hw_stats.try_get_gpu_handle() == ("NVIDIA", ["handle0", "handle1"])
+
+def test_get_stats_multi_gpu(collectors):
+    """The first GPU should also be sent as the primary device."""
+    gpus = [message_models.GPUInfo(utilization=10), message_models.GPUInfo(utilization=20)]
+    collectors.clear()
+    collectors["gpu"] = hw_stats.Collector("gpu", lambda: gpus, timeout=1)
+
+    with patch("transport.hw_stats.SUBSAMPLER_LOADED", True), patch("transport.hw_stats.subsampler", None):
+        msg = hw_stats.get_stats()
+    assert msg.gpu.utilization == 10
+    assert [gpu.utilization for gpu in msg.gpus] == [10, 20]
+    assert msg.gpus[1].utilization_stats.max == 20
 
 @patch("transport.hw_stats.pynvml")
 def test_get_nvidia_gpu_info(mock_pynvml, gpuinfo_mock):
@@ -106,21 +160,22 @@ def test_try_get_gpu_handle(mock_register):
         mock_handle = MagicMock()
         mock_amdsmi.amdsmi_get_processor_handles.return_value = [mock_handle]
 
-        vendor, handle = hw_stats.try_get_gpu_handle()
+        vendor, handles = hw_stats.try_get_gpu_handle()
         mock_register.is_called_with(mock_amdsmi.amdsmi_shut_down)
         assert vendor == "AMD"
-        assert handle == mock_handle
+        assert handles == [mock_handle]
 
     # amdmsi not available, pynvml is available: should return NVIDIA handle
     with patch("transport.hw_stats.pynvml") as mock_pynvml:
         with patch("transport.hw_stats.amdsmi.amdsmi_init", side_effect=DummyAmdSmiException):
             mock_handle = MagicMock()
             mock_pynvml.nvmlDeviceGetHandleByIndex.return_value = mock_handle
+            mock_pynvml.nvmlDeviceGetCount.return_value = 1
 
-            vendor, handle = hw_stats.try_get_gpu_handle()
+            vendor, handles = hw_stats.try_get_gpu_handle()
             mock_register.is_called_with(mock_pynvml.nvmlShutdown)
             assert vendor == "NVIDIA"
-            assert handle == mock_handle
+            assert handles == [mock_handle]
 
     # neither library available: should return None
     with patch("transport.hw_stats.amdsmi.amdsmi_init", side_effect=DummyAmdSmiException):
@@ -138,4 +193,257 @@ def test_cpu_temps_not_available(monkeypatch):
     result = hw_stats._get_cpu_temps()
     assert len(result) == 1
     assert result[0].label == "N/A"
-    assert result[0].value == 0
\ No newline at end of file
+    assert result[0].value == 0
+
+def test_get_cpu_info_from_snapshot():
+    """Aggregate CPU values should be derived from the per-core snapshot values."""
+    Freq = namedtuple("Freq", ["current"])
+    snapshot = hw_stats.Snapshot(
+        cpu_percent=[10.0, 80.0, 60.0, 30.0],
+        cpu_freq=[Freq(3000.0), Freq(3200.0), Freq(800.0), Freq(1000.0)],
+        cpu_temps=[hw_stats.CoreTemp("Core 0", 45.0), hw_stats.CoreTemp("Core 1", 47.0), hw_stats.CoreTemp("Package id 0", 50.0)],
+        load_average=(1.5, 1.0, 0.5),
+        memory=None
+    )
+
+    result = hw_stats._get_cpu_info(snapshot)
+    assert result.utilization == 45
+    assert result.frequency == 2000
+    assert result.temperature == 50
+    assert result.num_high_load_cores == 2
+    assert result.load_average_1min == 1.5
+    assert result.cores.utilization == [10, 80, 60, 30]
+    assert result.cores.temperature == [45, 47]
+
+@patch("transport.hw_stats._get_gpus_info", return_value=[])
+@patch("transport.hw_stats._get_cpu_temps", return_value=[hw_stats.CoreTemp("N/A", 0)])
+@patch("transport.hw_stats.psutil")
+def test_get_stats_single_pass(mock_psutil, mock_get_cpu_temps, mock_get_gpu_info, monkeypatch, collectors):
+    """get_stats should read each raw value only once per sample."""
+    monkeypatch.setattr("transport.hw_stats.SUBSAMPLER_LOADED", True)
+    monkeypatch.setattr("transport.hw_stats.subsampler", None)
+    monkeypatch.setattr("transport.hw_stats.cpu_usage", None)
+    CPUTimes = namedtuple("CPUTimes", ["user", "system", "idle"])
+    mock_psutil.cpu_times.return_value = [CPUTimes(1.0, 1.0, 10.0), CPUTimes(2.0, 1.0, 10.0)]
+    mock_psutil.cpu_freq.return_value = []
+    mock_psutil.getloadavg.return_value = (0.1, 0.2, 0.3)
+    mock_psutil.virtual_memory.return_value = MagicMock(total=2*10**9, used=10**9, available=10**9)
+
+    hw_stats.get_stats()
+
+    mock_psutil.cpu_times.assert_called_once_with(percpu=True)
+    mock_psutil.cpu_freq.assert_called_once_with(percpu=True)
+    mock_psutil.getloadavg.assert_called_once()
+    mock_psutil.virtual_memory.assert_called_once()
+    mock_get_cpu_temps.assert_called_once()
+
+def test_collector_timeout_uses_last_value(collectors):
+    """A late collector should report its last good value and not be started again while running."""
+    release = threading.Event()
+    calls = []
+    def slow_ram():
+        calls.append(1)
+        if len(calls) > 1:
+            release.wait(5)
+        return message_models.RAMInfo(total=len(calls))
+
+    collectors.clear()
+    collectors["ram"] = hw_stats.Collector("ram", slow_ram, timeout=0.05)
+
+    assert hw_stats.run_collectors()["ram"].total == 1
+    assert hw_stats.run_collectors()["ram"].total == 1  # timed out
+    assert hw_stats.run_collectors()["ram"].total == 1  # still running
+    assert len(calls) == 2
+    assert collectors["ram"].timeouts == 2
+
+    release.set()
+    collectors["ram"].pending.result()
+    # The late call's value is picked up without starting a new call
+    assert hw_stats.run_collectors()["ram"].total == 2
+    assert collectors["ram"].stats()["calls"] == 2
+    assert collectors["ram"].stats()["max_ms"] > 50
+
+def test_collector_error_uses_last_value(collectors):
+    results = iter([message_models.RAMInfo(total=5), OSError("boom")])
+    def flaky():
+        result = next(results)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    collectors.clear()
+    collectors["ram"] = hw_stats.Collector("ram", flaky, timeout=1)
+    first = hw_stats.run_collectors()["ram"]
+    second = hw_stats.run_collectors()["ram"]
+    assert second.total == 5
+    assert second is not first
+    assert collectors["ram"].errors == 1
+
+def test_disabled_collector(collectors, monkeypatch):
+    """Collectors disabled in config should not run."""
+    monkeypatch.setitem(hw_stats.transport.CONFIG["transport"], "collectors", {"gpu": {"enabled": False}})
+    collectors["cpu"].func = lambda: message_models.CPUInfo(utilization=1)
+    collectors["ram"].func = lambda: message_models.RAMInfo()
+    collectors["gpu"].func = MagicMock()
+
+    values = hw_stats.run_collectors()
+    assert set(values) == {"cpu", "ram"}
+    collectors["gpu"].func.assert_not_called()
+
+def test_aggregates_without_subsampling(monkeypatch):
+    """Without sub-samples the aggregates should collapse to the published value."""
+    monkeypatch.setattr("transport.hw_stats.SUBSAMPLER_LOADED", True)
+    monkeypatch.setattr("transport.hw_stats.subsampler", None)
+    msg = message_models.MessageModel(cpu=message_models.CPUInfo(utilization=40, temperature=55))
+
+    hw_stats._add_aggregates(msg)
+    assert msg.cpu.utilization_stats == message_models.Aggregate(min=40, max=40, mean=40)
+    assert msg.cpu.temperature_stats == message_models.Aggregate(min=55, max=55, mean=55)
+    assert msg.gpu.utilization_stats == message_models.Aggregate()
+
+def test_aggregates_from_subsampler(monkeypatch):
+    """Sub-sampled readings should replace the single value aggregates."""
+    subsampler = MagicMock()
+    subsampler.collect.return_value = {"cpu.utilization": message_models.Aggregate(min=5, max=95, mean=40)}
+    monkeypatch.setattr("transport.hw_stats.SUBSAMPLER_LOADED", True)
+    monkeypatch.setattr("transport.hw_stats.subsampler", subsampler)
+    msg = message_models.MessageModel(cpu=message_models.CPUInfo(utilization=40, temperature=55))
+
+    hw_stats._add_aggregates(msg)
+    assert msg.cpu.utilization_stats == message_models.Aggregate(min=5, max=95, mean=40)
+    assert msg.cpu.temperature_stats == message_models.Aggregate(min=55, max=55, mean=55)
+
+def test_subsampler():
+    """The sub-sampler should aggregate samples per collect() call
+    and stop sampling a failing collector.
+    """
+    from transport.subsampler import SubSampler
+
+    values = iter(range(1000))
+    def failing():
+        raise OSError("sensor gone")
+
+    sampler = SubSampler(200, {"counter": lambda: next(values), "broken": failing})
+    sampler.start()
+    time.sleep(0.1)
+    sampler.stop()
+
+    aggregates = sampler.collect()
+    assert list(aggregates) == ["counter"]
+    # The first value is discarded
+    assert aggregates["counter"].max > 1
+    assert aggregates["counter"].min == 1
+    assert aggregates["counter"].mean == (aggregates["counter"].max + 1) / 2
+
+    # Aggregates are reset after collecting
+    assert sampler.collect() == {}
+    assert 0 <= sampler.overhead < 1
+
+def test_subsampler_primes_on_own_thread():
+    """Collectors with per-thread state, like psutil.cpu_percent(),
+    should have their first value on the sampling thread discarded.
+    """
+    from transport.subsampler import SubSampler
+
+    primed = set()
+    def per_thread():
+        thread = threading.get_ident()
+        if thread not in primed:
+            primed.add(thread)
+            return 0.0
+        return 50.0
+
+    sampler = SubSampler(200, {"cpu.utilization": per_thread})
+    sampler.start()
+    time.sleep(0.05)
+    sampler.stop()
+
+    assert sampler.collect()["cpu.utilization"].min == 50.0
+
+def test_wmi_sensor_sampler(monkeypatch):
+    """The WMI sampler should connect and enumerate sensors once,
+    then only query the cached sensors.
+    """
+    from transport.wmi_sampler import WMISensorSampler
+
+    Sensor = namedtuple("Sensor", ["Identifier", "Name", "Value"])
+    sensors = [
+        Sensor("/intelcpu/0/temperature/0", "CPU Core #1", 40.0),
+        Sensor("/intelcpu/0/temperature/1", "CPU Core #1 Distance to TjMax", 60.0),
+        Sensor("/intelcpu/0/temperature/2", "CPU Package", 45.0),
+        Sensor("/gpu/0/temperature/0", "GPU Core", 50.0),
+    ]
+    mock_wmi = MagicMock()
+    connection = mock_wmi.WMI.return_value
+    connection.Sensor.return_value = sensors
+    connection.query.return_value = [sensors[0], sensors[2]]
+    monkeypatch.setitem(sys.modules, "wmi", mock_wmi)
+    monkeypatch.setitem(sys.modules, "pythoncom", MagicMock())
+
+    sampler = WMISensorSampler(
+        interval=0.01,
+        sensor_filter=lambda name: name.startswith(("CPU Core #", "CPU Package")) and "Distance" not in name
+    )
+    sampler.start()
+    assert sampler.read() == [("CPU Core #1", 40.0), ("CPU Package", 45.0)]
+
+    # Wait for a few more query rounds
+    while connection.query.call_count < 3:
+        time.sleep(0.01)
+    sampler.stop()
+
+    mock_wmi.WMI.assert_called_once()
+    connection.Sensor.assert_called_once_with(SensorType="Temperature")
+    assert connection.query.call_args[0][0] == (
+        "SELECT Name, Value FROM Sensor WHERE "
+        "Identifier='/intelcpu/0/temperature/0' OR Identifier='/intelcpu/0/temperature/2'"
+    )
+
+def test_wmi_sensor_sampler_no_matching_sensors(monkeypatch):
+    """Without matching sensors, discovery should not be repeated every round."""
+    from transport.wmi_sampler import WMISensorSampler
+
+    Sensor = namedtuple("Sensor", ["Identifier", "Name", "Value"])
+    mock_wmi = MagicMock()
+    connection = mock_wmi.WMI.return_value
+    connection.Sensor.return_value = [Sensor("/amdcpu/0/temperature/0", "Core (Tctl/Tdie)", 50.0)]
+    monkeypatch.setitem(sys.modules, "wmi", mock_wmi)
+    monkeypatch.setitem(sys.modules, "pythoncom", MagicMock())
+
+    sampler = WMISensorSampler(interval=0.01, sensor_filter=lambda name: name.startswith("CPU Core #"))
+    sampler.start()
+    assert sampler.read() == []
+    time.sleep(0.05)
+    sampler.stop()
+
+    mock_wmi.WMI.assert_called_once()
+    connection.Sensor.assert_called_once()
+    connection.query.assert_not_called()
+
+def test_wmi_sensor_sampler_reconnects(monkeypatch):
+    """Any error should be logged and followed by a reconnect, keeping the sampler running."""
+    from transport.wmi_sampler import WMISensorSampler
+
+    Sensor = namedtuple("Sensor", ["Identifier", "Name", "Value"])
+    sensor = Sensor("/intelcpu/0/temperature/0", "CPU Core #1", 40.0)
+    mock_wmi = MagicMock()
+    connection = mock_wmi.WMI.return_value
+    connection.Sensor.return_value = [sensor]
+    # eg. a pywintypes.com_error, which is not a wmi.x_wmi
+    def query(wql):
+        if connection.query.call_count == 1:
+            raise RuntimeError("RPC server unavailable")
+        return [sensor]
+    connection.query.side_effect = query
+    monkeypatch.setitem(sys.modules, "wmi", mock_wmi)
+    monkeypatch.setitem(sys.modules, "pythoncom", MagicMock())
+
+    sampler = WMISensorSampler(interval=0.01, sensor_filter=lambda name: name.startswith("CPU Core #"))
+    sampler.RETRY_DELAY = 0
+    sampler.start()
+    while connection.query.call_count < 3:
+        time.sleep(0.01)
+    sampler.stop()
+
+    assert mock_wmi.WMI.call_count == 2
+    assert sampler.read() == [("CPU Core #1", 40.0)]
@@ -1,9 +1,12 @@
+import copy
 import time
 from unittest.mock import patch, Mock
 
+import numpy as np
 import pytest
 
 import hwmonitorGUI
+from history_store import HistoryStore
 from message_workers import LocalNetworkWorker
 
 
@@ -35,10 +38,269 @@ def test_widget_update(qtbot, mock_msg_data):
     assert main_window.gpu_temperature.text() == "70°C"
 
     # Core window
-    # On 1st call a minimum of 5 empty QLCDNumber elements are initialized
-    assert main_window.core_window.empty_label.parent() is None
-    assert len(main_window.core_window.qlcd_widgets) == 5
+    # On 1st call a heatmap of a minimum of 5 cells is initialized
+    core_window = main_window.core_window
+    assert core_window.empty_label.parent() is None
+    assert core_window.image.image.shape == (5, 1)
 
-    # On subsequent calls values should be set
+    # On subsequent calls values should be set on the next frame
+    msg_data = copy.deepcopy(msg_data)
+    msg_data["timestamp"] += 1
+    msg_data["cpu"]["cores"]["utilization"] = [9, 0, 0, 1]
     main_window.update_readings(msg_data)
-    assert [ qlcd.intValue() for qlcd in main_window.core_window.qlcd_widgets ] == [7, 0, 0, 1, 0]
+    main_window.render_frame()
+    assert core_window.image.image[:4, 0].tolist() == [9, 0, 0, 1]
+    assert core_window.labels.texts == ["9", "0", "0", "1"]
+
+def test_multiple_hosts(qtbot, mock_msg_data):
+    """Readings from several hosts should be stored per host, drawing only the active host."""
+    main_window = hwmonitorGUI.MainWindow(transport_worker_class=Mock)
+    qtbot.addWidget(main_window)
+
+    now = time.time()
+    for i, host in enumerate(["host-a", "host-b", "host-a"]):
+        msg_data = copy.deepcopy(mock_msg_data)
+        msg_data["host"] = host
+        msg_data["timestamp"] = now + i
+        msg_data["cpu"]["utilization"] = 10 * (i+1)
+        main_window.update_readings(msg_data)
+    main_window.render_frame()
+
+    # The first host to report is shown
+    assert main_window.active_host == "host-a"
+    assert main_window.cpu_stats_labels["%"].text() == "30%"
+    assert list(main_window.host_store.hosts) == ["host-a", "host-b"]
+
+    # A single tile per host
+    assert list(main_window.hosts_window.tiles) == ["host-a", "host-b"]
+    assert main_window.hosts_window.tiles["host-b"].text().startswith("host-b\nCPU 20%")
+
+    # Switching hosts redraws from the stored state
+    main_window.show_host("host-b")
+    assert main_window.cpu_stats_labels["%"].text() == "20%"
+    x, y = main_window.utilization_plots["cpu"].getData()
+    assert x[-1] == now + 1
+    assert y[-1] == 20
+
+def test_utilization_band(qtbot, mock_msg_data):
+    """The min/max band should follow the sub-interval aggregates,
+    falling back to the plain value for messages without them.
+    """
+    main_window = hwmonitorGUI.MainWindow(transport_worker_class=Mock)
+    qtbot.addWidget(main_window)
+
+    msg_data = copy.deepcopy(mock_msg_data)
+    msg_data["timestamp"] = time.time()
+    msg_data["cpu"]["utilization_stats"] = {"min": 4, "max": 35, "mean": 10}
+    main_window.update_readings(msg_data)
+
+    min_curve, max_curve = main_window.utilization_bands["cpu"]
+    assert min_curve.getData()[1][-1] == 4
+    assert max_curve.getData()[1][-1] == 35
+
+    min_curve, max_curve = main_window.utilization_bands["gpu"]
+    assert min_curve.getData()[1][-1] == max_curve.getData()[1][-1] == 62
+
+def test_multiple_gpus(qtbot, mock_msg_data):
+    """Every GPU should get a memory bar and a line in the GPU label, in the same widgets."""
+    main_window = hwmonitorGUI.MainWindow(transport_worker_class=Mock)
+    qtbot.addWidget(main_window)
+    bars = main_window.gpu_mem_bg_used
+
+    msg_data = copy.deepcopy(mock_msg_data)
+    msg_data["timestamp"] = time.time()
+    msg_data["gpus"] = [
+        {"mem_used": 2000, "mem_total": 8000, "utilization": 62, "temperature": 70},
+        {"mem_used": 6000, "mem_total": 8000, "utilization": 90, "temperature": 81},
+    ]
+    main_window.update_readings(msg_data)
+
+    assert main_window.gpu_mem_bg_used is bars
+    assert list(bars.opts["height"]) == [25, 75]
+    assert main_window.gpu_mem_bar_label.toPlainText() == "50%"
+    assert main_window.gpu_mem_label.toPlainText() == "8.0GB"
+    assert "GPU1 90%</span> 81°C" in main_window.gpu_temperature.text()
+
+def test_render_coalescing(qtbot, mock_msg_data):
+    """A burst of messages should be added to the history one by one but drawn in a single frame."""
+    main_window = hwmonitorGUI.MainWindow(transport_worker_class=Mock)
+    qtbot.addWidget(main_window)
+
+    now = time.time()
+    for i in range(20):
+        msg_data = copy.deepcopy(mock_msg_data)
+        msg_data["timestamp"] = now + i
+        msg_data["cpu"]["utilization"] = i
+        main_window.update_readings(msg_data)
+
+    # Only the first message is drawn right away
+    assert main_window.cpu_stats_labels["%"].text() == "0%"
+    assert main_window.render_pending
+
+    with patch.object(main_window, "_render", wraps=main_window._render) as render:
+        main_window.render_frame()
+        main_window.render_frame()  # nothing new to draw
+    render.assert_called_once()
+
+    assert main_window.cpu_stats_labels["%"].text() == "19%"
+    x, y = main_window.utilization_plots["cpu"].getData()
+    assert list(y[-20:]) == list(range(20))
+    assert main_window.messages_received == 20
+    assert main_window.frames_rendered == 1
+
+def test_unchanged_widgets_skipped(qtbot, mock_msg_data):
+    """Widgets should only be updated when their displayed value changes."""
+    main_window = hwmonitorGUI.MainWindow(transport_worker_class=Mock)
+    qtbot.addWidget(main_window)
+
+    msg_data = copy.deepcopy(mock_msg_data)
+    msg_data["timestamp"] = time.time()
+    main_window.update_readings(msg_data)
+    applied = main_window.render_cache.applied
+
+    # Only the CPU utilization changes in the displayed precision
+    msg_data = copy.deepcopy(msg_data)
+    msg_data["timestamp"] += 1
+    msg_data["cpu"]["utilization"] = 55
+    msg_data["cpu"]["load_average_1min"] += 0.01
+    label = main_window.cpu_stats_labels["1 min"]
+    with patch.object(label, "setText") as set_text:
+        main_window.update_readings(msg_data)
+        main_window.render_frame()
+    set_text.assert_not_called()
+
+    assert main_window.cpu_stats_labels["%"].text() == "55%"
+    assert main_window.render_cache.applied == applied + 2  # text and style of the % label
+    assert main_window.render_cache.skipped > 0
+
+@pytest.mark.parametrize("num_cores, shape", [(4, (5, 1)), (13, (5, 3)), (256, (16, 16)), (257, (17, 16))])
+def test_core_heatmap(qtbot, num_cores, shape):
+    """Every core should get a cell, on grids growing towards a square."""
+    core_window = hwmonitorGUI.CPUCoreWindow()
+    qtbot.addWidget(core_window)
+
+    readings = {"cpu": {"cores": {
+        "utilization": [i % 101 for i in range(num_cores)],
+        "frequency": [2000 + i for i in range(num_cores)],
+        "temperature": [],
+    }}}
+    core_window._update_cpu_cores(readings)
+
+    image = core_window.image.image
+    assert image.shape == shape
+    cells = image.T.flatten()  # row by row
+    assert cells[:num_cores].tolist() == readings["cpu"]["cores"]["utilization"]
+    assert np.isnan(cells[num_cores:]).all()
+    assert len(core_window.labels.texts) == num_cores
+
+    # Other views are drawn from the stored readings
+    core_window.set_view("frequency")
+    assert core_window.image.image.T.flatten()[num_cores-1] == 2000 + num_cores - 1
+    core_window.set_view("temperature")
+    assert np.isnan(core_window.image.image).all()
+
+def test_history_store(qtbot, mock_msg_data, tmp_path):
+    """Received readings should be stored and shown again after a restart."""
+    now = time.time()
+    history = HistoryStore(str(tmp_path))
+    main_window = hwmonitorGUI.MainWindow(transport_worker_class=Mock, history=history)
+    qtbot.addWidget(main_window)
+    for i in range(3):
+        msg_data = copy.deepcopy(mock_msg_data)
+        msg_data["host"] = "host-a"
+        msg_data["timestamp"] = now + i
+        msg_data["cpu"]["utilization"] = 20 + i
+        main_window.update_readings(msg_data)
+    main_window.stop_thread_and_exit()
+
+    main_window = hwmonitorGUI.MainWindow(transport_worker_class=Mock, history=HistoryStore(str(tmp_path)))
+    qtbot.addWidget(main_window)
+    msg_data = copy.deepcopy(mock_msg_data)
+    msg_data["host"] = "host-a"
+    msg_data["timestamp"] = now + 3
+    main_window.update_readings(msg_data)
+
+    x, y = main_window.utilization_plots["cpu"].getData()
+    assert list(y[-4:]) == [20, 21, 22, 10]
+
+    # A host with only restored history is not shown
+    msg_data = copy.deepcopy(mock_msg_data)
+    msg_data["host"] = "host-b"
+    msg_data["timestamp"] = now + 4
+    main_window.update_readings(msg_data)
+    main_window.stop_thread_and_exit()
+    main_window = hwmonitorGUI.MainWindow(transport_worker_class=Mock, history=HistoryStore(str(tmp_path)))
+    qtbot.addWidget(main_window)
+    main_window.update_readings(msg_data | {"timestamp": now + 5})
+    main_window.show_host("host-a")
+    assert main_window.active_host == "host-b"
+
+def test_history_ranges(qtbot, mock_msg_data):
+    """Longer time ranges should be drawn from the rollups, without the placeholder history."""
+    main_window = hwmonitorGUI.MainWindow(transport_worker_class=Mock)
+    qtbot.addWidget(main_window)
+    assert list(main_window.history_ranges) == ["5 min", "1 h", "24 h", "7 d"]
+
+    now = time.time()
+    for i in range(30):
+        msg_data = copy.deepcopy(mock_msg_data)
+        msg_data["timestamp"] = now + i
+        msg_data["cpu"]["utilization"] = 90 if i == 12 else 10
+        main_window.update_readings(msg_data)
+
+    main_window.set_history_range("1 h")
+    x, y = main_window.utilization_plots["cpu"].getData()
+    assert len(x) == 360
+    # The peak is preserved in the band of its bucket
+    min_curve, max_curve = main_window.utilization_bands["cpu"]
+    assert max(max_curve.getData()[1]) == 90
+    assert max(y) < 90
+
+    main_window.set_history_range("7 d")
+    x, y = main_window.utilization_plots["cpu"].getData()
+    assert x[-1] - x[0] >= 7 * 24 * 3600 - 900 - 1
+
+    main_window.set_history_range("5 min")
+    x, y = main_window.utilization_plots["cpu"].getData()
+    assert y[-1] == 10
+    assert len(x) == main_window.host_store.num_datapoints
+
+@pytest.mark.parametrize("history_range", ["5 min", "1 h"])
+def test_plot_data_not_overwritten(qtbot, mock_msg_data, history_range):
+    """Readings ingested between frames should not change the data of the drawn plots."""
+    main_window = hwmonitorGUI.MainWindow(transport_worker_class=Mock)
+    qtbot.addWidget(main_window)
+    main_window.set_history_range(history_range)
+
+    now = time.time()
+    for i in range(3):
+        msg_data = copy.deepcopy(mock_msg_data)
+        msg_data["timestamp"] = now + 20*i
+        main_window.update_readings(msg_data)
+        if i == 0:
+            main_window.render_frame()
+            drawn = main_window.utilization_plots["cpu"].xData.copy()
+
+    plot = main_window.utilization_plots["cpu"]
+    assert (np.diff(plot.xData) > 0).all()
+    assert (plot.xData == drawn).all()
+
+def test_paint_latency(qtbot, mock_msg_data):
+    """Drawn readings should get a paint stamp, completing the latency stages."""
+    main_window = hwmonitorGUI.MainWindow(transport_worker_class=Mock)
+    qtbot.addWidget(main_window)
+    main_window.show()
+
+    now = time.time()
+    for i in range(2):
+        msg_data = copy.deepcopy(mock_msg_data)
+        msg_data["timestamp"] = now + i
+        msg_data["timings"] = {"collect_start": now - 0.05, "received": now - 0.01, "decoded": now}
+        main_window.update_readings(msg_data)
+    main_window.render_frame()
+
+    qtbot.waitUntil(lambda: main_window.paint_pending is None)
+    assert msg_data["timings"]["painted"] >= now
+    summary = main_window.latency.summary()
+    assert summary["decode"]["count"] == 2
+    assert summary["display"]["count"] == summary["total"]["count"] == 1
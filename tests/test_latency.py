@@ -0,0 +1,55 @@
+import json
+
+import numpy as np
+
+import latency
+
+
+TIMINGS = {
+    "collect_start": 1000.0,
+    "collect_end": 1000.012,
+    "sent": 1000.020,
+    "received": 1000.025,
+    "decoded": 1000.026,
+    "painted": 1000.100,
+}
+
+
+def test_stages():
+    stats = latency.LatencyStats(window=10)
+    stats.add(TIMINGS, latency.RECEIVE_STAGES)
+    stats.add(TIMINGS, latency.PAINT_STAGES)
+
+    summary = stats.summary()
+    assert list(summary) == ["collect", "send", "network", "decode", "display", "total"]
+    assert summary["network"]["p50"] == 5
+    assert summary["total"]["max"] == 100
+
+def test_missing_stamps_skipped():
+    """Messages of pollers without latency stamps only have the receive side stages."""
+    stats = latency.LatencyStats()
+    stats.add({"received": 1000.0, "decoded": 1000.002}, latency.RECEIVE_STAGES)
+    assert list(stats.summary()) == ["decode"]
+
+def test_rolling_window():
+    stats = latency.LatencyStats(window=3)
+    for i in range(5):
+        stats.add({"received": 1000.0, "decoded": 1000.0 + (i + 1) / 1000}, ["decode"])
+    assert stats.summary()["decode"]["count"] == 3
+    assert stats.histogram("decode").sum() == 3
+
+def test_export(tmp_path):
+    stats = latency.LatencyStats()
+    stats.add(TIMINGS, latency.RECEIVE_STAGES)
+    path = tmp_path / "latency.jsonl"
+    stats.export(path)
+    stats.export(path)
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(lines) == 2
+    collect = lines[0]["stages"]["collect"]
+    assert collect["p50"] == 12
+    # A single latency in the bin containing 12ms
+    bin_index = int(np.flatnonzero(collect["histogram"])[0])
+    edges = lines[0]["bin_edges_ms"]
+    assert edges[bin_index] <= 12 < edges[bin_index + 1]
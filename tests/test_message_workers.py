@@ -0,0 +1,88 @@
+import datetime
+import sys
+from unittest.mock import Mock, patch
+
+import pytest
+
+from transport import codec
+from message_models import MessageModel
+
+
+@pytest.fixture
+def pubsub_worker():
+    """PubSubWorker with a fake subscriber client."""
+    with patch.dict(sys.modules, {"transport.pubsub_subscriber": Mock()}):
+        from message_workers import PubSubWorker
+        worker = PubSubWorker()
+    worker.update = Mock()
+    return worker
+
+
+def test_pubsub_keeps_timestamp(pubsub_worker, mock_msg_data):
+    """The poller's timestamp should be kept, with Pub/Sub's publish time as a latency stamp."""
+    msg = MessageModel(**mock_msg_data, timestamp=1000.5)
+    message = Mock(
+        data=codec.encode(msg),
+        attributes={},
+        publish_time=datetime.datetime.fromtimestamp(1001, datetime.timezone.utc)
+    )
+
+    pubsub_worker.process_response(message)
+
+    readings = pubsub_worker.update.emit.call_args[0][0]
+    assert readings["timestamp"] == 1000.5
+    assert readings["timings"]["published"] == 1001
+    assert readings["timings"]["decoded"] > 0
+    message.ack.assert_called_once()
+
+
+def test_pubsub_batch(pubsub_worker, mock_msg_data):
+    """Samples of a batch message should be emitted in timestamp order."""
+    timestamps = [1002, 1000, 1001]
+    payloads = [codec.encode(MessageModel(**mock_msg_data, timestamp=t), "binary") for t in timestamps]
+    message = Mock(
+        data=codec.encode_batch(payloads),
+        attributes={"samples": "3"},
+        publish_time=datetime.datetime.fromtimestamp(1003, datetime.timezone.utc)
+    )
+    pubsub_worker.encoding = "binary"
+
+    pubsub_worker.process_response(message)
+
+    emitted = [call[0][0] for call in pubsub_worker.update.emit.call_args_list]
+    assert [readings["timestamp"] for readings in emitted] == [1000, 1001, 1002]
+    assert all(readings["timings"]["published"] == 1003 for readings in emitted)
+    message.ack.assert_called_once()
+
+
+def test_pubsub_truncated_batch(pubsub_worker, mock_msg_data):
+    """A truncated batch should be discarded without emitting any of its samples."""
+    data = codec.encode_batch([codec.encode(MessageModel(**mock_msg_data))] * 2)
+    message = Mock(data=data[:-10], attributes={"samples": "2"})
+
+    pubsub_worker.process_response(message)
+
+    pubsub_worker.update.emit.assert_not_called()
+    message.ack.assert_called_once()
+
+def test_pubsub_out_of_order(pubsub_worker, mock_msg_data):
+    """Messages delivered out of order should keep their own per-core readings."""
+    from transport.delta import DeltaEncoder
+
+    encoder = DeltaEncoder(keyframe_interval=1)
+    messages = []
+    for t in range(4):
+        msg = MessageModel(**mock_msg_data, host="host-a", timestamp=1000 + t)
+        msg.cpu.cores.utilization = [t] * len(msg.cpu.cores.utilization)
+        messages.append(Mock(
+            data=codec.encode(encoder.encode(msg)),
+            attributes={},
+            publish_time=datetime.datetime.fromtimestamp(1005, datetime.timezone.utc)
+        ))
+
+    for message in [messages[0], messages[2], messages[1], messages[3]]:
+        pubsub_worker.process_response(message)
+
+    for call in pubsub_worker.update.emit.call_args_list:
+        readings = call[0][0]
+        assert readings["cpu"]["cores"]["utilization"][0] == readings["timestamp"] - 1000
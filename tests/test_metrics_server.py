@@ -0,0 +1,127 @@
+import http.client
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from transport import metrics_server
+from transport.base_publisher import BasePublisher
+from transport.hw_stats import Collector
+from transport.metrics_server import MetricsServer
+from message_models import MessageModel
+
+
+@pytest.fixture
+def server():
+    """Run a MetricsServer on a free local port in a background thread."""
+    server = MetricsServer("127.0.0.1", 0)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    assert server.ready.wait(5)
+
+    yield server
+
+    server.stop()
+    thread.join(5)
+    assert not thread.is_alive()
+
+
+@pytest.fixture
+def msg(mock_msg_data):
+    return MessageModel(**mock_msg_data, host="client-1", timestamp=100.5, gpus=[mock_msg_data["gpu"]])
+
+
+def connect(server):
+    return http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+
+
+def test_render(msg):
+    collector = Collector("cpu", func=None, timeout=1)
+    collector.calls = 3
+    text = metrics_server.render(msg, [collector])
+    lines = text.splitlines()
+
+    assert lines[-1] == "# EOF"
+    assert 'hwmonitor_sample_timestamp_seconds{host="client-1"} 100.5' in lines
+    assert 'hwmonitor_cpu_utilization_ratio{host="client-1"} 0.1' in lines
+    assert "# UNIT hwmonitor_cpu_utilization_ratio ratio" in lines
+    assert 'hwmonitor_cpu_core_utilization_ratio{host="client-1",core="0"} 0.07' in lines
+    assert 'hwmonitor_gpu_memory_used_bytes{host="client-1",gpu="0"} 4500000000' in lines
+    assert 'hwmonitor_ram_total_bytes{host="client-1"} 2000000000' in lines
+    assert "# TYPE hwmonitor_collector_calls counter" in lines
+    assert 'hwmonitor_collector_calls_total{host="client-1",collector="cpu"} 3' in lines
+    # No aggregates without sub-interval sampling
+    assert "hwmonitor_cpu_utilization_sampled_ratio" not in text
+
+
+def test_render_escapes_labels(msg):
+    msg.host = 'a"b\\c'
+    assert 'hwmonitor_cpu_load1{host="a\\"b\\\\c"} 0.7651' in metrics_server.render(msg)
+
+
+def test_scrape(server, msg):
+    server.update(msg)
+    client = connect(server)
+    client.request("GET", "/metrics")
+    response = client.getresponse()
+
+    assert response.status == 200
+    assert response.getheader("Content-Type") == metrics_server.CONTENT_TYPE
+    assert response.read().decode() == metrics_server.render(msg)
+    assert server.scrapes == 1
+
+
+def test_scrape_before_first_sample(server):
+    client = connect(server)
+    client.request("GET", "/metrics")
+    assert client.getresponse().read() == b"# EOF\n"
+
+
+def test_keep_alive(server, msg):
+    """Requests on a connection should be answered with the latest snapshot."""
+    client = connect(server)
+    for cpu_utilization in (10, 20, 30):
+        msg.cpu.utilization = cpu_utilization
+        server.update(msg)
+        client.request("GET", "/metrics")
+        body = client.getresponse().read().decode()
+        assert f'hwmonitor_cpu_utilization_ratio{{host="client-1"}} {cpu_utilization / 100}' in body
+    assert len(server.connections) == 1
+    assert server.scrapes == 3
+
+
+def test_head_and_errors(server, msg):
+    server.update(msg)
+    client = connect(server)
+    client.request("HEAD", "/metrics")
+    response = client.getresponse()
+    assert response.status == 200
+    assert int(response.getheader("Content-Length")) > 0
+    assert response.read() == b""
+
+    client.request("GET", "/other")
+    response = client.getresponse()
+    assert response.status == 404
+    response.read()
+
+    client.request("POST", "/metrics", body=b"")
+    response = client.getresponse()
+    assert response.status == 405
+    response.read()
+    assert server.scrapes == 1
+
+
+@patch("transport.hw_stats.get_stats")
+def test_scrape_does_not_collect(mock_get_stats, server, msg):
+    """Scrapes are served from the snapshot taken by the publisher."""
+    mock_get_stats.return_value = msg
+    publisher = BasePublisher()
+    publisher.metrics_server = server
+    assert publisher.collect() is msg
+    assert server.updates == 1
+
+    client = connect(server)
+    for _ in range(10):
+        client.request("GET", "/metrics")
+        assert 'host="client-1"' in client.getresponse().read().decode()
+    assert mock_get_stats.call_count == 1
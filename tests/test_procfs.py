@@ -0,0 +1,143 @@
+import os
+import sys
+from collections import namedtuple
+
+import psutil
+import pytest
+
+from transport import hw_stats
+from transport.procfs import STAT_FIELDS, CPUPercent, ProcfsReader
+
+
+STAT = """cpu  300 0 100 1000 0 0 0 0 0 0
+cpu0 100 0 50 500 0 0 0 0 0 0
+cpu1 200 0 50 500 0 0 0 0 0 0
+intr 12345 0 0
+ctxt 6789
+"""
+
+MEMINFO = """MemTotal:        8000000 kB
+MemFree:         1000000 kB
+MemAvailable:    6000000 kB
+Buffers:          200000 kB
+Cached:          3000000 kB
+Active:          4000000 kB
+Inactive:        2000000 kB
+Shmem:            100000 kB
+SReclaimable:     500000 kB
+"""
+
+def write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+@pytest.fixture
+def fake_root(tmp_path):
+    """A minimal /proc and /sys tree of a 2 core machine with coretemp sensors."""
+    proc = tmp_path / "proc"
+    sys_ = tmp_path / "sys"
+    write(f"{proc}/stat", STAT)
+    write(f"{proc}/meminfo", MEMINFO)
+    write(f"{proc}/loadavg", "0.52 0.40 0.31 1/234 5678\n")
+    for cpu, freq in enumerate([3400000, 800000]):
+        write(f"{sys_}/devices/system/cpu/cpu{cpu}/cpufreq/scaling_cur_freq", f"{freq}\n")
+    hwmon = f"{sys_}/class/hwmon/hwmon1"
+    write(f"{hwmon}/name", "coretemp\n")
+    write(f"{hwmon}/temp1_label", "Package id 0\n")
+    write(f"{hwmon}/temp1_input", "52000\n")
+    write(f"{hwmon}/temp2_label", "Core 0\n")
+    write(f"{hwmon}/temp2_input", "48000\n")
+    write(f"{sys_}/class/hwmon/hwmon0/name", "acpitz\n")
+    return str(proc), str(sys_)
+
+
+def test_reader(fake_root):
+    reader = ProcfsReader(*fake_root)
+    assert reader.cpu_times().tolist() == [[100, 0, 50, 500, 0, 0, 0, 0, 0, 0], [200, 0, 50, 500, 0, 0, 0, 0, 0, 0]]
+    assert [f.current for f in reader.cpu_freq()] == [3400, 800]
+    assert reader.load_average() == (0.52, 0.40, 0.31)
+    assert reader.memory() == (8000000*1024, 2000000*1024, 6000000*1024)
+    assert reader.coretemp() == [("Package id 0", 52.0), ("Core 0", 48.0)]
+    reader.close()
+
+def test_reader_rereads_files(fake_root):
+    """Open files should be re-read from the start, with buffers grown as needed."""
+    proc, _ = fake_root
+    reader = ProcfsReader(*fake_root)
+    reader.cpu_times()
+
+    # A /proc/stat larger than the initial buffer
+    write(f"{proc}/stat", STAT.replace("cpu0 100", "cpu0 150").replace("intr 12345", "intr " + "1 " * 5000))
+    assert reader.cpu_times()[0, 0] == 150
+    reader.close()
+
+def test_cpu_percent():
+    """Utilization should follow psutil's formula: iowait counts as idle, guest time is not counted twice."""
+    usage = CPUPercent(STAT_FIELDS)
+    assert usage.update([[100, 0, 50, 500, 0, 0, 0, 0, 0, 0]]*2) == [0.0, 0.0]
+
+    # cpu0: 30 busy of 100
+    # cpu1: 50 busy of 100 with 20 iowait and 10 guest time, already included in user time
+    percent = usage.update([
+        [120, 0, 60, 570, 0, 0, 0, 0, 0, 0],
+        [140, 0, 60, 530, 20, 0, 0, 0, 10, 0],
+    ])
+    assert percent == [30.0, 50.0]
+
+    # A change in the number of cores restarts the deltas
+    assert usage.update([[0]*10]) == [0.0]
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="Linux only")
+def test_parity_with_psutil():
+    """The procfs reader should produce the same readings as psutil on this machine."""
+    reader = ProcfsReader()
+
+    ticks = os.sysconf("SC_CLK_TCK")
+    times = reader.cpu_times() / ticks
+    psutil_times = psutil.cpu_times(percpu=True)
+    assert times.shape == (len(psutil_times), len(STAT_FIELDS))
+    for core, psutil_core in zip(times, psutil_times):
+        assert core == pytest.approx(list(psutil_core), abs=1)
+
+    assert len(reader.cpu_freq()) == len(psutil.cpu_freq(percpu=True))
+    assert reader.load_average() == pytest.approx(psutil.getloadavg(), abs=0.1)
+
+    mem = reader.memory()
+    psutil_mem = psutil.virtual_memory()
+    assert mem.total == psutil_mem.total
+    assert mem.available == pytest.approx(psutil_mem.available, rel=0.05)
+    assert mem.used == pytest.approx(psutil_mem.used, rel=0.05)
+
+    psutil_temps = psutil.sensors_temperatures().get("coretemp", [])
+    assert [t.label for t in reader.coretemp()] == [t.label for t in psutil_temps]
+    reader.close()
+
+def test_snapshot_backends_match(fake_root, monkeypatch):
+    """Both backends should give the same CPU and RAM models from the same /proc files."""
+    proc, _ = fake_root
+    next_stat = STAT.replace("cpu0 100 0 50 500", "cpu0 130 0 50 570").replace("cpu1 200 0 50 500", "cpu1 250 0 50 550")
+
+    def take_snapshots():
+        """Take a snapshot on the files of the fixture, to prime the utilization, and one on the next times."""
+        write(f"{proc}/stat", STAT)
+        monkeypatch.setattr("transport.hw_stats.cpu_usage", None)
+        hw_stats._take_snapshot()
+        write(f"{proc}/stat", next_stat)
+        return hw_stats._take_snapshot()
+
+    monkeypatch.setattr("transport.hw_stats.PROCFS_READER_LOADED", True)
+    monkeypatch.setattr("transport.hw_stats.procfs_reader", ProcfsReader(*fake_root))
+    snapshot = take_snapshots()
+    assert snapshot.cpu_percent == [30.0, 50.0]
+
+    # psutil reading the same /proc files. Its /sys paths are fixed: use the values of the fixture.
+    Freq = namedtuple("scpufreq", ["current", "min", "max"])
+    monkeypatch.setattr("transport.hw_stats.procfs_reader", None)
+    monkeypatch.setattr(psutil, "PROCFS_PATH", proc)
+    monkeypatch.setattr(psutil, "cpu_freq", lambda percpu: [Freq(3400.0, 0, 0), Freq(800.0, 0, 0)])
+    psutil_snapshot = take_snapshots()._replace(cpu_temps=snapshot.cpu_temps, load_average=(0.52, 0.40, 0.31))
+    assert psutil_snapshot.memory.used == snapshot.memory.used
+    assert hw_stats._get_cpu_info(snapshot) == hw_stats._get_cpu_info(psutil_snapshot)
+    assert hw_stats._get_ram_info(snapshot) == hw_stats._get_ram_info(psutil_snapshot)
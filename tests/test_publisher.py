@@ -1,9 +1,17 @@
+import collections
 import json
+import socket
+import threading
+import time
 from unittest.mock import patch, Mock
 
+import numpy as np
 from freezegun import freeze_time
 
-from transport import hw_stats, local_network_publisher
+import transport
+from transport import framing, hw_stats, local_network_publisher
+from transport.socket_server import FrameServer
+from host_store import HostStore
 from message_models import MessageModel
 
 
@@ -28,28 +36,140 @@ def test_local_network_publish(mock_socket, mock_sleep, mock_get_stats, mock_msg
     # socket connect
     s.connect.assert_called()
 
+    # Samples may be sent one by one or flushed in bulk:
+    # decode frames from all sends.
+    decoder = framing.FrameDecoder()
+    for call in s.sendall.call_args_list:
+        decoder.feed(call[0][0])
+    sent_msgs = [json.loads(bytes(frame)) for frame in decoder.frames()]
+    assert len(sent_msgs) == 2
+    assert [msg.pop("sequence") for msg in sent_msgs] == [0, 1]
+
     # 1st data send
     # Compare messages without the timestamp as the fractional part might not match
     # TODO: use time_ns and nanoseconds instead?
-    sent_msg_data = json.loads(s.send.call_args_list[0][0][0].decode())
+    sent_msg_data = sent_msgs[0]
     sent_msg_timestamp = sent_msg_data.pop("timestamp")
 
     expected_msg_data = mock_msg.model_dump()
+    expected_msg_data.pop("sequence")
     expected_msg_timestamp = expected_msg_data.pop("timestamp")
 
+    # The send time is added to the latency stamps
+    assert sent_msg_data.pop("timings")["sent"] > 0
+    expected_msg_data.pop("timings")
+
     assert sent_msg_data == expected_msg_data
     assert int(sent_msg_timestamp) == int(expected_msg_timestamp)
 
     # final data send:
     # KeyboardInterrupt should send a default message
-    sent_msg_data = json.loads(s.send.call_args_list[1][0][0].decode())
+    sent_msg_data = sent_msgs[1]
     sent_msg_timestamp = sent_msg_data.pop("timestamp")
 
     default_msg_data = MessageModel().model_dump()
+    default_msg_data.pop("sequence")
     default_msg_timestamp = default_msg_data.pop("timestamp")
+    sent_msg_data.pop("timings")
+    default_msg_data.pop("timings")
 
     assert sent_msg_data == default_msg_data
     assert int(sent_msg_timestamp) == int(default_msg_timestamp)
 
     # socket close
     s.close.assert_called()
+
+def test_reconnect_flushes_buffered_samples(monkeypatch, mock_msg_data):
+    """Samples collected while the server is unreachable should be sent
+    in order once the connection is established.
+    """
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(("127.0.0.1", 0))
+    port = listener.getsockname()[1]
+    monkeypatch.setitem(transport.CONFIG["transport"], "socket", {"host": "127.0.0.1", "port": port})
+
+    p = local_network_publisher.LocalNetworkPublisher()
+    p.RECONNECT_MIN_DELAY = 0.01
+    p.RECONNECT_MAX_DELAY = 0.05
+
+    # Server not listening yet: connection is refused
+    p.start_sender()
+    for i in range(3):
+        p.enqueue(MessageModel(**mock_msg_data, timestamp=i))
+    time.sleep(0.1)
+    assert len(p.buffer) == 3
+
+    listener.listen()
+    conn, _ = listener.accept()
+    p.enqueue(MessageModel(**mock_msg_data, timestamp=3))
+    p.stop_sender()
+
+    decoder = framing.FrameDecoder()
+    with conn, listener:
+        while decoder.recv_from(conn):
+            pass
+    timestamps = [json.loads(bytes(frame))["timestamp"] for frame in decoder.frames()]
+    assert timestamps == [0, 1, 2, 3]
+
+def test_replay_buffer_is_bounded(mock_msg_data):
+    """The oldest samples should be dropped when the buffer is full."""
+    p = local_network_publisher.LocalNetworkPublisher()
+    p.buffer = collections.deque(maxlen=2)
+    for i in range(5):
+        p.enqueue(MessageModel(**mock_msg_data, timestamp=i))
+
+    assert [msg.timestamp for msg in p.buffer] == [3, 4]
+    assert p.samples_dropped == 3
+
+def test_requeue_counts_dropped_samples(mock_msg_data):
+    """Samples overflowing the buffer when an unsent batch is put back should be counted."""
+    p = local_network_publisher.LocalNetworkPublisher()
+    p.buffer = collections.deque(maxlen=3)
+    batch = [MessageModel(**mock_msg_data, timestamp=i) for i in range(2)]
+    for i in range(2, 4):
+        p.enqueue(MessageModel(**mock_msg_data, timestamp=i))
+
+    p._requeue(batch)
+    assert [msg.timestamp for msg in p.buffer] == [1, 2, 3]
+    assert p.samples_dropped == 1
+
+def test_connection_timeouts():
+    """Connections should time out sends and probe idle connections."""
+    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    with s:
+        local_network_publisher.LocalNetworkPublisher()._set_timeouts(s)
+        assert s.gettimeout() == local_network_publisher.LocalNetworkPublisher.SEND_TIMEOUT
+        assert s.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE)
+
+def test_monitor_restart_replays_history(monkeypatch, mock_msg_data):
+    """Samples buffered while the monitor was down should fill in the history
+    of a monitor started afterwards.
+    """
+    now = time.time()
+    p = local_network_publisher.LocalNetworkPublisher()
+    p.RECONNECT_MIN_DELAY = 0.01
+    p.RECONNECT_MAX_DELAY = 0.05
+    p.keyframe_interval = 1
+    for i in range(10):
+        p.enqueue(MessageModel(**mock_msg_data, host="client-1", timestamp=now - 20 + 2*i))
+
+    # The monitor starts with an empty host store
+    host_store = HostStore(num_datapoints=150, refresh_interval=2)
+    server = FrameServer("127.0.0.1", 0, on_message=host_store.ingest)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    assert server.ready.wait(5)
+    monkeypatch.setitem(transport.CONFIG["transport"], "socket", {"host": "127.0.0.1", "port": server.port})
+
+    p.start_sender()
+    deadline = time.monotonic() + 5
+    while "client-1" not in host_store or host_store["client-1"].last != now - 2:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    p.stop_sender()
+    server.stop()
+    thread.join(5)
+
+    timestamps = host_store["client-1"].timestamps.view()
+    assert list(timestamps[-10:]) == [now - 20 + 2*i for i in range(10)]
+    assert (np.diff(timestamps) > 0).all()
@@ -0,0 +1,120 @@
+import collections
+import sys
+from unittest.mock import Mock, patch
+
+import pytest
+
+import transport
+from transport import codec
+from message_models import MessageModel
+
+
+# With the defaults of the client library
+BatchSettings = collections.namedtuple(
+    "BatchSettings", ["max_bytes", "max_latency", "max_messages"], defaults=[1000 * 1000, 0.01, 100]
+)
+
+
+@pytest.fixture
+def make_publisher():
+    """Create PubSubPublishers with a fake Pub/Sub client and the given batch config."""
+    pubsub_v1 = Mock()
+    pubsub_v1.types.BatchSettings = BatchSettings
+    modules = {
+        "google": Mock(),
+        "google.cloud": Mock(pubsub_v1=pubsub_v1),
+        "google.cloud.pubsub_v1": pubsub_v1,
+    }
+
+    def make(**batch_config):
+        pubsub_config = {**transport.CONFIG["transport"]["pubsub"], "batch": batch_config}
+        with patch.dict(sys.modules, modules), \
+             patch.dict(transport.CONFIG["transport"], {"pubsub": pubsub_config}):
+            sys.modules.pop("transport.pubsub_publisher", None)
+            from transport.pubsub_publisher import PubSubPublisher
+            return PubSubPublisher()
+
+    make.pubsub_v1 = pubsub_v1
+    return make
+
+
+def published(publisher):
+    """Return the data and attributes of every published message."""
+    return [(call.args[1], call.kwargs) for call in publisher.client.publish.call_args_list]
+
+
+def test_unbatched(make_publisher, mock_msg_data):
+    """Without batching, every sample should be published as a plain message."""
+    publisher = make_publisher(max_samples=1)
+    msg = MessageModel(**mock_msg_data)
+    publisher.add_sample(msg)
+
+    assert published(publisher) == [(codec.encode(msg), {})]
+    assert publisher.bytes_billed == 1000
+    assert publisher.bytes_generated == len(codec.encode(msg))
+
+
+def test_client_batching_disabled(make_publisher, mock_msg_data):
+    """Every message should be sent in a publish request of its own, billed on its own."""
+    publisher = make_publisher(max_samples=3, max_bytes=10**6, max_latency=60)
+    batch_settings = make_publisher.pubsub_v1.PublisherClient.call_args.kwargs["batch_settings"]
+    assert batch_settings.max_messages == 1
+
+    for t in range(6):
+        publisher.add_sample(MessageModel(**mock_msg_data, timestamp=1000 + t))
+    assert publisher.client.publish.call_count == 2
+    assert publisher.bytes_billed == 2 * max(1000, len(published(publisher)[0][0]))
+
+
+def test_batch_max_samples(make_publisher, mock_msg_data):
+    publisher = make_publisher(max_samples=3, max_bytes=10**6, max_latency=60)
+    for t in range(7):
+        publisher.add_sample(MessageModel(**mock_msg_data, timestamp=1000 + t))
+    publisher.flush()
+
+    messages = published(publisher)
+    assert [attributes for _, attributes in messages] == [{"samples": "3"}, {"samples": "3"}, {"samples": "1"}]
+    timestamps = [
+        codec.decode(payload)["timestamp"]
+        for data, _ in messages for payload in codec.decode_batch(data)
+    ]
+    assert timestamps == list(range(1000, 1007))
+    assert (publisher.samples_published, publisher.messages_published) == (7, 3)
+
+
+def test_batch_max_bytes(make_publisher, mock_msg_data):
+    """Batches should be published before growing past max_bytes."""
+    publisher = make_publisher(max_samples=100, max_bytes=1000, max_latency=60)
+    for t in range(20):
+        publisher.add_sample(MessageModel(**mock_msg_data, timestamp=1000 + t))
+    publisher.flush()
+
+    messages = published(publisher)
+    assert publisher.samples_published == 20
+    assert all(len(data) <= 1000 for data, _ in messages)
+    assert publisher.bytes_generated / publisher.bytes_billed > 0.5
+    assert "of billed bytes used" in publisher.billing_stats()
+
+
+def test_batch_max_latency(make_publisher, mock_msg_data):
+    """A batch should be published once its first sample is max_latency seconds old."""
+    publisher = make_publisher(max_samples=100, max_bytes=10**6, max_latency=4)
+    for t in (1000, 1002):
+        publisher.add_sample(MessageModel(**mock_msg_data, timestamp=t))
+    assert not publisher.client.publish.called
+
+    publisher.add_sample(MessageModel(**mock_msg_data, timestamp=1004))
+    assert published(publisher)[0][1] == {"samples": "3"}
+    assert len(publisher.batch) == 0
+
+
+def test_keyframes_only(make_publisher, mock_msg_data):
+    """Every message should carry the full per-core readings, whatever the keyframe interval."""
+    with patch.dict(transport.CONFIG["transport"], {"keyframe_interval": 15}):
+        publisher = make_publisher(max_samples=1)
+    for t in range(3):
+        publisher.add_sample(publisher.delta_encoder.encode(MessageModel(**mock_msg_data, timestamp=1000 + t)))
+
+    messages = [codec.decode(data) for data, _ in published(publisher)]
+    assert [readings["sequence"] for readings in messages] == [0, 1, 2]
+    assert all(readings.get("cores_delta") is None for readings in messages)
@@ -0,0 +1,25 @@
+from unittest.mock import Mock
+
+from render_cache import RenderCache
+
+
+def test_update_only_on_change():
+    cache = RenderCache()
+    apply = Mock()
+
+    assert cache.update("label", "10%", apply)
+    assert not cache.update("label", "10%", apply)
+    assert cache.update("label", "11%", apply)
+    assert cache.update("bars", [25, 75], apply)
+    assert not cache.update("bars", [25, 75], apply)
+
+    assert [c.args[0] for c in apply.call_args_list] == ["10%", "11%", [25, 75]]
+    assert (cache.applied, cache.skipped) == (3, 2)
+
+def test_clear():
+    cache = RenderCache()
+    apply = Mock()
+    cache.update("label", "10%", apply)
+    cache.clear()
+    assert cache.update("label", "10%", apply)
+    assert apply.call_count == 2
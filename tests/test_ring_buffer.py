@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from ring_buffer import RingBuffer
+
+
+def test_append_wraps_around():
+    buffer = RingBuffer(3)
+    assert buffer.view().tolist() == [0, 0, 0]
+
+    for value in range(1, 6):
+        buffer.append(value)
+    assert buffer.view().tolist() == [3, 4, 5]
+    assert buffer.last == 5
+    assert len(buffer) == 3
+
+def test_initial_contents():
+    buffer = RingBuffer(3, [1, 2, 3])
+    buffer.append(4)
+    assert buffer.view().tolist() == [2, 3, 4]
+
+def test_view_is_not_a_copy():
+    """Views should share memory with the buffer and not be writable."""
+    buffer = RingBuffer(4)
+    for value in range(6):
+        buffer.append(value)
+
+    view = buffer.view()
+    assert view.flags.c_contiguous
+    assert np.shares_memory(view, buffer._data)
+    with pytest.raises(ValueError):
+        view[0] = 1
+
+def test_extend():
+    buffer = RingBuffer(4)
+    buffer.append(1)
+    buffer.extend([2, 3])
+    assert buffer.view().tolist() == [0, 1, 2, 3]
+
+    # Only the newest values are kept
+    buffer.extend(range(10, 16))
+    assert buffer.view().tolist() == [12, 13, 14, 15]
+    buffer.append(16)
+    assert buffer.view().tolist() == [13, 14, 15, 16]
+    assert buffer.last == 16
@@ -0,0 +1,61 @@
+import numpy as np
+
+from rollup import Rollup
+
+
+def test_add():
+    level = Rollup(resolution=10, span=40, end=1000)
+    assert level.timestamps.view().tolist() == [960, 970, 980, 990]
+
+    for t, value in [(1000, 10), (1005, 20), (1009, 30), (1012, 50)]:
+        level.add(t, value, value - 5, value + 5)
+
+    # Only completed buckets are in the history
+    assert level.timestamps.last == 1000
+    assert level.mean.last == 20
+    assert level.min.last == 5
+    assert level.max.last == 35
+
+    level.add(1031, 0, 0, 0)
+    assert level.timestamps.view().tolist() == [980, 990, 1000, 1010]
+    assert level.mean.view()[-2:].tolist() == [20, 50]
+
+def test_extend_matches_add():
+    """Restoring samples at once should give the same buckets as adding them one by one."""
+    rng = np.random.default_rng(0)
+    timestamps = 1000 + np.cumsum(rng.uniform(0.5, 3, 500))
+    values = rng.uniform(0, 100, 500)
+    mins = values - rng.uniform(0, 10, 500)
+    maxs = values + rng.uniform(0, 10, 500)
+
+    added = Rollup(resolution=10, span=600, end=1000)
+    for sample in zip(timestamps, values, mins, maxs):
+        added.add(*sample)
+
+    # In two parts, splitting a bucket
+    extended = Rollup(resolution=10, span=600, end=1000)
+    extended.extend(timestamps[:201], values[:201], mins[:201], maxs[:201])
+    extended.extend(timestamps[201:], values[201:], mins[201:], maxs[201:])
+
+    for name in ("timestamps", "mean", "min", "max"):
+        assert np.allclose(getattr(added, name).view(), getattr(extended, name).view())
+
+def test_extend_buckets():
+    """Restoring stored buckets, one of them stored in two parts, should give the buckets of the samples."""
+    timestamps = np.arange(1000, 1060, 2)
+    values = np.arange(30, dtype=float)
+
+    added = Rollup(resolution=10, span=60, end=1000)
+    for t, value in zip(timestamps, values):
+        added.add(t, value, value - 1, value + 1)
+
+    # Buckets of 5 samples, the bucket at 1020 split 2 + 3
+    starts = [0, 5, 10, 12, 15, 20, 25]
+    counts = np.diff(starts + [30])
+    means = np.add.reduceat(values, starts) / counts
+    restored = Rollup(resolution=10, span=60, end=1000)
+    restored.extend(timestamps[starts] // 10 * 10, means, values[starts] - 1, means + 1, counts=counts)
+
+    assert restored.timestamps.view().tolist() == added.timestamps.view().tolist()
+    assert np.allclose(restored.mean.view(), added.mean.view())
+    assert restored.min.view()[-3:].tolist() == added.min.view()[-3:].tolist()
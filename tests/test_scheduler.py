@@ -0,0 +1,67 @@
+from unittest.mock import patch
+
+import pytest
+
+from transport.scheduler import Scheduler
+
+
+
+class FakeClock:
+    """Fake monotonic clock advanced by sleep calls and simulated work."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    clock = FakeClock()
+    with patch("transport.scheduler.time.monotonic", clock.monotonic), \
+         patch("transport.scheduler.time.sleep", clock.sleep):
+        yield clock
+
+
+def test_no_drift(clock):
+    """Ticks should stay on a fixed grid regardless of how long the work takes."""
+    scheduler = Scheduler(2)
+    deadlines = []
+    for work in [0.3, 1.1, 0.0, 1.9]:
+        deadlines.append(scheduler.wait())
+        clock.now += work
+
+    assert deadlines == [100, 102, 104, 106]
+    assert scheduler.overruns == 0
+
+def test_overrun_skip(clock):
+    """Missed deadlines should be skipped keeping the original phase."""
+    scheduler = Scheduler(2, overrun="skip")
+    scheduler.wait()
+    clock.now += 4.5  # overruns deadlines at 102 and 104
+
+    assert scheduler.wait() == 106
+    assert clock.now == 106
+    assert scheduler.overruns == 1
+    assert scheduler.skipped == 2
+
+def test_overrun_catch_up(clock):
+    """Missed deadlines should be run immediately until back on schedule."""
+    scheduler = Scheduler(2, overrun="catch_up")
+    scheduler.wait()
+    clock.now += 4.5
+
+    assert scheduler.wait() == 102
+    assert scheduler.wait() == 104
+    assert clock.now == 104.5
+    assert scheduler.wait() == 106
+    assert scheduler.overruns == 2
+    assert scheduler.stats()["jitter_max_ms"] == pytest.approx(2500)
+
+def test_invalid_policy():
+    with pytest.raises(ValueError):
+        Scheduler(2, overrun="wait")
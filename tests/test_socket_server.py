@@ -0,0 +1,79 @@
+import socket
+import threading
+import time
+
+import pytest
+
+from transport import codec, framing
+from transport.socket_server import FrameServer
+from message_models import MessageModel
+
+
+
+@pytest.fixture
+def server():
+    """Run a FrameServer on a free local port in a background thread."""
+    received = []
+    server = FrameServer("127.0.0.1", 0, on_message=received.append, idle_timeout=0.5)
+    server.received = received
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    assert server.ready.wait(5)
+
+    yield server
+
+    server.stop()
+    thread.join(5)
+    assert not thread.is_alive()
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+def connect(server):
+    return socket.create_connection(("127.0.0.1", server.port), timeout=5)
+
+def is_closed(client):
+    """Check whether the server closed (or reset) the connection."""
+    try:
+        return client.recv(1) == b""
+    except ConnectionResetError:
+        return True
+
+
+def test_concurrent_clients(server, mock_msg_data):
+    """Several pollers should be served at the same time."""
+    clients = [connect(server) for _ in range(5)]
+    for i, client in enumerate(clients):
+        msg = MessageModel(**mock_msg_data, timestamp=i)
+        client.sendall(framing.encode_frame(codec.encode(msg)))
+
+    assert wait_for(lambda: len(server.received) == 5)
+    assert sorted(r["timestamp"] for r in server.received) == [0, 1, 2, 3, 4]
+    assert all(r["timings"]["decoded"] >= r["timings"]["received"] > 0 for r in server.received)
+    assert len(server.connections) == 5
+
+    for client in clients:
+        client.close()
+    assert wait_for(lambda: not server.connections)
+
+def test_idle_connection_closed(server):
+    """Connections without data should be closed after the idle timeout."""
+    with connect(server) as client:
+        assert wait_for(lambda: len(server.connections) == 1)
+        assert wait_for(lambda: not server.connections)
+        assert is_closed(client)
+
+def test_invalid_data_drops_client(server, mock_msg_data):
+    """A client sending garbage should be disconnected without affecting others."""
+    with connect(server) as good, connect(server) as bad:
+        bad.sendall(b"not a frame at all")
+        good.sendall(framing.encode_frame(codec.encode(MessageModel(**mock_msg_data))))
+
+        assert wait_for(lambda: len(server.received) == 1)
+        assert is_closed(bad)
@@ -0,0 +1,74 @@
+import socket
+import threading
+import time
+from unittest.mock import patch
+
+from transport import codec, udp_publisher
+from transport.udp_server import DatagramServer, SequenceTracker
+from message_models import MessageModel
+
+
+
+def test_sequence_tracker_loss_and_reordering():
+    tracker = SequenceTracker()
+    accepted = [tracker.track(s) for s in [1, 2, 5, 3, 6, 6]]
+
+    # 3 and 4 missing when 5 arrives; 3 arrives late and is dropped
+    assert accepted == [True, True, True, False, True, False]
+    assert tracker.lost == 1
+    assert tracker.reordered == 1
+    assert tracker.duplicates == 1
+    assert tracker.received == 6
+
+def test_sequence_tracker_publisher_restart():
+    """Sequence numbers starting over should not count as late datagrams."""
+    tracker = SequenceTracker()
+    for s in range(10):
+        tracker.track(s)
+
+    assert tracker.track(0)
+    assert tracker.track(1)
+    assert tracker.lost == 0
+
+@patch("transport.hw_stats.get_stats")
+@patch("time.sleep")
+@patch("socket.socket")
+def test_udp_publish(mock_socket, mock_sleep, mock_get_stats, mock_msg_data):
+    """Each sample should be sent as a single sequenced datagram."""
+    mock_sleep.side_effect = [None, KeyboardInterrupt()]
+    mock_get_stats.return_value = MessageModel(**mock_msg_data)
+
+    udp_publisher.UDPPublisher().publish()
+
+    s = mock_socket.return_value.__enter__.return_value
+    # two samples and the final empty message
+    assert s.sendto.call_count == 3
+
+    readings = [codec.decode(call[0][0]) for call in s.sendto.call_args_list]
+    assert [r["sequence"] for r in readings] == [0, 1, 0]
+    assert all(r["cores_delta"] is None for r in readings)
+    assert readings[1]["cpu"]["cores"]["utilization"] == [7, 0, 0, 1]
+
+def test_datagram_server(mock_msg_data):
+    """Datagrams should be decoded and late datagrams dropped."""
+    received = []
+    server = DatagramServer("127.0.0.1", 0, on_message=received.append, encoding="binary")
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    assert server.ready.wait(5)
+
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        for sequence in [1, 3, 2]:
+            msg = MessageModel(**mock_msg_data, host="client", sequence=sequence)
+            s.sendto(codec.encode(msg, "binary"), ("127.0.0.1", server.port))
+        s.sendto(b"garbage", ("127.0.0.1", server.port))
+
+        deadline = time.monotonic() + 5
+        while server.stats.get("client", SequenceTracker()).received < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    server.stop()
+    thread.join(5)
+
+    assert [r["sequence"] for r in received] == [1, 3]
+    assert server.stats["client"].reordered == 1
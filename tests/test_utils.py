@@ -0,0 +1,22 @@
+from PyQt5.QtWidgets import QLabel
+
+import utils
+
+
+def test_cached_styles_match():
+    for level in range(101):
+        assert utils.get_cached_cpu_utilization_style(level) == utils.get_cpu_utilization_background_style(level)
+
+    # Out of range values are clamped
+    assert utils.get_cached_cpu_utilization_style(120) == utils.CPU_UTILIZATION_STYLES[100]
+    assert utils.get_cached_cpu_utilization_style(-1) == utils.CPU_UTILIZATION_STYLES[0]
+
+def test_style_set_only_on_change(qtbot):
+    label = QLabel()
+    qtbot.addWidget(label)
+
+    # Levels up to 20 share the same style
+    assert utils.set_style_sheet(label, utils.get_cached_cpu_utilization_style(5))
+    assert not utils.set_style_sheet(label, utils.get_cached_cpu_utilization_style(15))
+    assert utils.set_style_sheet(label, utils.get_cached_cpu_utilization_style(80))
+    assert label.styleSheet() == utils.get_cpu_utilization_background_style(80)
@@ -1,7 +1,53 @@
 # Abstract base class for message publishers.
+import logging
+import time
+
+import transport
+from transport import hw_stats
+from transport.scheduler import Scheduler
+
+
+logger = logging.getLogger()
+
 
 class BasePublisher:
 
+    # Optional MetricsServer serving the latest sample over HTTP
+    metrics_server = None
+
     def publish(self):
         raise NotImplementedError
 
+    def collect(self):
+        """Collect a sample, updating the metrics server's snapshot if one is attached.
+        Return:
+            a MessageModel of the current readings
+        """
+        msg = hw_stats.get_stats()
+        if self.metrics_server is not None:
+            self.metrics_server.update(msg, hw_stats.COLLECTORS.values())
+        return msg
+
+    def create_scheduler(self):
+        """Create a sampling scheduler for the configured refresh interval."""
+        return Scheduler(
+            transport.CONFIG["transport"]["refresh_interval"],
+            overrun=transport.CONFIG["transport"].get("overrun", "skip")
+        )
+
+    @staticmethod
+    def stamp_sent(msg):
+        """Record the send time of a message for latency tracking.
+        Args:
+            msg (MessageModel): a message about to be sent, eg. a copy made by a DeltaEncoder
+        Return:
+            the message
+        """
+        msg.timings = msg.timings.model_copy(update={"sent": time.time()})
+        return msg
+
+    def log_sampling_stats(self, scheduler):
+        """Log the scheduler's timing and the cost of each hardware collector."""
+        logger.info("Sampling: %s", scheduler)
+        for collector in hw_stats.COLLECTORS.values():
+            logger.info("Collector %s", collector)
@@ -0,0 +1,273 @@
+import functools
+import json
+import operator
+import struct
+import time
+
+from transport import framing
+from transport.exceptions import DecodeError
+
+
+ENCODINGS = ("json", "binary")
+
+# The first byte of a binary message is the schema version. JSON messages
+# always start with "{", which is never used as a version number.
+BINARY_VERSION = 6
+JSON_START = ord("{")
+
+def _stats_fields(prefix):
+    """Sub-interval aggregate fields of a device as half precision floats,
+    enough for percentages and degrees.
+    """
+    return tuple(
+        (f"{prefix}{reading}_stats.{stat}", "e")
+        for reading in ("utilization", "temperature")
+        for stat in ("min", "max", "mean")
+    )
+
+# Fields of a single GPU, used for the primary GPU in the header
+# and for every entry of the per-GPU array.
+_GPU_FIELDS = (
+    ("mem_used", "I"),  # MB
+    ("mem_total", "I"),
+    ("utilization", "B"),
+    ("temperature", "h"),
+    *_stats_fields(""),
+)
+
+# Fixed width header fields as (model attribute path, struct format) pairs.
+# Appending a field here requires bumping BINARY_VERSION.
+_HEADER_FIELDS = (
+    ("timestamp", "d"),
+    ("cpu.utilization", "B"),
+    ("cpu.frequency", "H"),  # MHz
+    ("cpu.temperature", "h"),
+    ("cpu.load_average_1min", "f"),
+    ("cpu.num_high_load_cores", "H"),
+    *_stats_fields("cpu."),
+    *((f"gpu.{path}", fmt) for path, fmt in _GPU_FIELDS),
+    ("ram.total", "I"),  # MB
+    ("ram.used", "I"),
+    ("ram.available", "I"),
+    ("sequence", "I"),
+    ("timings.collect_start", "d"),
+    ("timings.collect_end", "d"),
+    ("timings.sent", "d"),
+)
+
+# Per-core arrays, packed after the header with their lengths stored in the header.
+# On delta messages each array is a list of changed core indices followed by the new values.
+_CORE_ARRAYS = (
+    ("utilization", "B"),
+    ("frequency", "H"),
+    ("temperature", "h"),
+)
+
+_CORE_INDEX_FORMAT = "H"
+
+_HEADER = struct.Struct(
+    "<B"
+    + "".join(fmt for _, fmt in _HEADER_FIELDS)
+    + "?"  # delta message flag
+    + "H" * len(_CORE_ARRAYS)
+    + "B"  # number of GPUs
+)
+# The header is followed by the host name as a length-prefixed UTF-8 string
+_HOST_LENGTH = struct.Struct("<B")
+
+_HEADER_GETTER = operator.attrgetter(*(path for path, _ in _HEADER_FIELDS))
+_HEADER_KEYS = [path.split(".") for path, _ in _HEADER_FIELDS]
+
+# The per-GPU array is packed after the per-core arrays
+_GPU = struct.Struct("<" + "".join(fmt for _, fmt in _GPU_FIELDS))
+_GPU_GETTER = operator.attrgetter(*(path for path, _ in _GPU_FIELDS))
+_GPU_KEYS = [path.split(".") for path, _ in _GPU_FIELDS]
+
+
+def encode(msg, encoding="json"):
+    """Serialize a MessageModel for the wire.
+    Args:
+        msg (MessageModel): the message to encode
+        encoding (str): one of ENCODINGS
+    Return:
+        the encoded message as bytes
+    """
+    if encoding == "binary":
+        return _encode_binary(msg)
+    if msg.cores_delta is not None:
+        # Leave out the empty per-core lists replaced by the delta, and unchanged delta fields
+        exclude = {
+            "cpu": {"cores"},
+            "cores_delta": {field for field, changes in msg.cores_delta if not changes},
+        }
+        return msg.model_dump_json(exclude=exclude).encode()
+    return msg.model_dump_json().encode()
+
+def decode(payload, encoding="json"):
+    """Deserialize a message received from the wire into a readings dict.
+    JSON is always accepted as a fallback, regardless of encoding.
+    Args:
+        payload (bytes-like): the encoded message
+        encoding (str): the expected encoding, one of ENCODINGS
+    Return:
+        dict of hardware readings as produced by MessageModel.model_dump()
+    """
+    if not payload:
+        raise DecodeError("Empty message")
+
+    version = payload[0]
+    if version == JSON_START:
+        return json.loads(bytes(payload))
+
+    if encoding != "binary":
+        raise DecodeError(f"Received a binary message (version {version}) but binary encoding is not enabled")
+    if version != BINARY_VERSION:
+        raise DecodeError(f"Unsupported binary message version {version}, expected {BINARY_VERSION}")
+    return _decode_binary(payload)
+
+def encode_batch(payloads):
+    """Pack encoded messages into a single batch of length-prefixed frames.
+    Args:
+        payloads (list): messages encoded with encode()
+    Return:
+        the batch as bytes
+    """
+    return b"".join(map(framing.encode_frame, payloads))
+
+def decode_batch(data):
+    """Split a batch packed with encode_batch() into its encoded messages.
+    Args:
+        data (bytes-like): the batch
+    Return:
+        a list of the encoded messages as memoryview slices of data
+    """
+    data = memoryview(data)
+    payloads = []
+    offset = 0
+    while offset < len(data):
+        if offset + framing.HEADER.size > len(data):
+            raise DecodeError("Truncated batch")
+        size = framing.HEADER.unpack_from(data, offset)[0]
+        offset += framing.HEADER.size
+        if offset + size > len(data):
+            raise DecodeError(f"Truncated batch: {size}B message with {len(data) - offset}B left")
+        payloads.append(data[offset:offset + size])
+        offset += size
+    return payloads
+
+def stamp_received(readings, received):
+    """Add the monitor side latency stamps to decoded readings:
+    the receive time and the current time as the decode time.
+    Args:
+        readings (dict): decoded readings
+        received (float): UNIX timestamp of receiving the message
+    Return:
+        the readings
+    """
+    timings = readings.get("timings") or {}
+    timings["received"] = received
+    timings["decoded"] = time.time()
+    readings["timings"] = timings
+    return readings
+
+@functools.lru_cache(maxsize=64)
+def _array_struct(fmt, length):
+    """Cached Struct for a packed array; core counts rarely change."""
+    return struct.Struct(f"<{length}{fmt}")
+
+def _encode_binary(msg):
+    delta = msg.cores_delta
+    if delta is None:
+        arrays = [getattr(msg.cpu.cores, name) for name, _ in _CORE_ARRAYS]
+        body = [
+            _array_struct(fmt, len(a)).pack(*a)
+            for a, (_, fmt) in zip(arrays, _CORE_ARRAYS)
+        ]
+    else:
+        arrays = [getattr(delta, name) for name, _ in _CORE_ARRAYS]
+        body = []
+        for a, (_, fmt) in zip(arrays, _CORE_ARRAYS):
+            indices, values = zip(*a) if a else ((), ())
+            body.append(_array_struct(_CORE_INDEX_FORMAT, len(a)).pack(*indices))
+            body.append(_array_struct(fmt, len(a)).pack(*values))
+
+    gpus = msg.gpus[:255]
+    body.extend(_GPU.pack(*_GPU_GETTER(gpu)) for gpu in gpus)
+
+    header = _HEADER.pack(
+        BINARY_VERSION,
+        *_HEADER_GETTER(msg),
+        delta is not None,
+        *(len(a) for a in arrays),
+        len(gpus)
+    )
+    host = msg.host.encode()[:255]
+    return header + _HOST_LENGTH.pack(len(host)) + host + b"".join(body)
+
+def _decode_binary(payload):
+    try:
+        values = _HEADER.unpack_from(payload)
+    except struct.error as e:
+        raise DecodeError(f"Truncated message header: {e}")
+
+    readings = {"cpu": {"cores": {}}, "gpu": {}, "ram": {}, "cores_delta": None}
+    _set_paths(readings, _HEADER_KEYS, values[1:])
+
+    # float32 precision: avoid exposing eg. 0.7651 as 0.7651000022888184
+    readings["cpu"]["load_average_1min"] = round(readings["cpu"]["load_average_1min"], 4)
+
+    is_delta = values[len(_HEADER_FIELDS)+1]
+    lengths = values[len(_HEADER_FIELDS)+2:-1]
+    num_gpus = values[-1]
+    if is_delta:
+        readings["cores_delta"] = {}
+
+    offset = _HEADER.size
+    try:
+        host_length = _HOST_LENGTH.unpack_from(payload, offset)[0]
+    except struct.error as e:
+        raise DecodeError(f"Truncated host name: {e}")
+    offset += _HOST_LENGTH.size
+    readings["host"] = bytes(payload[offset:offset+host_length]).decode(errors="replace")
+    offset += host_length
+
+    for (name, fmt), length in zip(_CORE_ARRAYS, lengths):
+        try:
+            if is_delta:
+                indices, offset = _unpack_array(payload, offset, _CORE_INDEX_FORMAT, length)
+                changed, offset = _unpack_array(payload, offset, fmt, length)
+                readings["cores_delta"][name] = list(zip(indices, changed))
+                readings["cpu"]["cores"][name] = []
+            else:
+                readings["cpu"]["cores"][name], offset = _unpack_array(payload, offset, fmt, length)
+        except struct.error as e:
+            raise DecodeError(f"Truncated core array '{name}': {e}")
+
+    readings["gpus"] = []
+    for _ in range(num_gpus):
+        try:
+            gpu_values = _GPU.unpack_from(payload, offset)
+        except struct.error as e:
+            raise DecodeError(f"Truncated GPU array: {e}")
+        offset += _GPU.size
+        gpu = {}
+        _set_paths(gpu, _GPU_KEYS, gpu_values)
+        readings["gpus"].append(gpu)
+
+    return readings
+
+def _set_paths(target, keys, values):
+    """Set values to a nested dict by their split attribute paths."""
+    for path, value in zip(keys, values):
+        parent = target
+        for key in path[:-1]:
+            parent = parent.setdefault(key, {})
+        parent[path[-1]] = value
+
+def _unpack_array(payload, offset, fmt, length):
+    """Unpack a packed array starting at offset.
+    Return:
+        a tuple of the array as a list and the offset past the array
+    """
+    array_struct = _array_struct(fmt, length)
+    return list(array_struct.unpack_from(payload, offset)), offset + array_struct.size
@@ -0,0 +1,113 @@
+import logging
+
+from message_models import CPUCoreDelta, CPUCoreInfo
+
+
+logger = logging.getLogger()
+
+CORE_FIELDS = ("utilization", "frequency", "temperature")
+
+
+class DeltaEncoder:
+    """Publisher side delta encoding of per-core readings.
+
+    Every keyframe_interval messages (and whenever the number of cores changes)
+    a keyframe with the full per-core lists is sent. In between, only the core values
+    that changed since the previous message are sent as MessageModel.cores_delta.
+    Use a new encoder for each connection so that a client always starts with a keyframe.
+    """
+
+    def __init__(self, keyframe_interval):
+        """
+        Args:
+            keyframe_interval (int): number of messages between keyframes.
+                A value of 1 or less sends every message as a keyframe.
+        """
+        self.keyframe_interval = keyframe_interval
+        self.sequence = 0
+        self._cores = None  # per-core lists of the previous message
+        self._since_keyframe = 0
+
+    def reset(self):
+        """Send the next message as a keyframe."""
+        self._cores = None
+
+    def encode(self, msg):
+        """Create a sequenced copy of msg, replacing the per-core lists with a delta
+        if a keyframe is not due.
+        Args:
+            msg (MessageModel): the full message
+        Return:
+            a new MessageModel
+        """
+        cores = [getattr(msg.cpu.cores, field) for field in CORE_FIELDS]
+        keyframe = (
+            self._cores is None
+            or self._since_keyframe + 1 >= self.keyframe_interval
+            or any(len(a) != len(b) for a, b in zip(cores, self._cores))
+        )
+
+        update = {"sequence": self.sequence}
+        if keyframe:
+            self._since_keyframe = 0
+        else:
+            self._since_keyframe += 1
+            update["cores_delta"] = CPUCoreDelta(**{
+                field: [(i, v) for i, (v, old) in enumerate(zip(new, prev)) if v != old]
+                for field, new, prev in zip(CORE_FIELDS, cores, self._cores)
+            })
+            update["cpu"] = msg.cpu.model_copy(update={"cores": CPUCoreInfo()})
+
+        self._cores = cores
+        self.sequence += 1
+        return msg.model_copy(update=update)
+
+
+class DeltaDecoder:
+    """Receiver side counterpart to DeltaEncoder: rebuilds the full per-core
+    lists from keyframes and deltas.
+
+    A delta can only be applied on top of the message directly preceding it.
+    If a message is lost, deltas are ignored until the next keyframe and the
+    last known per-core values are passed on instead.
+    """
+
+    def __init__(self):
+        self._cores = None
+        self._sequence = None
+        self.synced = False
+
+    def decode(self, readings):
+        """Replace a delta in readings with the rebuilt per-core lists.
+        Args:
+            readings (dict): decoded message readings, modified in place.
+        Return:
+            the readings dict
+        """
+        delta = readings.pop("cores_delta", None)
+        sequence = readings.get("sequence", 0)
+
+        if delta is None:
+            self._cores = {field: list(readings["cpu"]["cores"][field]) for field in CORE_FIELDS}
+            self.synced = True
+
+        elif self.synced and sequence == self._sequence + 1:
+            for field in CORE_FIELDS:
+                values = self._cores[field]
+                # JSON deltas leave out unchanged fields
+                for i, value in delta.get(field, ()):
+                    values[i] = value
+
+        elif self.synced:
+            logger.warning("Missed message before #%d, waiting for the next keyframe", sequence)
+            self.synced = False
+
+        self._sequence = sequence
+        if self._cores is not None:
+            # Pass on copies: the readings are handed over to the GUI thread
+            # while the state keeps getting updated.
+            readings["cpu"]["cores"] = {field: list(values) for field, values in self._cores.items()}
+        else:
+            # JSON deltas leave out the per-core lists
+            readings["cpu"].setdefault("cores", {field: [] for field in CORE_FIELDS})
+        return readings
@@ -4,4 +4,12 @@
 # simulate amdsmi.AmdSmiException without requiring the actual library. 
 
 class DummyAmdSmiException(Exception):
-    pass
\ No newline at end of file
+    pass
+
+
+class FramingError(Exception):
+    """Raised on a malformed length-prefixed frame stream."""
+
+
+class DecodeError(Exception):
+    """Raised when a received message cannot be decoded."""
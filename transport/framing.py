@@ -0,0 +1,119 @@
+import struct
+
+from transport.exceptions import FramingError
+
+
+# Every frame on a stream socket is prefixed with its payload length
+# as a 4-byte big-endian unsigned integer.
+HEADER = struct.Struct("!I")
+
+# Upper bound for a single frame. A larger length header is assumed to be
+# garbage (eg. a client speaking an older, unframed protocol).
+MAX_FRAME_SIZE = 2**20
+
+
+def encode_frame(payload):
+    """Prefix a payload with its length.
+    Args:
+        payload (bytes): the message to frame
+    Return:
+        the framed message as bytes
+    """
+    if len(payload) > MAX_FRAME_SIZE:
+        raise FramingError(f"Frame too large: {len(payload)}B")
+    return HEADER.pack(len(payload)) + payload
+
+
+class FrameDecoder:
+    """Incremental decoder for a stream of length-prefixed frames.
+
+    Data is received directly into a preallocated buffer via get_buffer() and
+    buffer_updated(), eg. with socket.recv_into(). Complete frames are then drained
+    with frames() as memoryview slices of that same buffer; the payloads are never copied.
+    A yielded frame is only valid until the next call to get_buffer().
+    """
+
+    def __init__(self, buffer_size=64*1024):
+        self._buffer = bytearray(buffer_size)
+        self._view = memoryview(self._buffer)
+        self._start = 0  # start of unconsumed data
+        self._end = 0  # end of received data
+
+    @property
+    def pending(self):
+        """Number of received bytes not yet drained as frames."""
+        return self._end - self._start
+
+    def get_buffer(self):
+        """Return a writable view to the free space at the end of the buffer.
+        Pending data is moved to the front of the buffer when the tail runs out of space,
+        and the buffer is grown if it's too small to hold the next frame.
+        """
+        if self._start == self._end:
+            self._start = self._end = 0
+
+        required = HEADER.size
+        if self.pending >= HEADER.size:
+            required += HEADER.unpack_from(self._buffer, self._start)[0]
+
+        if self._end == len(self._buffer) or len(self._buffer) - self._start < required:
+            self._compact(max(required, self.pending + 1))
+
+        return self._view[self._end:]
+
+    def _compact(self, size):
+        """Move pending data to the front of the buffer,
+        reallocating the buffer if it's smaller than size bytes.
+        """
+        pending = self.pending
+        if size > len(self._buffer):
+            buffer = bytearray(max(size, 2*len(self._buffer)))
+            buffer[:pending] = self._view[self._start:self._end]
+            self._buffer = buffer
+            self._view = memoryview(buffer)
+        else:
+            self._buffer[:pending] = self._buffer[self._start:self._end]
+        self._start, self._end = 0, pending
+
+    def buffer_updated(self, nbytes):
+        """Mark nbytes written to the view returned by get_buffer() as received."""
+        self._end += nbytes
+
+    def feed(self, data):
+        """Copy data into the buffer. Convenience wrapper for
+        callers that don't read into get_buffer() directly.
+        """
+        data = memoryview(data)
+        while data:
+            buffer = self.get_buffer()
+            n = min(len(buffer), len(data))
+            buffer[:n] = data[:n]
+            self.buffer_updated(n)
+            data = data[n:]
+
+    def recv_from(self, sock):
+        """Read available data from a socket straight into the buffer.
+        Return:
+            the number of bytes read, 0 if the peer closed the connection.
+        """
+        nbytes = sock.recv_into(self.get_buffer())
+        self.buffer_updated(nbytes)
+        return nbytes
+
+    def frames(self):
+        """Drain every complete frame from the buffer.
+        Yields:
+            memoryview of each frame payload
+        """
+        while self.pending >= HEADER.size:
+            size = HEADER.unpack_from(self._buffer, self._start)[0]
+            if size > MAX_FRAME_SIZE:
+                raise FramingError(f"Frame too large: {size}B")
+
+            frame_start = self._start + HEADER.size
+            frame_end = frame_start + size
+            if frame_end > self._end:
+                return
+
+            self._start = frame_end
+            yield self._view[frame_start:frame_end]
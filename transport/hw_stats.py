@@ -1,6 +1,12 @@
 import atexit
+import collections
+import concurrent.futures
+import copy
+import glob
 import logging
 import os
+import sys
+import time
 from collections import namedtuple
 
 import psutil
@@ -12,29 +18,166 @@ try: import amdsmi; AMDSMI_IMPORTED = True
 except (ImportError, KeyError): AMDSMI_IMPORTED = False
 
 import message_models
+import transport
 from transport.exceptions import DummyAmdSmiException
+from transport.procfs import STAT_FIELDS, CPUPercent
 
 
 GPU_DEVICE_HANDLE_LOADED = False
 handle_config = None
+wmi_sampler = None
+subsampler = None
+SUBSAMPLER_LOADED = False
+collector_pool = None
+procfs_reader = None
+PROCFS_READER_LOADED = False
+cpu_usage = None
 
 logger = logging.getLogger()
 
+# Common container for storing temperature readings
+# regardless of platform.
+CoreTemp = namedtuple("CoreTemp", ["label", "value"])
+
+# Raw psutil readings collected in a single pass per sample.
+# All derived CPU and RAM fields are computed from these.
+Snapshot = namedtuple("Snapshot", ["cpu_percent", "cpu_freq", "cpu_temps", "load_average", "memory"])
+
+
+class Collector:
+    """A registered source of a single MessageModel field.
+
+    Collectors run concurrently on a thread pool. A collector that doesn't finish
+    within its timeout is left running in the background and its last good value is
+    used; it's not started again until the late call completes.
+    """
+
+    def __init__(self, name, func, timeout):
+        """
+        Args:
+            name (str): the MessageModel field the collector produces
+            func (callable): function returning the field's value
+            timeout (float): seconds to wait for a value
+        """
+        self.name = name
+        self.func = func
+        self.timeout = timeout
+        self.enabled = True
+        self.last_value = None
+        self.pending = None  # Future of the running call
+        self.calls = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.durations = collections.deque(maxlen=1000)  # recent call durations in seconds
+
+    def run(self):
+        start = time.perf_counter()
+        try:
+            return self.func()
+        finally:
+            self.durations.append(time.perf_counter() - start)
+
+    def stats(self):
+        """Return call and timing statistics as a dict. Times are in milliseconds."""
+        durations = self.durations or [0.0]
+        return {
+            "calls": self.calls,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "mean_ms": sum(durations) / len(durations) * 1000,
+            "max_ms": max(durations) * 1000,
+        }
+
+    def __str__(self):
+        stats = self.stats()
+        return (
+            f"{self.name}: calls={stats['calls']} timeouts={stats['timeouts']} errors={stats['errors']} "
+            f"mean/max={stats['mean_ms']:.1f}/{stats['max_ms']:.1f}ms"
+        )
+
+
+# Registered collectors by name
+COLLECTORS = {}
+
+def collector(name, timeout):
+    """Decorator registering a function as the collector of a MessageModel field."""
+    def decorator(func):
+        COLLECTORS[name] = Collector(name, func, timeout)
+        return func
+    return decorator
+
+def configure_collectors(config):
+    """Enable or disable collectors and override their timeouts.
+    Args:
+        config (dict): collector name: {"enabled": bool, "timeout": float} pairs
+    """
+    for name, options in config.items():
+        if name not in COLLECTORS:
+            logger.warning("Unknown collector '%s' in config", name)
+            continue
+        COLLECTORS[name].enabled = options.get("enabled", True)
+        COLLECTORS[name].timeout = options.get("timeout", COLLECTORS[name].timeout)
+
+def run_collectors():
+    """Run the enabled collectors concurrently, waiting for each up to its timeout.
+    The collector thread pool is created, and the config applied, on first call.
+
+    Return:
+        dict of collector name: value pairs. Collectors without any good value yet are omitted.
+    """
+    global collector_pool
+    if collector_pool is None:
+        configure_collectors(transport.CONFIG["transport"].get("collectors", {}))
+        collector_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=len(COLLECTORS), thread_name_prefix="collector"
+        )
+
+    enabled = [c for c in COLLECTORS.values() if c.enabled]
+    for c in enabled:
+        if c.pending is None:
+            c.pending = collector_pool.submit(c.run)
+            c.calls += 1
+
+    # All collectors started together, so their timeouts run from a common start
+    start = time.monotonic()
+    values = {}
+    for c in enabled:
+        remaining = max(0, c.timeout - (time.monotonic() - start))
+        try:
+            c.last_value = c.pending.result(timeout=remaining)
+            c.pending = None
+            values[c.name] = c.last_value
+            continue
+        except concurrent.futures.TimeoutError:
+            c.timeouts += 1
+            logger.warning("Collector '%s' timed out after %.1fs, using its last value", c.name, c.timeout)
+        except Exception as e:
+            c.pending = None
+            c.errors += 1
+            logger.warning("Collector '%s' failed, using its last value: %s", c.name, e)
+
+        # A previous value may be shared by an earlier message still queued for sending
+        if c.last_value is not None:
+            values[c.name] = copy.deepcopy(c.last_value)
+    return values
+
 
 def try_get_gpu_handle():
-    """Try to get AMD GPU handle using AMD SMI library.
+    """Try to get handles for every GPU device, using the AMD SMI library
+    or the NVIDIA Management Library.
 
     Return:
-        AMD GPU handle if available, else None
+        a (vendor, list of device handles) tuple if available, else None
     """
     logging.info("Attempting to initialize GPU monitoring...")
     try:
         logger.info("Checking if an AMD device can be initialized...")
         amdsmi.amdsmi_init() 
-        handle = amdsmi.amdsmi_get_processor_handles()[0]
+        handles = amdsmi.amdsmi_get_processor_handles()
         atexit.register(amdsmi.amdsmi_shut_down)
-        logger.info("Success!")
-        return "AMD", handle
+        if handles:
+            logger.info("Success! Found %d devices", len(handles))
+            return "AMD", handles
     except NameError:
         logger.error("amdsmi library not detected.")
     except (amdsmi.AmdSmiException, DummyAmdSmiException):
@@ -43,10 +186,11 @@ def try_get_gpu_handle():
     try:
         logger.info("Checking if an Nvidia device can be initialized...")
         pynvml.nvmlInit()
-        handle = pynvml.nvmlDeviceGetHandleByIndex(0)
+        handles = [pynvml.nvmlDeviceGetHandleByIndex(i) for i in range(pynvml.nvmlDeviceGetCount())]
         atexit.register(pynvml.nvmlShutdown)
-        logger.info("Success!")
-        return "NVIDIA", handle
+        if handles:
+            logger.info("Success! Found %d devices", len(handles))
+            return "NVIDIA", handles
     except pynvml.NVMLError_LibraryNotFound:
         logger.warning("NVIDIA Management Library (NVML) not detected.")
     except pynvml.NVMLError as e:
@@ -57,79 +201,266 @@ def try_get_gpu_handle():
 
 def get_stats():
     """Wrapper function for collecting individual hardware readings as 
-    message to be published.
+    message to be published. Readings of disabled collectors are left to their defaults.
 
     Return:
         pydantic MessageModel of the hardware readings
     """
-    return message_models.MessageModel(
-        cpu=_get_cpu_info(),
-        ram=_get_ram_info(),
-        gpu=_get_gpu_info()
+    collect_start = time.time()
+    values = run_collectors()
+    # The first GPU is also sent on its own as the primary device
+    gpus = values.pop("gpu", [])
+    msg = message_models.MessageModel(
+        **values,
+        gpu=gpus[0] if gpus else message_models.GPUInfo(),
+        gpus=gpus
     )
+    _add_aggregates(msg)
+    msg.timings = message_models.Timings(collect_start=collect_start, collect_end=time.time())
+    return msg
+
+@collector("cpu", timeout=1.0)
+def _collect_cpu():
+    return _get_cpu_info()
+
+@collector("ram", timeout=0.5)
+def _collect_ram():
+    return _get_ram_info()
+
+@collector("gpu", timeout=1.0)
+def _collect_gpu():
+    return _get_gpus_info()
+
+def _add_aggregates(msg):
+    """Fill in the min/max/mean aggregates of utilization and temperature
+    from the sub-interval sampler. Readings without sub-samples (eg. sampling
+    disabled or no cheap source available) use the single published value.
+
+    The sampler is started on first call, after the GPU handle has been initialized.
+    Args:
+        msg (MessageModel): the message to update in place
+    """
+    global subsampler, SUBSAMPLER_LOADED
+    # Wait for the GPU handle, if enabled, to include its collectors
+    if not SUBSAMPLER_LOADED and (GPU_DEVICE_HANDLE_LOADED or not COLLECTORS["gpu"].enabled):
+        SUBSAMPLER_LOADED = True
+        sample_rate = transport.CONFIG["transport"].get("sample_rate", 0)
+        if sample_rate:
+            from transport.subsampler import SubSampler
+
+            subsampler = SubSampler(sample_rate, _get_subsample_collectors())
+            subsampler.start()
+
+    aggregates = subsampler.collect() if subsampler else {}
+    devices = [("cpu", msg.cpu), ("gpu", msg.gpu)]
+    # Only the primary GPU is sub-sampled
+    devices += [(None, gpu) for gpu in msg.gpus[1:]]
+    for name, device in devices:
+        for reading in ("utilization", "temperature"):
+            value = getattr(device, reading)
+            aggregate = aggregates.get(f"{name}.{reading}") or message_models.Aggregate(min=value, max=value, mean=value)
+            setattr(device, f"{reading}_stats", aggregate)
+
+def _get_subsample_collectors():
+    """Cheap single value readers for sub-interval sampling. Each is a single
+    library call or file read, unlike the full per-core snapshot.
 
-def _get_ram_info() -> message_models.RAMInfo:
-    """Get system memory usage via psutil.
+    Return:
+        dict of reading name: callable pairs
+    """
+    # psutil.cpu_percent() keeps its state per thread: the SubSampler primes it on its own thread
+    collectors = {"cpu.utilization": psutil.cpu_percent}
+
+    package_temp = _find_package_temp_file()
+    if package_temp:
+        fd = os.open(package_temp, os.O_RDONLY)
+        atexit.register(os.close, fd)
+        # sysfs values are in millidegrees and re-read from offset 0
+        collectors["cpu.temperature"] = lambda: int(os.pread(fd, 16, 0)) / 1000
+
+    if handle_config:
+        gpu_vendor, handles = handle_config
+        handle = handles[0]
+        if gpu_vendor == "NVIDIA":
+            collectors["gpu.utilization"] = lambda: pynvml.nvmlDeviceGetUtilizationRates(handle).gpu
+            collectors["gpu.temperature"] = lambda: pynvml.nvmlDeviceGetTemperature(handle, pynvml.NVML_TEMPERATURE_GPU)
+        else:
+            collectors["gpu.utilization"] = lambda: amdsmi.amdsmi_get_gpu_activity(handle)["gfx_activity"]
+            collectors["gpu.temperature"] = lambda: amdsmi.amdsmi_get_temp_metric(
+                handle, amdsmi.AmdSmiTemperatureType.EDGE, amdsmi.AmdSmiTemperatureMetric.CURRENT
+            )
+
+    return collectors
+
+def _find_package_temp_file():
+    """Locate the sysfs file of the coretemp CPU package temperature (Linux only).
+    psutil.sensors_temperatures() scans every hwmon device on each call, which is too slow
+    for sub-interval sampling.
+
+    Return:
+        path to the temperature input file, or None if not found
+    """
+    for name_file in glob.glob("/sys/class/hwmon/hwmon*/name"):
+        try:
+            with open(name_file) as f:
+                if f.read().strip() != "coretemp":
+                    continue
+            hwmon = os.path.dirname(name_file)
+            for label_file in sorted(glob.glob(os.path.join(hwmon, "temp*_label"))):
+                with open(label_file) as f:
+                    if f.read().startswith("Package"):
+                        return label_file.replace("_label", "_input")
+        except OSError:
+            continue
+    return None
+
+def _take_snapshot(memory=True) -> Snapshot:
+    """Read each raw value exactly once, either with psutil or, if enabled
+    in config, the direct /proc and /sys reader.
+    Each psutil call is a separate pass over /proc and /sys (or a WMI query on Windows).
+    Args:
+        memory (bool): whether to include memory usage, which has a collector of its own
+
+    Return:
+        a Snapshot named tuple
+    """
+    reader = _get_procfs_reader()
+    if reader:
+        return Snapshot(
+            cpu_percent=_get_cpu_percent(reader.cpu_times(), STAT_FIELDS),
+            cpu_freq=reader.cpu_freq(),
+            cpu_temps=_get_cpu_temps(),
+            load_average=reader.load_average(),
+            memory=reader.memory() if memory else None
+        )
+
+    times = psutil.cpu_times(percpu=True)
+    return Snapshot(
+        cpu_percent=_get_cpu_percent(times, times[0]._fields),
+        cpu_freq=psutil.cpu_freq(percpu=True) or [],
+        cpu_temps=_get_cpu_temps(),
+        load_average=psutil.getloadavg(),
+        memory=psutil.virtual_memory() if memory else None
+    )
+
+def _get_cpu_percent(times, fields):
+    """Per-core utilization since the previous sample from cumulative CPU times.
+    psutil.cpu_percent() is not used, as it keeps its state per thread
+    and collectors may run on any thread of the pool.
+    Args:
+        times (array-like): per-core CPU times
+        fields (tuple): names of the CPU time columns
+
+    Return:
+        list of per-core percentages
+    """
+    global cpu_usage
+    if cpu_usage is None:
+        cpu_usage = CPUPercent(fields)
+    return cpu_usage.update(times)
+
+def _get_procfs_reader():
+    """Get the direct /proc and /sys reader if enabled with backend="procfs"
+    in config. Created on first call.
+
+    Return:
+        a ProcfsReader, or None when using psutil
+    """
+    global procfs_reader, PROCFS_READER_LOADED
+    if not PROCFS_READER_LOADED:
+        PROCFS_READER_LOADED = True
+        if transport.CONFIG["transport"].get("backend", "psutil") == "procfs":
+            if sys.platform.startswith("linux"):
+                from transport.procfs import ProcfsReader
+
+                procfs_reader = ProcfsReader()
+                atexit.register(procfs_reader.close)
+            else:
+                logger.warning("The procfs backend is only available on Linux, using psutil")
+    return procfs_reader
+
+def _get_ram_info(snapshot=None) -> message_models.RAMInfo:
+    """Get system memory usage via psutil or the /proc reader.
+    Args:
+        snapshot (Snapshot): readings to use, if already collected
 
     Return:
         a RAMInfo pydantic model
     """
-    mem = psutil.virtual_memory()
+    if snapshot:
+        mem = snapshot.memory
+    else:
+        reader = _get_procfs_reader()
+        mem = reader.memory() if reader else psutil.virtual_memory()
     return message_models.RAMInfo(
         total=int(mem.total / 10**6),
         used=int(mem.used / 10**6),
         available=int(mem.available / 10**6)
     )
 
-def _get_gpu_info() -> message_models.GPUInfo:
-    """Get usage statistics.
+def _get_gpus_info() -> list[message_models.GPUInfo]:
+    """Get usage statistics of every GPU device in a single pass
+    over the vendor library.
 
-    On first call, tries to initialize a GPU handle using
-    try_get_gpu_handle(). Subsequent calls will use the cached handle.
+    On first call, tries to initialize the device handles using
+    try_get_gpu_handle(). Subsequent calls will use the cached handles.
 
     Return:
-        a GPUInfo pydantic model
+        a list of GPUInfo pydantic models, empty if no GPU is available
     """
-    # initialize a device handle on first call
+    # initialize device handles on first call
     global handle_config, GPU_DEVICE_HANDLE_LOADED
     if not GPU_DEVICE_HANDLE_LOADED:
         handle_config = try_get_gpu_handle()
         GPU_DEVICE_HANDLE_LOADED = True
 
-    # Return empty model if no GPU handle could be obtained
+    # No devices if no GPU handle could be obtained
     if not handle_config:
-        return message_models.GPUInfo()
+        return []
     
-    gpu_vendor, handle = handle_config
+    gpu_vendor, handles = handle_config
     if gpu_vendor == "NVIDIA":
-        return _get_nvidia_gpu_info(handle)
+        return [_get_nvidia_gpu_info(handle) for handle in handles]
 
-    return _get_radeon_gpu_info(handle)
+    return [_get_radeon_gpu_info(handle) for handle in handles]
 
 
-def _get_cpu_info() -> message_models.CPUInfo:
+def _get_cpu_info(snapshot=None) -> message_models.CPUInfo:
     """Get CPU usage statistics via psutil.
+    Aggregate values are derived from the per-core readings.
+    Args:
+        snapshot (Snapshot): readings to use. A new snapshot is taken if not provided.
 
     Return:
         a CPUInfo pydantic model
     """
+    if snapshot is None:
+        snapshot = _take_snapshot(memory=False)
+
+    percents = snapshot.cpu_percent
+    frequencies = [item.current for item in snapshot.cpu_freq]
+    temps = snapshot.cpu_temps
+
     return message_models.CPUInfo(
         cores=message_models.CPUCoreInfo(
-            utilization=list(map(int, psutil.cpu_percent(percpu=True))),
-            frequency=[int(item.current) for item in psutil.cpu_freq(percpu=True)],
-            temperature=[int(t.value) for t in _get_cpu_temps() if "Core" in t.label]
+            utilization=list(map(int, percents)),
+            frequency=list(map(int, frequencies)),
+            temperature=[int(t.value) for t in temps if "Core" in t.label]
         ),
-        utilization=int(psutil.cpu_percent()),
-        frequency=int(psutil.cpu_freq().current),
-        temperature=int(_get_cpu_temps()[-1].value), # assume last reading is CPU package temp
-        load_average_1min=psutil.getloadavg()[0],
-        num_high_load_cores=len([c for c in psutil.cpu_percent(percpu=True) if c > 50])
+        # Same as psutil's system-wide values: the mean over all cores
+        utilization=int(sum(percents) / len(percents)) if percents else 0,
+        frequency=int(sum(frequencies) / len(frequencies)) if frequencies else 0,
+        temperature=int(temps[-1].value), # assume last reading is CPU package temp
+        load_average_1min=snapshot.load_average[0],
+        num_high_load_cores=sum(1 for c in percents if c > 50)
     )
 
 def _get_cpu_temps() -> list[namedtuple]:
     """Get CPU temperature using either psutil (Linux) or
     wmi (Windows Management Instrumentation) and LibreHardwareMonitor (Windows).
     On Windows this requires Open Hardware Monitor running in the background.
+    The WMI sensors are queried by a background WMISensorSampler started on first call;
+    this returns its latest values.
         http://timgolden.me.uk/python/wmi/index.html
         https://github.com/LibreHardwareMonitor/LibreHardwareMonitor
 
@@ -138,19 +469,25 @@ def _get_cpu_temps() -> list[namedtuple]:
         the whole CPU unit.
     """
 
-    # Common container for storing temperature readings
-    # regardless of platform.
-    CoreTemp = namedtuple("CoreTemp", ["label", "value"])
-
     if os.name == "nt":
-        import wmi
-        w = wmi.WMI(namespace=r"root\LibreHardwareMonitor")
-        values = [CoreTemp(sensor.Name, sensor.value) for sensor in w.Sensor()
-                  if sensor.SensorType == "Temperature"
-                    and sensor.Name.startswith(("CPU Core #", "CPU Package"))
-                    and "Distance to TjMax" not in sensor.Name]
+        global wmi_sampler
+        if wmi_sampler is None:
+            from transport.wmi_sampler import WMISensorSampler
+
+            # Sample twice per refresh interval to keep values reasonably fresh
+            wmi_sampler = WMISensorSampler(
+                interval=transport.CONFIG["transport"]["refresh_interval"] / 2,
+                sensor_filter=lambda name: name.startswith(("CPU Core #", "CPU Package"))
+                    and "Distance to TjMax" not in name
+            )
+            wmi_sampler.start()
+
+        values = [CoreTemp(name, value) for name, value in wmi_sampler.read()]
+        if not values:
+            return [CoreTemp("N/A", 0)]
     else:
-        temps = psutil.sensors_temperatures().get("coretemp", [])
+        reader = _get_procfs_reader()
+        temps = reader.coretemp() if reader else psutil.sensors_temperatures().get("coretemp", [])
 
         # coretemp is not available on all systems
         if not temps:
@@ -1,10 +1,12 @@
-import json
+import collections
 import logging
-import time
+import random
+import threading
 import socket
 
 import transport
-from transport import hw_stats
+from transport import codec, framing
+from transport.delta import DeltaEncoder
 from transport.base_publisher import BasePublisher
 from message_models import MessageModel
 
@@ -14,41 +16,176 @@ REFRESH_INTERVAL = transport.CONFIG["transport"]["refresh_interval"]
 
 
 class LocalNetworkPublisher(BasePublisher):
+    """Publish hardware metrics to a socket.
+
+    Sampling and sending run in separate threads: samples are queued to a bounded
+    replay buffer and a sender thread writes them to the socket. If the connection
+    is lost, the sender reconnects with exponential backoff while sampling continues,
+    and the samples collected during the outage are flushed in bulk on reconnect.
+    When the buffer is full, the oldest samples are dropped.
+    """
+
+    # Reconnect backoff limits in seconds
+    RECONNECT_MIN_DELAY = 0.5
+    RECONNECT_MAX_DELAY = 30
+    CONNECT_TIMEOUT = 5
+    # Seconds a send may block, or sent data may stay unacknowledged, before the
+    # connection is considered lost. Also the keepalive probing time of an idle connection.
+    SEND_TIMEOUT = 10
 
     def __init__(self):
-        pass
-    
+        self.encoding = transport.CONFIG["transport"].get("encoding", "json")
+        self.keyframe_interval = transport.CONFIG["transport"].get("keyframe_interval", 1)
+
+        # Default to 5 minutes of samples
+        buffer_size = transport.CONFIG["transport"]["socket"].get("replay_buffer", 300//REFRESH_INTERVAL)
+        self.buffer = collections.deque(maxlen=buffer_size)
+        self.samples_dropped = 0
+        self._buffer_changed = threading.Condition()
+        self._stop = threading.Event()
+        self._sender = None
+
     def publish(self):
-        """Periodically send hardware metrics to a socket."""
+        """Periodically collect hardware metrics and queue them for sending."""
+        logger.info("Polling started...")
+        logger.info("Ctrl-C to exit")
+        self.start_sender()
+        scheduler = self.create_scheduler()
+        try:
+            while True:
+                scheduler.wait()
+                self.enqueue(self.collect())
+
+        except KeyboardInterrupt:
+            # Send an empty message to clear static visuals.
+            # The utilization graph history will remain visible. (TODO?)
+            print()
+            logger.info("Stopping publish")
+            logger.debug("Sending empty message...")
+            self.enqueue(MessageModel())
+            self.stop_sender()
+            self.log_sampling_stats(scheduler)
+            logger.info("Exiting")
+
+    def enqueue(self, msg):
+        """Add a sample to the replay buffer. Never blocks on network I/O."""
+        with self._buffer_changed:
+            if len(self.buffer) == self.buffer.maxlen:
+                self.samples_dropped += 1
+            self.buffer.append(msg)
+            self._buffer_changed.notify()
+
+    def start_sender(self):
+        self._stop.clear()
+        self._sender = threading.Thread(target=self._run_sender, name="sender", daemon=True)
+        self._sender.start()
+
+    def stop_sender(self, timeout=5):
+        """Flush any queued samples and stop the sender thread.
+        Gives up after timeout seconds if the server can't be reached.
+        """
+        with self._buffer_changed:
+            self._stop.set()
+            self._buffer_changed.notify()
+        self._sender.join(timeout)
+
+    def _run_sender(self):
+        """Sender thread: (re)connect to the server and send queued samples."""
         HOST = transport.CONFIG["transport"]["socket"]["host"]
         PORT = transport.CONFIG["transport"]["socket"]["port"]
 
-        logger.info("Polling started...")
-        logger.info("Ctrl-C to exit")
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        attempt = 0
+        while True:
             try:
-                s.connect((HOST, PORT))
-
-                while True:
-                    data = hw_stats.get_stats().model_dump_json().encode()
-                    s.send(data)
-                    time.sleep(REFRESH_INTERVAL)
-
-            except KeyboardInterrupt:
-                # Send an empty message to clear static visuals.
-                # The utilization graph history will remain visible. (TODO?)
-                print()
-                logger.info("Stopping publish")
-                logger.debug("Sending empty message...")
-                data = MessageModel().model_dump_json().encode()
-                s.send(data)
-                s.close()
-
-                logger.info("Exiting")
+                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+                    s.settimeout(self.CONNECT_TIMEOUT)
+                    s.connect((HOST, PORT))
+                    self._set_timeouts(s)
+                    logger.info("Connected to %s:%s", HOST, PORT)
+                    attempt = 0
+
+                    # Start every connection with a keyframe
+                    delta_encoder = DeltaEncoder(self.keyframe_interval)
+                    while True:
+                        batch = self._take_batch()
+                        if batch is None:
+                            s.close()
+                            return
+
+                        if len(batch) > 1:
+                            logger.info("Sending %d buffered samples", len(batch))
+                        data = b"".join(
+                            framing.encode_frame(codec.encode(self.stamp_sent(delta_encoder.encode(msg)), self.encoding))
+                            for msg in batch
+                        )
+                        try:
+                            s.sendall(data)
+                        except OSError:
+                            # Delivery status unknown: resend the whole batch after reconnecting.
+                            # The monitor discards any duplicates by their timestamp.
+                            self._requeue(batch)
+                            raise
+
             # server socket was closed
-            except BrokenPipeError:
-                logger.critical("Connection closed")
-                logger.info("Exiting")
+            except (BrokenPipeError, ConnectionResetError):
+                logger.warning("Connection closed")
             # server is not ready to accept connections
             except ConnectionRefusedError:
-                logger.critical("Connection refused. Is the server running?")
+                logger.warning("Connection refused. Is the server running?")
+            except OSError as e:
+                logger.warning("Connection failed: %s", e)
+
+            if self._stop.is_set():
+                logger.warning("Not connected, discarding %d queued samples", len(self.buffer))
+                return
+
+            delay = self._backoff_delay(attempt)
+            attempt += 1
+            logger.info("Reconnecting in %.1fs (%d samples queued)", delay, len(self.buffer))
+            self._stop.wait(delay)
+
+    def _set_timeouts(self, s):
+        """Detect a server that vanished without closing the connection, eg. on power loss,
+        within SEND_TIMEOUT seconds instead of the minutes TCP retransmission takes to give up.
+        """
+        s.settimeout(self.SEND_TIMEOUT)
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        # Linux only options
+        if hasattr(socket, "TCP_KEEPIDLE"):
+            s.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, self.SEND_TIMEOUT // 2)
+            s.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 1)
+            s.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, self.SEND_TIMEOUT // 2)
+        if hasattr(socket, "TCP_USER_TIMEOUT"):
+            s.setsockopt(socket.IPPROTO_TCP, socket.TCP_USER_TIMEOUT, self.SEND_TIMEOUT * 1000)
+
+    def _backoff_delay(self, attempt):
+        """Exponential backoff with jitter: a random delay between half and
+        the full exponential delay, capped at RECONNECT_MAX_DELAY.
+        """
+        delay = min(self.RECONNECT_MAX_DELAY, self.RECONNECT_MIN_DELAY * 2**attempt)
+        return random.uniform(delay/2, delay)
+
+    def _take_batch(self):
+        """Wait for queued samples and remove them all from the buffer.
+        Return:
+            list of queued samples, or None when stopping with an empty buffer
+        """
+        with self._buffer_changed:
+            while not self.buffer and not self._stop.is_set():
+                self._buffer_changed.wait()
+
+            if not self.buffer:
+                return None
+            batch = list(self.buffer)
+            self.buffer.clear()
+            return batch
+
+    def _requeue(self, batch):
+        """Put an unsent batch back to the front of the buffer,
+        keeping the newest samples if the buffer overflows.
+        """
+        with self._buffer_changed:
+            pending = list(self.buffer)
+            self.buffer.clear()
+            self.samples_dropped += max(0, len(batch) + len(pending) - self.buffer.maxlen)
+            self.buffer.extend(batch + pending)
@@ -0,0 +1,266 @@
+import asyncio
+import logging
+import threading
+
+
+logger = logging.getLogger()
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+# Largest accepted request head. Scrape requests are a few hundred bytes.
+MAX_REQUEST_SIZE = 8192
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Exposition:
+    """Builder of an OpenMetrics text exposition."""
+
+    def __init__(self, host):
+        self.host = _escape(host)
+        self.lines = []
+
+    def family(self, name, help, samples, unit="", type="gauge"):
+        """Add a metric family.
+        Args:
+            name (str): family name, including the unit suffix
+            help (str): description of the metric
+            samples (list): (labels dict, value) pairs. The host label is added to every sample.
+            unit (str): unit of the metric, if any
+            type (str): "gauge" or "counter". Counter samples get the _total suffix.
+        """
+        self.lines.append(f"# TYPE {name} {type}")
+        if unit:
+            self.lines.append(f"# UNIT {name} {unit}")
+        self.lines.append(f"# HELP {name} {help}")
+        sample_name = f"{name}_total" if type == "counter" else name
+        for labels, value in samples:
+            label_text = "".join(f',{key}="{_escape(label)}"' for key, label in labels.items())
+            self.lines.append(f'{sample_name}{{host="{self.host}"{label_text}}} {value}')
+
+    def text(self):
+        return "\n".join(self.lines + ["# EOF", ""])
+
+
+def render(msg, collectors=()):
+    """Render the readings of a message as OpenMetrics text.
+    Utilizations are exported as ratios, frequencies in hertz and memory in bytes.
+    Args:
+        msg (MessageModel): a full message, as returned by hw_stats.get_stats()
+        collectors (iterable): hw_stats Collectors to export call counters of
+    Return:
+        the exposition as a str
+    """
+    out = _Exposition(msg.host)
+    cpu, cores = msg.cpu, msg.cpu.cores
+    out.family("hwmonitor_sample_timestamp_seconds", "Time the readings were sampled",
+               [({}, msg.timestamp)], unit="seconds")
+
+    out.family("hwmonitor_cpu_utilization_ratio", "Mean utilization of all CPU cores",
+               [({}, cpu.utilization / 100)], unit="ratio")
+    # Aggregates are only sent when sub-interval sampling is enabled
+    if cpu.utilization_stats.max:
+        out.family("hwmonitor_cpu_utilization_sampled_ratio",
+                   "Min, max and mean of the CPU utilization sampled over the publish interval",
+                   [({"stat": stat}, value / 100) for stat, value in cpu.utilization_stats],
+                   unit="ratio")
+    out.family("hwmonitor_cpu_frequency_hertz", "Mean frequency of all CPU cores",
+               [({}, cpu.frequency * 10**6)], unit="hertz")
+    out.family("hwmonitor_cpu_temperature_celsius", "CPU package temperature",
+               [({}, cpu.temperature)], unit="celsius")
+    out.family("hwmonitor_cpu_load1", "1 minute load average", [({}, cpu.load_average_1min)])
+    out.family("hwmonitor_cpu_high_load_cores", "Number of cores with utilization above 50%",
+               [({}, cpu.num_high_load_cores)])
+
+    out.family("hwmonitor_cpu_core_utilization_ratio", "Utilization of each CPU core",
+               [({"core": i}, value / 100) for i, value in enumerate(cores.utilization)], unit="ratio")
+    out.family("hwmonitor_cpu_core_frequency_hertz", "Frequency of each CPU core",
+               [({"core": i}, value * 10**6) for i, value in enumerate(cores.frequency)], unit="hertz")
+    out.family("hwmonitor_cpu_core_temperature_celsius", "Temperature of each CPU core",
+               [({"core": i}, value) for i, value in enumerate(cores.temperature)], unit="celsius")
+
+    gpus = list(enumerate(msg.gpus))
+    out.family("hwmonitor_gpu_utilization_ratio", "Utilization of each GPU device",
+               [({"gpu": i}, gpu.utilization / 100) for i, gpu in gpus], unit="ratio")
+    out.family("hwmonitor_gpu_temperature_celsius", "Temperature of each GPU device",
+               [({"gpu": i}, gpu.temperature) for i, gpu in gpus], unit="celsius")
+    out.family("hwmonitor_gpu_memory_used_bytes", "Memory used on each GPU device",
+               [({"gpu": i}, gpu.mem_used * 10**6) for i, gpu in gpus], unit="bytes")
+    out.family("hwmonitor_gpu_memory_total_bytes", "Memory of each GPU device",
+               [({"gpu": i}, gpu.mem_total * 10**6) for i, gpu in gpus], unit="bytes")
+
+    out.family("hwmonitor_ram_used_bytes", "System memory in use", [({}, msg.ram.used * 10**6)], unit="bytes")
+    out.family("hwmonitor_ram_available_bytes", "System memory available",
+               [({}, msg.ram.available * 10**6)], unit="bytes")
+    out.family("hwmonitor_ram_total_bytes", "Total system memory", [({}, msg.ram.total * 10**6)], unit="bytes")
+
+    collectors = list(collectors)
+    if collectors:
+        out.family("hwmonitor_collector_calls", "Calls of each hardware collector",
+                   [({"collector": c.name}, c.calls) for c in collectors], type="counter")
+        out.family("hwmonitor_collector_timeouts", "Calls of each hardware collector exceeding its timeout",
+                   [({"collector": c.name}, c.timeouts) for c in collectors], type="counter")
+        out.family("hwmonitor_collector_errors", "Failed calls of each hardware collector",
+                   [({"collector": c.name}, c.errors) for c in collectors], type="counter")
+    return out.text()
+
+
+def _response(status, body, content_type=CONTENT_TYPE):
+    """Return the bytes of a complete HTTP/1.1 response."""
+    head = (
+        f"HTTP/1.1 {status}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "\r\n"
+    )
+    return head.encode() + body
+
+
+NOT_FOUND = _response("404 Not Found", b"Not found\n", "text/plain")
+METHOD_NOT_ALLOWED = _response("405 Method Not Allowed", b"Method not allowed\n", "text/plain")
+BAD_REQUEST = _response("400 Bad Request", b"Bad request\n", "text/plain")
+
+
+class MetricsProtocol(asyncio.Protocol):
+    """A single scraper connection. Supports keep-alive and pipelined requests."""
+
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+        self.buffer = b""
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.server.connections.add(self)
+
+    def connection_lost(self, exc):
+        self.server.connections.discard(self)
+
+    def data_received(self, data):
+        self.buffer += data
+        while b"\r\n\r\n" in self.buffer:
+            head, self.buffer = self.buffer.split(b"\r\n\r\n", 1)
+            if not self._respond(head):
+                self.transport.close()
+                return
+        if len(self.buffer) > MAX_REQUEST_SIZE:
+            self.transport.write(BAD_REQUEST)
+            self.transport.close()
+
+    def _respond(self, head):
+        """Write the response to a request.
+        Return:
+            True if the connection should be kept open
+        """
+        lines = head.decode("latin-1").split("\r\n")
+        request_line = lines[0].split()
+        if len(request_line) != 3:
+            self.transport.write(BAD_REQUEST)
+            return False
+        method, target, version = request_line
+        headers = {
+            key.strip().lower(): value.strip()
+            for key, _, value in (line.partition(":") for line in lines[1:])
+        }
+
+        path = target.split("?", 1)[0]
+        if method not in ("GET", "HEAD"):
+            response = METHOD_NOT_ALLOWED
+        elif path != self.server.path:
+            response = NOT_FOUND
+        else:
+            self.server.scrapes += 1
+            response = self.server.response
+            if method == "HEAD":
+                response = response[:response.index(b"\r\n\r\n") + 4]
+        self.transport.write(response)
+
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+
+class MetricsServer:
+    """asyncio based HTTP server exposing the latest readings of the poller
+    as OpenMetrics text, eg. for Prometheus.
+
+    The publisher renders the exposition once per sample with update(); scrapes
+    are answered with the cached response and never trigger a collection, so
+    scrapers cost the poller a single write per request however often they poll.
+    """
+
+    def __init__(self, host, port, path="/metrics"):
+        """
+        Args:
+            host (str): address to bind to
+            port (int): port to bind to, 0 for any free port
+            path (str): URL path of the metrics
+        """
+        self.host = host
+        self.port = port
+        self.path = path
+        self.scrapes = 0
+        self.updates = 0
+        self.connections = set()
+        self.response = _response("200 OK", b"# EOF\n")
+        self.ready = threading.Event()
+        self._loop = None
+        self._server = None
+
+    @classmethod
+    def from_config(cls, config):
+        """Create a server from the [transport.metrics] config section."""
+        return cls(config.get("host", "127.0.0.1"), config.get("port", 9101), path=config.get("path", "/metrics"))
+
+    def update(self, msg, collectors=()):
+        """Replace the served snapshot. Safe to call from any thread.
+        Args:
+            msg (MessageModel): the latest full message
+            collectors (iterable): hw_stats Collectors to export call counters of
+        """
+        # Swapping the reference is atomic: a scrape gets either the old or the new snapshot
+        self.response = _response("200 OK", render(msg, collectors).encode())
+        self.updates += 1
+
+    def start(self):
+        """Serve in a daemon thread, returning once the server is listening."""
+        threading.Thread(target=self.run, name="metrics", daemon=True).start()
+        if not self.ready.wait(timeout=5):
+            raise RuntimeError(f"Metrics server failed to listen on {self.host}:{self.port}")
+
+    def run(self):
+        """Serve until stop() is called. Blocks the calling thread."""
+        asyncio.run(self.serve())
+
+    async def serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._server = await self._loop.create_server(
+            lambda: MetricsProtocol(self),
+            self.host,
+            self.port,
+            backlog=128
+        )
+        # Resolve the actual port when bound to port 0
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("Serving metrics on http://%s:%s%s", self.host, self.port, self.path)
+        self.ready.set()
+
+        async with self._server:
+            try:
+                await self._server.serve_forever()
+            except asyncio.CancelledError:
+                pass
+
+    def stop(self):
+        """Stop the server. Safe to call from any thread."""
+        if self._loop and self._server:
+            self._loop.call_soon_threadsafe(self._close)
+
+    def _close(self):
+        # Close the connections first: on Python 3.12+ the server
+        # waits for all active connections when closing.
+        for connection in list(self.connections):
+            connection.transport.abort()
+        self._server.close()
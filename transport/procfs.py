@@ -0,0 +1,170 @@
+import glob
+import logging
+import os
+import re
+from collections import namedtuple
+
+import numpy as np
+
+
+logger = logging.getLogger()
+
+# Same field names as the psutil named tuples, so both backends are interchangeable
+Frequency = namedtuple("Frequency", ["current"])  # MHz
+Temperature = namedtuple("Temperature", ["label", "current"])  # °C
+Memory = namedtuple("Memory", ["total", "used", "available"])  # bytes
+
+# Columns of the per-core lines in /proc/stat
+STAT_FIELDS = ("user", "nice", "system", "idle", "iowait", "irq", "softirq", "steal", "guest", "guest_nice")
+
+
+class CPUPercent:
+    """Per-core utilization percentages from successive cumulative CPU times,
+    using the same formula as psutil.cpu_percent().
+
+    Unlike psutil.cpu_percent(), which keeps the previous times per calling thread,
+    the previous times are kept in the instance. This makes the result independent
+    of which collector thread takes the sample.
+    """
+
+    def __init__(self, fields=STAT_FIELDS):
+        """
+        Args:
+            fields (tuple): names of the CPU time columns, eg. psutil's cpu_times()._fields
+        """
+        # iowait is not included in idle time on Linux. Guest time is already
+        # included in user and nice times.
+        self.idle = [fields.index(f) for f in ("idle", "iowait") if f in fields]
+        self.counted = [i for i, f in enumerate(fields) if f not in ("guest", "guest_nice")]
+        self.previous = None
+
+    def update(self, times):
+        """Compute the utilization since the previous call.
+        The first call, and a call after the number of cores changed, returns zeros.
+        Args:
+            times (array-like): cumulative CPU times, one row per core
+        Return:
+            list of per-core percentages, rounded to 1 decimal
+        """
+        times = np.asarray(times, dtype=float)
+        previous, self.previous = self.previous, times
+        if previous is None or previous.shape != times.shape:
+            return [0.0] * len(times)
+
+        delta = np.maximum(times - previous, 0)
+        total = delta[:, self.counted].sum(axis=1)
+        busy = total - delta[:, self.idle].sum(axis=1)
+        percent = np.divide(busy * 100, total, out=np.zeros_like(total), where=total > 0)
+        return percent.round(1).tolist()
+
+
+class ProcfsReader:
+    """Linux CPU and memory readings straight from /proc and /sys.
+
+    Every file is opened once and re-read with pread into a preallocated buffer,
+    instead of opening and parsing the files from scratch on each psutil call.
+    Values follow psutil's conventions, see psutil/_pslinux.py.
+    """
+
+    BUFFER_SIZE = 4096
+
+    def __init__(self, proc="/proc", sys="/sys"):
+        """
+        Args:
+            proc (str): procfs mount point
+            sys (str): sysfs mount point
+        """
+        self._fds = {}
+        self._buffers = {}
+        self._open("stat", f"{proc}/stat")
+        self._open("meminfo", f"{proc}/meminfo")
+        self._open("loadavg", f"{proc}/loadavg")
+
+        # Per-core frequencies, or /proc/cpuinfo if cpufreq is not available (eg. virtual machines)
+        freq_files = sorted(
+            glob.glob(f"{sys}/devices/system/cpu/cpu[0-9]*/cpufreq/scaling_cur_freq"),
+            key=lambda path: int(re.search(r"/cpu(\d+)/", path).group(1))
+        )
+        self.freq_keys = [self._open(f"freq{i}", path) for i, path in enumerate(freq_files)]
+        if not self.freq_keys:
+            self._open("cpuinfo", f"{proc}/cpuinfo")
+
+        # Labels are read once, only the temperature inputs are re-read
+        self.temp_keys = []
+        for name_file in sorted(glob.glob(f"{sys}/class/hwmon/hwmon*/name")):
+            with open(name_file) as f:
+                if f.read().strip() != "coretemp":
+                    continue
+            hwmon = os.path.dirname(name_file)
+            for input_file in sorted(glob.glob(f"{hwmon}/temp*_input")):
+                label_file = input_file.replace("_input", "_label")
+                label = ""
+                if os.path.exists(label_file):
+                    with open(label_file) as f:
+                        label = f.read().strip()
+                self.temp_keys.append((label, self._open(input_file, input_file)))
+
+    def close(self):
+        for fd in self._fds.values():
+            os.close(fd)
+        self._fds.clear()
+
+    def cpu_times(self):
+        """Return the cumulative per-core CPU times in clock ticks
+        as an array with a row per core and a column per STAT_FIELDS.
+        """
+        rows = []
+        for line in self._read("stat").split(b"\n")[1:]:  # skip the aggregate "cpu" line
+            if not line.startswith(b"cpu"):
+                break
+            rows.append(line.split()[1:len(STAT_FIELDS)+1])
+        return np.array(rows, dtype=np.int64)
+
+    def cpu_freq(self):
+        """Return a list of per-core Frequency tuples."""
+        if self.freq_keys:
+            return [Frequency(int(self._read(key)) / 1000) for key in self.freq_keys]
+        return [
+            Frequency(float(line.split(b":")[1]))
+            for line in self._read("cpuinfo").split(b"\n")
+            if line.startswith(b"cpu MHz")
+        ]
+
+    def coretemp(self):
+        """Return a list of Temperature tuples of the coretemp sensors."""
+        return [Temperature(label, int(self._read(key)) / 1000) for label, key in self.temp_keys]
+
+    def load_average(self):
+        return tuple(float(value) for value in self._read("loadavg").split()[:3])
+
+    def memory(self):
+        """Return a Memory tuple. Used memory is total - available,
+        as in procps' free and psutil >= 7.1, the minimum version required.
+        """
+        fields = {}
+        for line in self._read("meminfo").split(b"\n"):
+            if line.startswith((b"MemTotal:", b"MemAvailable:")):
+                key, value = line.split()[:2]
+                fields[key] = int(value) * 1024
+        total = fields[b"MemTotal:"]
+        available = fields[b"MemAvailable:"]
+        return Memory(total=total, used=total - available, available=available)
+
+    def _open(self, key, path):
+        self._fds[key] = os.open(path, os.O_RDONLY)
+        self._buffers[key] = bytearray(ProcfsReader.BUFFER_SIZE)
+        return key
+
+    def _read(self, key):
+        """Re-read a file from the start into its buffer,
+        growing the buffer if the contents don't fit.
+        Return:
+            the contents as bytes
+        """
+        fd = self._fds[key]
+        while True:
+            buffer = self._buffers[key]
+            size = os.preadv(fd, [buffer], 0)
+            if size < len(buffer):
+                return bytes(memoryview(buffer)[:size])
+            self._buffers[key] = bytearray(len(buffer) * 2)
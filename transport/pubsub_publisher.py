@@ -4,7 +4,8 @@ import time
 from google.cloud import pubsub_v1
 
 import transport
-from transport import hw_stats
+from transport import codec, framing
+from transport.delta import DeltaEncoder
 from transport.base_publisher import BasePublisher
 from message_models import MessageModel
 
@@ -12,54 +13,176 @@ from message_models import MessageModel
 logger = logging.getLogger()
 REFRESH_INTERVAL = transport.CONFIG["transport"]["refresh_interval"]
 
+# Pub/Sub processes a minimum of 1 000 bytes per publish request, push and pull
+# https://cloud.google.com/pubsub/quotas#throughput_quota_units
+MIN_PROCESS_SIZE = 1000
+
+
+class SampleBatch:
+    """Encoded samples waiting to be published together as a single Pub/Sub message.
+
+    Limits are given in the form of the client library's BatchSettings, with
+    max_messages as the number of samples: a batch is published
+    once it holds max_messages samples or its first sample is max_latency seconds old,
+    and before adding a sample would take it past max_bytes. Limits are checked when
+    a sample is added, so a batch can wait up to one refresh interval past max_latency.
+    """
+
+    def __init__(self, settings):
+        """
+        Args:
+            settings (pubsub_v1.types.BatchSettings): batch limits
+        """
+        self.settings = settings
+        self.payloads = []
+        self.size = 0
+        self.start = None  # timestamp of the first sample
+
+    def __len__(self):
+        return len(self.payloads)
+
+    def fits(self, payload):
+        """Check whether a sample can be added without going past max_bytes.
+        A sample is always accepted into an empty batch.
+        """
+        return not self.payloads or self.size + framing.HEADER.size + len(payload) <= self.settings.max_bytes
+
+    def add(self, payload, timestamp):
+        """Add an encoded sample.
+        Return:
+            True if the batch is full and should be published
+        """
+        if self.start is None:
+            self.start = timestamp
+        self.payloads.append(payload)
+        self.size += framing.HEADER.size + len(payload)
+        return (
+            len(self.payloads) >= self.settings.max_messages
+            or timestamp - self.start >= self.settings.max_latency
+        )
+
+    def take(self):
+        """Empty the batch.
+        Return:
+            the samples packed with codec.encode_batch()
+        """
+        data = codec.encode_batch(self.payloads)
+        self.payloads = []
+        self.size = 0
+        self.start = None
+        return data
+
 
 class PubSubPublisher(BasePublisher):
+    """Publish hardware metrics to a Pub/Sub topic.
+
+    Per-core readings are not delta encoded, as Pub/Sub messages can arrive out of order.
+    With batching enabled, several samples are packed into each message to fill the
+    minimum billed request size. Batches carry the number of samples as the "samples"
+    message attribute; messages without it hold a single sample.
+
+    The client library's own batching is disabled, so that every message is sent
+    in a publish request of its own and billed on its own.
+    """
 
     def __init__(self):
-        self.client = pubsub_v1.PublisherClient()
-        self.topic_path = self.client.topic_path(
-            transport.CONFIG["transport"]["pubsub"]["project_id"],
-            transport.CONFIG["transport"]["pubsub"]["topic_id"]
-        )
-    
+        pubsub_config = transport.CONFIG["transport"]["pubsub"]
+        self.client = pubsub_v1.PublisherClient(batch_settings=pubsub_v1.types.BatchSettings(max_messages=1))
+        self.topic_path = self.client.topic_path(pubsub_config["project_id"], pubsub_config["topic_id"])
+        self.encoding = transport.CONFIG["transport"].get("encoding", "json")
+        # Pub/Sub delivers messages out of order: send every message as a keyframe,
+        # keeping only the sequence numbers of the encoder.
+        self.delta_encoder = DeltaEncoder(keyframe_interval=1)
+
+        batch_config = pubsub_config.get("batch", {})
+        self.batch = SampleBatch(pubsub_v1.types.BatchSettings(
+            max_bytes=batch_config.get("max_bytes", MIN_PROCESS_SIZE),
+            max_latency=batch_config.get("max_latency", 30),
+            max_messages=batch_config.get("max_samples", 1)
+        ))
+        self.batching = self.batch.settings.max_messages > 1
+
+        self.samples_published = 0
+        self.messages_published = 0
+        self.bytes_generated = 0
+        self.bytes_billed = 0
+
     def publish(self):
         """Continuously fetch current statistics and publish as message.
-        Publish a new message every REFRESH_INTERVAL seconds.
+        Sample every REFRESH_INTERVAL seconds, on a fixed schedule.
         """
-        bytes_generated = 0
-        bytes_processed = 0
-
-        # Pub/Sub processes a minimum of 1 000 bytes per push and pull
-        # https://cloud.google.com/pubsub/quotas#throughput_quota_units
-        MIN_PROCESS_SIZE = 1000
-
         logger.info("Polling started...")
         logger.info("Ctrl-C to exit")
+        scheduler = self.create_scheduler()
         try:
             while True:
-                data = hw_stats.get_stats().model_dump_json().encode()
-                self.client.publish(self.topic_path, data)
-
-                bytes_generated += len(data)
-                bytes_processed += MIN_PROCESS_SIZE
-                time.sleep(REFRESH_INTERVAL)
-            
-                messages_published = int(bytes_processed/MIN_PROCESS_SIZE)
-                megabytes_published = round(bytes_processed/10**6, 2)
-                megabytes_generated = round(bytes_generated/10**6, 2)
+                scheduler.wait()
+                self.add_sample(self.stamp_sent(self.delta_encoder.encode(self.collect())))
 
                 # Print statistics overwriting previous line
-                print(f"Messages published: {messages_published} ### MB published/generated: {megabytes_published}/{megabytes_generated}", end="\r")
+                print(self.billing_stats(), end="\r")
         except KeyboardInterrupt:
-            # Send an empty message to clear static visuals.
             print()
+            self.log_sampling_stats(scheduler)
             logger.info("Stopping publish")
+            self.flush()
+            logger.info("Published %s", self.billing_stats())
             # Wait a while to give Pub/Sub time to process recent messages
             time.sleep(REFRESH_INTERVAL)
 
+            # Send an empty message to clear static visuals.
             logger.debug("Sending empty message...")
-            data = MessageModel().model_dump_json().encode()
-            future = self.client.publish(self.topic_path, data)
+            future = self.send(codec.encode(MessageModel(), self.encoding))
             future.result()
 
             logger.info("Exiting")
+
+    def add_sample(self, msg):
+        """Publish a sample, or add it to the batch and publish the batch once full.
+        Args:
+            msg (MessageModel): the sample to publish
+        """
+        data = codec.encode(msg, self.encoding)
+        if not self.batching:
+            self.send(data)
+            return
+
+        if not self.batch.fits(data):
+            self.flush()
+        if self.batch.add(data, msg.timestamp):
+            self.flush()
+
+    def flush(self):
+        """Publish the samples in the batch, if any."""
+        if len(self.batch):
+            samples = len(self.batch)
+            self.send(self.batch.take(), samples=samples)
+
+    def send(self, data, samples=None):
+        """Publish a message in a request of its own and count the bytes billed for the request.
+        Args:
+            data (bytes): the message
+            samples (int): number of samples in a batch message. None for a single, unbatched sample.
+        Return:
+            the publish future
+        """
+        attributes = {"samples": str(samples)} if samples is not None else {}
+        future = self.client.publish(self.topic_path, data, **attributes)
+
+        self.samples_published += samples or 1
+        self.messages_published += 1
+        self.bytes_generated += len(data)
+        # A request of a single message: the minimum applies to the message
+        self.bytes_billed += max(len(data), MIN_PROCESS_SIZE)
+        return future
+
+    def billing_stats(self):
+        """Return the published samples and bytes, and the share of the billed bytes
+        carrying data, as a str.
+        """
+        ratio = self.bytes_generated / self.bytes_billed if self.bytes_billed else 0
+        return (
+            f"Samples/messages published: {self.samples_published}/{self.messages_published} "
+            f"### MB billed/generated: {self.bytes_billed/10**6:.2f}/{self.bytes_generated/10**6:.2f} "
+            f"({ratio:.0%} of billed bytes used)"
+        )
@@ -0,0 +1,98 @@
+import collections
+import logging
+import math
+import statistics
+import time
+
+
+logger = logging.getLogger()
+
+OVERRUN_POLICIES = ("skip", "catch_up")
+
+
+class Scheduler:
+    """Periodic scheduler running on fixed deadlines from time.monotonic.
+
+    Deadlines are spaced exactly interval seconds apart from the first tick,
+    so the time spent collecting and sending a sample doesn't accumulate as drift.
+    If a tick runs past the following deadline (an overrun), the missed deadlines are either
+    skipped, keeping the original phase, or caught up by ticking immediately until back on schedule.
+
+    Usage:
+        scheduler = Scheduler(2)
+        while True:
+            scheduler.wait()
+            do_work()
+    """
+
+    # Catching up is limited to this many ticks, eg. after a system suspend.
+    # Larger overruns are skipped.
+    MAX_CATCH_UP = 10
+
+    def __init__(self, interval, overrun="skip", history=1000):
+        """
+        Args:
+            interval (float): seconds between ticks
+            overrun (str): overrun policy, one of OVERRUN_POLICIES
+            history (int): number of recent ticks to compute jitter statistics over
+        """
+        if overrun not in OVERRUN_POLICIES:
+            raise ValueError(f"Unknown overrun policy '{overrun}', expected one of {OVERRUN_POLICIES}")
+
+        self.interval = interval
+        self.overrun = overrun
+        self.ticks = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.jitter = collections.deque(maxlen=history)  # tick start delays from deadline in seconds
+        self._deadline = None
+
+    def wait(self):
+        """Block until the next deadline. The first call returns immediately.
+        Return:
+            the tick's deadline as a time.monotonic value
+        """
+        now = time.monotonic()
+        if self._deadline is None:
+            self._deadline = now
+        else:
+            self._deadline += self.interval
+
+        late = now - self._deadline
+        if late > 0:
+            self.overruns += 1
+            if self.overrun == "skip" or late > self.MAX_CATCH_UP * self.interval:
+                missed = math.ceil(late / self.interval)
+                self.skipped += missed
+                self._deadline += missed * self.interval
+                logger.debug("Tick overran by %.3fs, skipping %d", late, missed)
+
+        delay = self._deadline - now
+        if delay > 0:
+            time.sleep(delay)
+            now = time.monotonic()
+
+        self.jitter.append(now - self._deadline)
+        self.ticks += 1
+        return self._deadline
+
+    def stats(self):
+        """Return jitter and overrun statistics as a dict. Jitter values are in milliseconds."""
+        jitter = sorted(self.jitter)
+        if not jitter:
+            jitter = [0.0]
+        return {
+            "ticks": self.ticks,
+            "overruns": self.overruns,
+            "skipped": self.skipped,
+            "jitter_mean_ms": statistics.fmean(jitter) * 1000,
+            "jitter_p99_ms": jitter[min(len(jitter)-1, int(len(jitter) * 0.99))] * 1000,
+            "jitter_max_ms": jitter[-1] * 1000,
+        }
+
+    def __str__(self):
+        stats = self.stats()
+        return (
+            f"ticks={stats['ticks']} overruns={stats['overruns']} skipped={stats['skipped']} "
+            f"jitter mean/p99/max={stats['jitter_mean_ms']:.1f}/{stats['jitter_p99_ms']:.1f}/{stats['jitter_max_ms']:.1f}ms"
+        )
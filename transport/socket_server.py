@@ -0,0 +1,141 @@
+import asyncio
+import logging
+import socket
+import threading
+import time
+
+from transport import codec, framing
+from transport.delta import DeltaDecoder
+from transport.exceptions import DecodeError, FramingError
+
+
+logger = logging.getLogger()
+
+
+class FrameProtocol(asyncio.BufferedProtocol):
+    """Receiver for a single poller connection.
+
+    Data is read straight into the connection's FrameDecoder buffer, and every
+    complete frame is decoded and passed to the server callback on each read.
+    The connection is closed if nothing is received within the server's idle timeout.
+    """
+
+    def __init__(self, server):
+        self.server = server
+        self.decoder = framing.FrameDecoder()
+        self.delta_decoder = DeltaDecoder()
+        self.transport = None
+        self.peername = None
+        self._idle_handle = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.peername = transport.get_extra_info("peername")
+
+        # Let the OS detect peers that vanished without closing the connection
+        sock = transport.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+
+        self.server.connections.add(self)
+        self._reset_idle_timer()
+        logger.info("Connected by %s (%d active)", self.peername, len(self.server.connections))
+
+    def get_buffer(self, sizehint):
+        return self.decoder.get_buffer()
+
+    def buffer_updated(self, nbytes):
+        received = time.time()
+        self.decoder.buffer_updated(nbytes)
+        self._reset_idle_timer()
+
+        try:
+            for frame in self.decoder.frames():
+                readings = self.delta_decoder.decode(codec.decode(frame, self.server.encoding))
+                self.server.on_message(codec.stamp_received(readings, received))
+        except (FramingError, DecodeError) as e:
+            logger.error("Dropping client %s: %s", self.peername, e)
+            self.transport.abort()
+
+    def eof_received(self):
+        # Returning a falsy value closes the transport
+        return False
+
+    def connection_lost(self, exc):
+        if self._idle_handle:
+            self._idle_handle.cancel()
+        self.server.connections.discard(self)
+        logger.info("Client %s disconnected (%d active)", self.peername, len(self.server.connections))
+
+    def _reset_idle_timer(self):
+        if self._idle_handle:
+            self._idle_handle.cancel()
+        if self.server.idle_timeout:
+            loop = asyncio.get_running_loop()
+            self._idle_handle = loop.call_later(self.server.idle_timeout, self._idle_timeout)
+
+    def _idle_timeout(self):
+        logger.warning("No data from %s in %ss, closing connection", self.peername, self.server.idle_timeout)
+        self.transport.abort()
+
+
+class FrameServer:
+    """asyncio based TCP server receiving framed messages from any number
+    of simultaneous pollers.
+    """
+
+    def __init__(self, host, port, on_message, encoding="json", idle_timeout=None):
+        """
+        Args:
+            host (str): address to bind to
+            port (int): port to bind to, 0 for any free port
+            on_message (callable): callback for each decoded readings dict.
+                Called from the server's event loop thread.
+            encoding (str): expected message encoding, one of codec.ENCODINGS
+            idle_timeout (float): seconds without data before a connection is closed.
+                None to disable.
+        """
+        self.host = host
+        self.port = port
+        self.on_message = on_message
+        self.encoding = encoding
+        self.idle_timeout = idle_timeout
+        self.connections = set()
+        self.ready = threading.Event()
+        self._loop = None
+        self._server = None
+
+    def run(self):
+        """Serve until stop() is called. Blocks the calling thread."""
+        asyncio.run(self.serve())
+
+    async def serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._server = await self._loop.create_server(
+            lambda: FrameProtocol(self),
+            self.host,
+            self.port,
+            backlog=128
+        )
+        # Resolve the actual port when bound to port 0
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("Listening for connections on %s:%s", self.host, self.port)
+        self.ready.set()
+
+        async with self._server:
+            try:
+                await self._server.serve_forever()
+            except asyncio.CancelledError:
+                pass
+
+    def stop(self):
+        """Stop the server. Safe to call from any thread."""
+        if self._loop and self._server:
+            self._loop.call_soon_threadsafe(self._close)
+
+    def _close(self):
+        # Close the connections first: on Python 3.12+ the server
+        # waits for all active connections when closing.
+        for connection in list(self.connections):
+            connection.transport.abort()
+        self._server.close()
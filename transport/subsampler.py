@@ -0,0 +1,110 @@
+import logging
+import threading
+import time
+
+from transport.scheduler import Scheduler
+from message_models import Aggregate
+
+
+logger = logging.getLogger()
+
+
+class RunningAggregate:
+    """Running min, max and mean of a series of values."""
+    __slots__ = ("min", "max", "total", "count")
+
+    def __init__(self):
+        self.min = float("inf")
+        self.max = float("-inf")
+        self.total = 0.0
+        self.count = 0
+
+    def add(self, value):
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.total += value
+        self.count += 1
+
+    def result(self):
+        return Aggregate(min=self.min, max=self.max, mean=self.total / self.count)
+
+
+class SubSampler:
+    """Sample cheap readings at a high rate in a background thread, aggregating
+    them to min, max and mean over each publish interval.
+
+    Collectors are plain callables returning a single number; they should be fast
+    (a single file read or library call), as they run sample_rate times per second.
+    """
+
+    def __init__(self, sample_rate, collectors):
+        """
+        Args:
+            sample_rate (float): samples per second
+            collectors (dict): name: callable pairs
+        """
+        self.sample_rate = sample_rate
+        self.collectors = collectors
+        self.cpu_time = 0.0  # CPU time spent by the sampling thread
+        self.wall_time = 0.0
+        self._aggregates = {name: RunningAggregate() for name in collectors}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="subsampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    @property
+    def overhead(self):
+        """Fraction of a single core used for sampling."""
+        return self.cpu_time / self.wall_time if self.wall_time else 0.0
+
+    def collect(self):
+        """Return the aggregates since the previous call and start new ones.
+        Return:
+            dict of name: Aggregate pairs for collectors with at least one sample
+        """
+        fresh = {name: RunningAggregate() for name in self.collectors}
+        with self._lock:
+            aggregates, self._aggregates = self._aggregates, fresh
+        return {name: agg.result() for name, agg in aggregates.items() if agg.count}
+
+    def _run(self):
+        scheduler = Scheduler(1 / self.sample_rate, overrun="skip")
+        start_wall = time.monotonic()
+        start_cpu = time.thread_time()
+        failed = set()
+
+        # Discard a first sample: some collectors keep state per thread and return
+        # a meaningless first value, eg. psutil.cpu_percent() returns 0.0
+        for collector in self.collectors.values():
+            try:
+                collector()
+            except Exception:
+                pass  # reported by the sampling loop
+
+        while not self._stop.is_set():
+            scheduler.wait()
+            values = {}
+            for name, collector in self.collectors.items():
+                if name in failed:
+                    continue
+                try:
+                    values[name] = collector()
+                except Exception as e:
+                    logger.warning("Disabling sub-sampling of %s: %s", name, e)
+                    failed.add(name)
+
+            with self._lock:
+                for name, value in values.items():
+                    self._aggregates[name].add(value)
+
+            self.cpu_time = time.thread_time() - start_cpu
+            self.wall_time = time.monotonic() - start_wall
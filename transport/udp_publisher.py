@@ -0,0 +1,65 @@
+import logging
+import socket
+
+import transport
+from transport import codec
+from transport.delta import DeltaEncoder
+from transport.base_publisher import BasePublisher
+from message_models import MessageModel
+
+
+logger = logging.getLogger()
+
+# Largest payload that fits a single Ethernet frame without IP fragmentation.
+# A fragmented datagram is lost if any of its fragments is.
+MAX_UNFRAGMENTED_SIZE = 1472
+
+
+class UDPPublisher(BasePublisher):
+    """Publish each sample as a single self-contained datagram.
+    Lost datagrams are not retransmitted; the monitor simply shows the next sample.
+    """
+
+    def __init__(self):
+        self.encoding = transport.CONFIG["transport"].get("encoding", "json")
+        # Every datagram must be decodable on its own: disable delta encoding,
+        # but keep the sequence numbers for detecting loss and reordering.
+        self.sequencer = DeltaEncoder(keyframe_interval=1)
+        self._size_warned = False
+
+    def publish(self):
+        """Periodically send hardware metrics as UDP datagrams."""
+        HOST = transport.CONFIG["transport"]["socket"]["host"]
+        PORT = transport.CONFIG["transport"]["socket"]["port"]
+
+        logger.info("Polling started...")
+        logger.info("Ctrl-C to exit")
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            scheduler = self.create_scheduler()
+            try:
+                while True:
+                    scheduler.wait()
+                    msg = self.stamp_sent(self.sequencer.encode(self.collect()))
+                    self._send(s, codec.encode(msg, self.encoding), (HOST, PORT))
+
+            except KeyboardInterrupt:
+                # Send an empty message to clear static visuals.
+                print()
+                logger.info("Stopping publish")
+                logger.debug("Sending empty message...")
+                self._send(s, codec.encode(MessageModel(), self.encoding), (HOST, PORT))
+                self.log_sampling_stats(scheduler)
+                logger.info("Exiting")
+
+    def _send(self, s, data, address):
+        if len(data) > MAX_UNFRAGMENTED_SIZE and not self._size_warned:
+            logger.warning(
+                "Message size %dB exceeds %dB and will be fragmented. Consider --encoding binary",
+                len(data), MAX_UNFRAGMENTED_SIZE
+            )
+            self._size_warned = True
+        try:
+            s.sendto(data, address)
+        except OSError as e:
+            # No connection to lose: eg. an unreachable network just drops this sample
+            logger.warning("Send failed: %s", e)
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import threading
+import time
+
+from transport import codec
+from transport.exceptions import DecodeError
+
+
+logger = logging.getLogger()
+
+
+class SequenceTracker:
+    """Loss and reordering statistics for the sequence numbers of a single host.
+
+    A datagram is accepted only if it's newer than any previously received;
+    late samples are counted but dropped.
+    """
+
+    # Sequence numbers to remember as missing, for telling late arrivals from duplicates
+    WINDOW = 1024
+
+    def __init__(self):
+        self.highest = None
+        self.received = 0
+        self.lost = 0
+        self.reordered = 0
+        self.duplicates = 0
+        self._missing = set()
+
+    def track(self, sequence):
+        """Register a received sequence number.
+        Return:
+            True if the datagram should be passed on, False if it arrived late
+        """
+        self.received += 1
+
+        # A publisher restart resets its sequence numbers
+        if self.highest is None or sequence == 0 or self.highest - sequence > SequenceTracker.WINDOW:
+            self.highest = sequence
+            self._missing.clear()
+            return True
+
+        if sequence > self.highest:
+            self.lost += sequence - self.highest - 1
+            self._missing.update(range(max(self.highest + 1, sequence - SequenceTracker.WINDOW), sequence))
+            if len(self._missing) > SequenceTracker.WINDOW:
+                self._missing = {s for s in self._missing if s > sequence - SequenceTracker.WINDOW}
+            self.highest = sequence
+            return True
+
+        if sequence in self._missing:
+            # Counted as lost when the gap was seen
+            self._missing.discard(sequence)
+            self.lost -= 1
+            self.reordered += 1
+        else:
+            self.duplicates += 1
+        return False
+
+    @property
+    def loss_rate(self):
+        expected = self.received - self.duplicates + self.lost
+        return self.lost / expected if expected else 0.0
+
+    def __str__(self):
+        return (
+            f"received={self.received} lost={self.lost} ({self.loss_rate:.1%}) "
+            f"reordered={self.reordered} duplicates={self.duplicates}"
+        )
+
+
+class DatagramProtocol(asyncio.DatagramProtocol):
+
+    def __init__(self, server):
+        self.server = server
+
+    def datagram_received(self, data, addr):
+        self.server.datagram_received(data, addr)
+
+    def error_received(self, exc):
+        logger.warning("UDP receive error: %s", exc)
+
+
+class DatagramServer:
+    """asyncio based UDP receiver. Each datagram is a single self-contained message."""
+
+    def __init__(self, host, port, on_message, encoding="json", stats_interval=60):
+        """
+        Args:
+            host (str): address to bind to
+            port (int): port to bind to, 0 for any free port
+            on_message (callable): callback for each decoded readings dict.
+                Called from the server's event loop thread.
+            encoding (str): expected message encoding, one of codec.ENCODINGS
+            stats_interval (float): seconds between logging loss statistics, None to disable
+        """
+        self.host = host
+        self.port = port
+        self.on_message = on_message
+        self.encoding = encoding
+        self.stats_interval = stats_interval
+        self.stats = {}  # host name: SequenceTracker
+        self.ready = threading.Event()
+        self._loop = None
+        self._stopped = None
+
+    def run(self):
+        """Serve until stop() is called. Blocks the calling thread."""
+        asyncio.run(self.serve())
+
+    async def serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        transport, _ = await self._loop.create_datagram_endpoint(
+            lambda: DatagramProtocol(self),
+            local_addr=(self.host, self.port)
+        )
+        self.port = transport.get_extra_info("sockname")[1]
+        logger.info("Listening for datagrams on %s:%s", self.host, self.port)
+        self.ready.set()
+
+        last_report = time.monotonic()
+        try:
+            while not self._stopped.is_set():
+                try:
+                    await asyncio.wait_for(self._stopped.wait(), timeout=self.stats_interval)
+                except asyncio.TimeoutError:
+                    pass
+                if self.stats_interval and time.monotonic() - last_report >= self.stats_interval:
+                    self.log_stats()
+                    last_report = time.monotonic()
+        finally:
+            transport.close()
+
+    def datagram_received(self, data, addr):
+        received = time.time()
+        try:
+            readings = codec.decode(data, self.encoding)
+        except (DecodeError, ValueError) as e:
+            logger.warning("Discarding datagram from %s: %s", addr, e)
+            return
+
+        host = readings.get("host", "")
+        tracker = self.stats.setdefault(host, SequenceTracker())
+        if not tracker.track(readings.get("sequence", 0)):
+            logger.debug("Dropping late datagram #%d from %s", readings.get("sequence", 0), host)
+            return
+
+        readings.pop("cores_delta", None)
+        self.on_message(codec.stamp_received(readings, received))
+
+    def log_stats(self):
+        for host, tracker in self.stats.items():
+            logger.info("UDP %s: %s", host, tracker)
+
+    def stop(self):
+        """Stop the server. Safe to call from any thread."""
+        if self._loop and self._stopped:
+            self._loop.call_soon_threadsafe(self._stopped.set)
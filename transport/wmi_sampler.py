@@ -0,0 +1,103 @@
+import logging
+import threading
+import time
+
+
+logger = logging.getLogger()
+
+
+class WMISensorSampler:
+    """Background sampler for LibreHardwareMonitor temperature sensors over WMI (Windows only).
+        http://timgolden.me.uk/python/wmi/index.html
+        https://github.com/LibreHardwareMonitor/LibreHardwareMonitor
+
+    A single WMI connection is kept open in a background thread. The matching CPU sensors
+    are discovered once, after which only their current values are queried by identifier.
+    read() returns the most recent values without any COM round-trips. If no sensor matches
+    or the connection fails, discovery is retried every RETRY_DELAY seconds.
+    """
+
+    NAMESPACE = r"root\LibreHardwareMonitor"
+    # Seconds between attempts to reconnect, or to discover sensors when none matched
+    RETRY_DELAY = 300
+
+    def __init__(self, interval, sensor_filter):
+        """
+        Args:
+            interval (float): seconds between sensor queries
+            sensor_filter (callable): predicate on a sensor name for the sensors to sample
+        """
+        self.interval = interval
+        self.sensor_filter = sensor_filter
+        self._values = []
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="wmi-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def read(self, timeout=5):
+        """Return the latest sensor values. Waits for the first query to complete.
+        Return:
+            list of (sensor name, value) tuples
+        """
+        self._ready.wait(timeout)
+        with self._lock:
+            return list(self._values)
+
+    def _run(self):
+        # COM has to be initialized in every thread using it.
+        import pythoncom
+        import wmi
+
+        pythoncom.CoInitialize()
+        try:
+            connection = query = None
+            retry_at = 0  # time.monotonic() of the next connection or discovery attempt
+            while not self._stop.is_set():
+                try:
+                    if query is None and time.monotonic() >= retry_at:
+                        if connection is None:
+                            connection = wmi.WMI(namespace=WMISensorSampler.NAMESPACE)
+                        query = self._build_query(connection)
+                        if query is None:
+                            # eg. sensors named differently on this CPU: don't enumerate every round
+                            retry_at = time.monotonic() + self.RETRY_DELAY
+
+                    values = [(sensor.Name, sensor.Value) for sensor in connection.query(query)] if query else []
+                    with self._lock:
+                        self._values = values
+                except Exception as e:
+                    # Any COM error, eg. LibreHardwareMonitor restarted: reconnect and rediscover
+                    logger.warning("WMI query failed, retrying in %ds: %s", self.RETRY_DELAY, e)
+                    connection = query = None
+                    retry_at = time.monotonic() + self.RETRY_DELAY
+                    with self._lock:
+                        self._values = []
+
+                self._ready.set()
+                self._stop.wait(self.interval)
+        finally:
+            pythoncom.CoUninitialize()
+
+    def _build_query(self, connection):
+        """Enumerate temperature sensors once and build a WQL query
+        selecting only the matching sensors by their identifier.
+        Return:
+            the query string, or None if no matching sensors were found
+        """
+        identifiers = [
+            sensor.Identifier for sensor in connection.Sensor(SensorType="Temperature")
+            if self.sensor_filter(sensor.Name)
+        ]
+        logger.info("Found %d WMI temperature sensors", len(identifiers))
+        if not identifiers:
+            return None
+
+        condition = " OR ".join(f"Identifier='{identifier}'" for identifier in identifiers)
+        return f"SELECT Name, Value FROM Sensor WHERE {condition}"
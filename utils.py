@@ -1,3 +1,8 @@
+import colorsys
+
+import numpy as np
+
+
 def interpolate(p1, p2, x):
     """Compute y value at x for the linear function
     passing through two points.
@@ -11,15 +16,14 @@ def interpolate(p1, p2, x):
     b = p1[1] - k * p1[0] # b = f(x) - kx
     return int(k*x + b)
 
-def get_cpu_utilization_background_style(level):
-    """Create stylesheet for cpu utilization widget background color;
+def get_cpu_utilization_hsl(level):
+    """Compute the color of a cpu utilization level;
     lighter value for low values and darker for high values.
-    Uses HSL color codes with varying saturation and lightness values.
     Args:
         level (int): current cpu utilization level from 0 to 100
     Return:
-        a style sheet string to apply to the widget.
-    """ 
+        a (hue, saturation, lightness) tuple, saturation and lightness in percent
+    """
 
     # saturation: increase to 100 from a fixed 'low' value. 20 ↦ 42 and 100 ↦ 100
     saturation = interpolate((20, 42), (100, 100), level)
@@ -32,4 +36,65 @@ def get_cpu_utilization_background_style(level):
         saturation = 42
         lightness = 79
 
-    return f"background-color: hsl(218, {saturation}%, {lightness}%)"
+    return 218, saturation, lightness
+
+def get_cpu_utilization_background_style(level):
+    """Create stylesheet for cpu utilization widget background color.
+    Uses HSL color codes with varying saturation and lightness values.
+    Args:
+        level (int): current cpu utilization level from 0 to 100
+    Return:
+        a style sheet string to apply to the widget.
+    """
+    hue, saturation, lightness = get_cpu_utilization_hsl(level)
+    return f"background-color: hsl({hue}, {saturation}%, {lightness}%)"
+
+def get_cpu_utilization_lut():
+    """Create a color lookup table of the utilization levels 0-100,
+    matching the utilization background styles.
+    Return:
+        a (101, 3) uint8 array of RGB colors
+    """
+    lut = np.empty((101, 3), dtype=np.uint8)
+    for level in range(101):
+        hue, saturation, lightness = get_cpu_utilization_hsl(level)
+        rgb = colorsys.hls_to_rgb(hue / 360, lightness / 100, saturation / 100)
+        lut[level] = [round(c * 255) for c in rgb]
+    return lut
+
+# Precomputed style sheets for utilization levels 0-100. Adjacent levels can map to
+# the same style, eg. every level up to 20.
+CPU_UTILIZATION_STYLES = tuple(get_cpu_utilization_background_style(level) for level in range(101))
+
+def get_cached_cpu_utilization_style(level):
+    """Look up the precomputed style sheet of a utilization level.
+    Args:
+        level (int): cpu utilization level, clamped to 0-100
+    Return:
+        a style sheet string
+    """
+    return CPU_UTILIZATION_STYLES[min(100, max(0, int(level)))]
+
+def set_style_sheet(widget, style_sheet):
+    """Set a widget's style sheet only if it differs from the current one.
+    Setting a style sheet re-polishes the widget even if the style is unchanged.
+    Args:
+        widget (QWidget): the widget to style
+        style_sheet (str): the new style sheet
+    Return:
+        True if the style sheet was changed
+    """
+    if widget.styleSheet() == style_sheet:
+        return False
+    widget.setStyleSheet(style_sheet)
+    return True
+
+def get_gpus(readings):
+    """Get the per-GPU readings from a readings dict.
+    Args:
+        readings (dict): readings as received from the poller
+    Return:
+        a list of GPU readings dicts, the primary GPU alone if the
+        message doesn't have a per-GPU array
+    """
+    return readings.get("gpus") or [readings["gpu"]]